@@ -4,11 +4,13 @@ from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 import bcrypt
 import logging
 
 from core.models import User
-from core.database import get_session
+from core.database import get_async_session, get_session
+from core.replicas import get_read_session
 from core.schemas import TokenData
 
 # Configurações
@@ -70,36 +72,34 @@ def create_access_token(dados: dict, expires_delta: Optional[timedelta] = None):
     jwt_codificado = jwt.encode(para_codificar, SECRET_KEY, algorithm=ALGORITHM)
     return jwt_codificado
 
-async def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)) -> User:
-    """Obtém o usuário atual baseado no token"""
-    excecao_credenciais = HTTPException(
+def _excecao_credenciais() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _username_do_token(token: str) -> str:
+    """Valida o token JWT e retorna o username; levanta 401 se for inválido"""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
             logger.warning("Payload do token não contém username")
-            raise excecao_credenciais
+            raise _excecao_credenciais()
         dados_token = TokenData(username=username)
     except JWTError:
         logger.exception("JWTError durante decodificação do token")
-        raise excecao_credenciais
-    
-    usuario = get_user_by_username(session, username=dados_token.username)
+        raise _excecao_credenciais()
+    return dados_token.username
+
+def _usuario_encontrado(usuario: Optional[User], username: str) -> User:
     if usuario is None:
         logger.warning(f"Usuário {username} não encontrado durante validação do token")
-        raise excecao_credenciais
+        raise _excecao_credenciais()
     return usuario
 
-async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
-    """Obtém o usuário ativo atual"""
-    return current_user
-
-async def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
-    """Verifica se o usuário atual é admin"""
+def _exigir_admin(current_user: User) -> User:
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -107,8 +107,7 @@ async def get_current_admin(current_user: User = Depends(get_current_user)) -> U
         )
     return current_user
 
-async def get_current_curator_or_admin(current_user: User = Depends(get_current_user)) -> User:
-    """Verifica se o usuário atual é curador ou admin"""
+def _exigir_curador_ou_admin(current_user: User) -> User:
     if current_user.role not in ["curator", "admin"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -116,6 +115,51 @@ async def get_current_curator_or_admin(current_user: User = Depends(get_current_
         )
     return current_user
 
+async def get_current_user(token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_async_session)) -> User:
+    """Obtém o usuário atual baseado no token"""
+    username = _username_do_token(token)
+    usuario = (await session.exec(select(User).where(User.username == username))).first()
+    return _usuario_encontrado(usuario, username)
+
+async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+    """Obtém o usuário ativo atual"""
+    return current_user
+
+async def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    """Verifica se o usuário atual é admin"""
+    return _exigir_admin(current_user)
+
+async def get_current_curator_or_admin(current_user: User = Depends(get_current_user)) -> User:
+    """Verifica se o usuário atual é curador ou admin"""
+    return _exigir_curador_ou_admin(current_user)
+
+# Variantes para rotas síncronas: o usuário é carregado na mesma sessão da rota
+# (get_session é reutilizada pelo FastAPI na requisição), sem abrir uma sessão assíncrona à parte
+
+def get_current_user_sync(token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)) -> User:
+    """Obtém o usuário atual baseado no token, na sessão síncrona da rota"""
+    username = _username_do_token(token)
+    usuario = session.exec(select(User).where(User.username == username)).first()
+    return _usuario_encontrado(usuario, username)
+
+def get_current_active_user_sync(current_user: User = Depends(get_current_user_sync)) -> User:
+    """Obtém o usuário ativo atual (rotas síncronas)"""
+    return current_user
+
+def get_current_reader(token: str = Depends(oauth2_scheme), session: Session = Depends(get_read_session)) -> User:
+    """Obtém o usuário atual na sessão de leitura da rota (rotas síncronas somente leitura)"""
+    username = _username_do_token(token)
+    usuario = session.exec(select(User).where(User.username == username)).first()
+    return _usuario_encontrado(usuario, username)
+
+def get_current_admin_sync(current_user: User = Depends(get_current_user_sync)) -> User:
+    """Verifica se o usuário atual é admin (rotas síncronas)"""
+    return _exigir_admin(current_user)
+
+def get_current_curator_or_admin_sync(current_user: User = Depends(get_current_user_sync)) -> User:
+    """Verifica se o usuário atual é curador ou admin (rotas síncronas)"""
+    return _exigir_curador_ou_admin(current_user)
+
 def is_admin(user: User) -> bool:
     """Verifica se o usuário é admin"""
     return user.role == "admin"
@@ -0,0 +1,114 @@
+import argparse
+import logging
+from typing import Iterator, Optional, Sequence
+
+from sqlalchemy import delete, func, insert
+from sqlmodel import Session, select
+
+from core.database import engine
+from core.models import (
+    ActivityEvent,
+    Follow,
+    Rating,
+    UserLibrary,
+    UserMovieLibrary,
+    UserReview,
+)
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE = 1000
+
+
+def preencher_eventos(forcar: bool = False) -> int:
+    """
+    Gera o log de atividades a partir das tabelas existentes (avaliações, follows,
+    bibliotecas e reviews). Só roda com a tabela vazia, a não ser com forcar=True,
+    que apaga o log atual antes de recriá-lo.
+    """
+    with Session(engine) as session:
+        existentes = session.exec(select(func.count()).select_from(ActivityEvent)).one()
+        if existentes and not forcar:
+            logger.info("Log de atividades já possui %s eventos. Nenhuma ação necessária.", existentes)
+            return 0
+        if existentes:
+            session.execute(delete(ActivityEvent))
+
+        total = 0
+        for linhas in _em_lotes(_eventos(session)):
+            session.execute(insert(ActivityEvent), linhas)
+            total += len(linhas)
+            logger.info("Eventos gravados: %s", total)
+        session.commit()
+
+    logger.info("Preenchimento do log de atividades concluído (%s eventos).", total)
+    return total
+
+
+def _eventos(session: Session) -> Iterator[dict]:
+    for avaliacao in session.exec(select(Rating).execution_options(yield_per=TAMANHO_LOTE)):
+        payload = {"score": avaliacao.score}
+        if avaliacao.book_id:
+            payload["book_id"] = avaliacao.book_id
+        elif avaliacao.movie_id:
+            payload["movie_id"] = avaliacao.movie_id
+        yield _evento(avaliacao.user_id, "rated", "rating", avaliacao.id, avaliacao.created_at, payload)
+
+    for follow in session.exec(select(Follow).execution_options(yield_per=TAMANHO_LOTE)):
+        yield _evento(follow.follower_id, "followed", "user", follow.following_id, follow.created_at)
+
+    for entrada in session.exec(select(UserLibrary).execution_options(yield_per=TAMANHO_LOTE)):
+        yield _evento(entrada.user_id, "library_added", "book", entrada.book_external_id, entrada.created_at)
+
+    for entrada in session.exec(select(UserMovieLibrary).execution_options(yield_per=TAMANHO_LOTE)):
+        yield _evento(entrada.user_id, "library_added", "movie", entrada.movie_external_id, entrada.created_at)
+
+    for review in session.exec(select(UserReview).execution_options(yield_per=TAMANHO_LOTE)):
+        yield _evento(
+            review.author_user_id,
+            "reviewed_user",
+            "user",
+            review.target_user_id,
+            review.created_at,
+            {"review_id": review.id, "rating": review.rating},
+        )
+
+
+def _evento(actor_id, verbo, tipo_objeto, id_objeto, criado_em, payload=None) -> dict:
+    return {
+        "actor_id": actor_id,
+        "verb": verbo,
+        "object_type": tipo_objeto,
+        "object_id": str(id_objeto),
+        "payload": payload,
+        "created_at": criado_em,
+    }
+
+
+def _em_lotes(eventos: Iterator[dict]) -> Iterator[list]:
+    lote = []
+    for evento in eventos:
+        lote.append(evento)
+        if len(lote) >= TAMANHO_LOTE:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Preenche o log de atividades a partir dos dados existentes."
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Apaga o log atual e o recria do zero.",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    args = _parse_args()
+    preencher_eventos(forcar=args.force)
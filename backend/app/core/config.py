@@ -0,0 +1,129 @@
+"""
+Configuração do banco de dados lida das variáveis de ambiente.
+Os PRAGMAs SQLITE_* só se aplicam a bancos SQLite; os parâmetros DB_POOL_* são
+ignorados em bancos SQLite em memória, que usam uma única conexão.
+As sessões assíncronas usam DATABASE_ASYNC_URL ou, sem ela, DATABASE_URL com o
+driver assíncrono correspondente (aiosqlite, asyncpg, aiomysql).
+As réplicas de leitura (DATABASE_REPLICA_URLS, separadas por vírgula) usam as
+mesmas opções de pool; ver core/replicas.py.
+"""
+import os
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.engine import make_url
+
+
+def _booleano(nome: str, padrao: str) -> bool:
+    return os.getenv(nome, padrao).strip().lower() in ("1", "true", "yes", "on")
+
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./database.db")
+DRIVERS_ASSINCRONOS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+    "mysql": "aiomysql",
+}
+
+# Engine e pool de conexões
+DB_ECHO = _booleano("DB_ECHO", "false")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Segundos até uma conexão ser renovada (-1 desativa)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# Aplicar as migrações pendentes (core/migrations) ao iniciar a aplicação
+DB_MIGRATE_ON_STARTUP = _booleano("DB_MIGRATE_ON_STARTUP", "true")
+
+# Réplicas de leitura
+DATABASE_REPLICA_URLS: List[str] = [
+    url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+]
+DB_REPLICA_HEALTH_INTERVAL = int(os.getenv("DB_REPLICA_HEALTH_INTERVAL", "10"))
+# Segundos em que as leituras de quem acabou de escrever vão para o banco principal
+DB_READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+# Réplicas SQLite locais copiadas do principal com a API de backup (0 desativa)
+SQLITE_REPLICA_SYNC_INTERVAL = int(os.getenv("SQLITE_REPLICA_SYNC_INTERVAL", "0"))
+
+# PRAGMAs aplicados a cada nova conexão SQLite
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL").upper()
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+# Negativo: tamanho em KiB (-64000 ~ 64 MB por conexão)
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-64000"))
+SQLITE_FOREIGN_KEYS = _booleano("SQLITE_FOREIGN_KEYS", "true")
+
+# Instrumentação das consultas por requisição (ver core/query_monitor.py)
+SQL_DEBUG_HEADERS = _booleano("SQL_DEBUG_HEADERS", "false")
+# Execuções da mesma consulta em uma requisição acima das quais há suspeita de N+1
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "10"))
+# off, log (registra no log e em /metrics/sql) ou raise (falha a requisição; para testes)
+SQL_N_PLUS_ONE_MODE = os.getenv("SQL_N_PLUS_ONE_MODE", "log").lower()
+
+MODOS_JOURNAL = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+MODOS_SYNCHRONOUS = ("OFF", "NORMAL", "FULL", "EXTRA")
+MODOS_N_PLUS_ONE = ("off", "log", "raise")
+
+if SQLITE_JOURNAL_MODE not in MODOS_JOURNAL:
+    raise ValueError(f"SQLITE_JOURNAL_MODE inválido: {SQLITE_JOURNAL_MODE}")
+if SQLITE_SYNCHRONOUS not in MODOS_SYNCHRONOUS:
+    raise ValueError(f"SQLITE_SYNCHRONOUS inválido: {SQLITE_SYNCHRONOUS}")
+if SQL_N_PLUS_ONE_MODE not in MODOS_N_PLUS_ONE:
+    raise ValueError(f"SQL_N_PLUS_ONE_MODE inválido: {SQL_N_PLUS_ONE_MODE}")
+
+
+def eh_sqlite(url: str = DATABASE_URL) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def eh_sqlite_em_memoria(url: str = DATABASE_URL) -> bool:
+    banco = make_url(url).database
+    return eh_sqlite(url) and (not banco or banco == ":memory:" or "mode=memory" in url)
+
+
+def url_assincrona(url_sincrona: Optional[str] = None) -> str:
+    if url_sincrona is None:
+        if os.getenv("DATABASE_ASYNC_URL"):
+            return os.environ["DATABASE_ASYNC_URL"]
+        url_sincrona = DATABASE_URL
+    url = make_url(url_sincrona)
+    backend = url.get_backend_name()
+    if backend not in DRIVERS_ASSINCRONOS:
+        raise ValueError(f"Sem driver assíncrono conhecido para {backend}; defina DATABASE_ASYNC_URL")
+    return url.set(drivername=f"{backend}+{DRIVERS_ASSINCRONOS[backend]}").render_as_string(hide_password=False)
+
+
+def pragmas_sqlite() -> Dict[str, Any]:
+    """PRAGMAs na ordem em que são aplicados (busy_timeout antes de trocar o journal)."""
+    return {
+        "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+        "journal_mode": SQLITE_JOURNAL_MODE,
+        "synchronous": SQLITE_SYNCHRONOUS,
+        "foreign_keys": "ON" if SQLITE_FOREIGN_KEYS else "OFF",
+        "cache_size": SQLITE_CACHE_SIZE,
+        "mmap_size": SQLITE_MMAP_SIZE,
+    }
+
+
+def resumo_banco() -> Dict[str, Any]:
+    """Configuração efetiva do banco, sem a senha da URL, para o log de inicialização."""
+    resumo: Dict[str, Any] = {
+        "url": make_url(DATABASE_URL).render_as_string(hide_password=True),
+        "echo": DB_ECHO,
+    }
+    if not eh_sqlite_em_memoria():
+        resumo.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    if eh_sqlite():
+        resumo.update(pragmas_sqlite())
+    if DATABASE_REPLICA_URLS:
+        resumo["replicas"] = [
+            make_url(url).render_as_string(hide_password=True) for url in DATABASE_REPLICA_URLS
+        ]
+        resumo["read_your_writes_seconds"] = DB_READ_YOUR_WRITES_SECONDS
+    return resumo
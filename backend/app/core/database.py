@@ -1,24 +1,175 @@
-from sqlmodel import SQLModel, create_engine, Session
-from typing import Generator
-import os
+from sqlalchemy import event, insert, inspect, text, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Any, AsyncGenerator, Dict, Generator, List, Tuple
 import logging
 
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./database.db")
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+from core import config
+from core.config import DATABASE_URL
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-engine = create_engine(DATABASE_URL, echo=True, connect_args=connect_args)
+
+def _opcoes_engine(url: str) -> Dict[str, Any]:
+    opcoes: Dict[str, Any] = {"echo": config.DB_ECHO}
+    if config.eh_sqlite(url):
+        opcoes["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": config.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        }
+    if not config.eh_sqlite_em_memoria(url):
+        opcoes.update(
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+            pool_recycle=config.DB_POOL_RECYCLE,
+        )
+    return opcoes
+
+
+def criar_engines(url: str, url_async: str, somente_leitura: bool = False) -> Tuple[Engine, AsyncEngine]:
+    """
+    Engines síncrono e assíncrono para o mesmo banco. Em SQLite, os PRAGMAs
+    configurados são aplicados a cada nova conexão (e query_only nas réplicas).
+    """
+    engine_sync = create_engine(url, **_opcoes_engine(url))
+    engine_async = create_async_engine(url_async, **_opcoes_engine(url))
+    if config.eh_sqlite(url):
+        pragmas = config.pragmas_sqlite()
+        if somente_leitura:
+            pragmas["query_only"] = "ON"
+
+        def aplicar_pragmas(conexao_dbapi, registro_conexao):
+            cursor = conexao_dbapi.cursor()
+            try:
+                for nome, valor in pragmas.items():
+                    cursor.execute(f"PRAGMA {nome}={valor}")
+            finally:
+                cursor.close()
+
+        event.listen(engine_sync, "connect", aplicar_pragmas)
+        event.listen(engine_async.sync_engine, "connect", aplicar_pragmas)
+    return engine_sync, engine_async
+
+
+# Rotas async usam o engine assíncrono, que não bloqueia o event loop durante as consultas.
+# Bancos SQLite em memória não são compartilhados entre os dois engines.
+engine, async_engine = criar_engines(DATABASE_URL, config.url_assincrona())
+
+
+def registrar_configuracao() -> None:
+    """Registra no log a configuração do banco e, no SQLite, os PRAGMAs efetivos da conexão."""
+    logger.info(
+        "Configuração do banco: %s",
+        ", ".join(f"{chave}={valor}" for chave, valor in config.resumo_banco().items()),
+    )
+    if not config.eh_sqlite():
+        return
+    esperados = config.pragmas_sqlite()
+    with engine.connect() as conexao:
+        efetivos = {nome: conexao.execute(text(f"PRAGMA {nome}")).scalar() for nome in esperados}
+    logger.info(
+        "PRAGMAs efetivos do SQLite: %s",
+        ", ".join(f"{nome}={valor}" for nome, valor in efetivos.items()),
+    )
+    if str(efetivos["journal_mode"]).upper() != config.SQLITE_JOURNAL_MODE:
+        # Ex.: bancos em memória não suportam WAL
+        logger.warning(
+            f"journal_mode efetivo é {efetivos['journal_mode']} (configurado: {config.SQLITE_JOURNAL_MODE})"
+        )
 
 def create_db_and_tables():
-    logger.info("Criando banco de dados e tabelas")
-    SQLModel.metadata.create_all(engine)
-    logger.info("Banco de dados e tabelas criados")
+    """
+    Aplica as migrações pendentes (core/migrations) ou, com DB_MIGRATE_ON_STARTUP
+    desativado, apenas informa quais faltam aplicar.
+    """
+    from core import migrations
+
+    if config.DB_MIGRATE_ON_STARTUP:
+        logger.info("Aplicando migrações do banco de dados")
+        migrations.aplicar()
+        logger.info("Banco de dados atualizado")
+        return
+    pendentes = migrations.pendentes()
+    if pendentes:
+        logger.warning(
+            "Migrações pendentes: %s (execute python -m core.migrations up)",
+            ", ".join(migracao.versao for migracao in pendentes),
+        )
+
+def inserir_ignorando_duplicados(
+    session: Session, modelo: Any, linhas: List[Dict[str, Any]], colunas_unicas: List[str]
+) -> List[Any]:
+    """
+    INSERT ... ON CONFLICT DO NOTHING sobre um índice único, em uma única instrução.
+    Retorna as chaves primárias das linhas efetivamente inseridas.
+    """
+    if not linhas:
+        return []
+    dialeto = session.get_bind().dialect.name
+    if dialeto in ("sqlite", "postgresql"):
+        insercao = sqlite_insert if dialeto == "sqlite" else postgresql_insert
+        return list(session.execute(
+            insercao(modelo)
+            .values(linhas)
+            .on_conflict_do_nothing(index_elements=colunas_unicas)
+            .returning(*inspect(modelo).primary_key)
+        ).scalars())
+    # Outros bancos: uma inserção por linha em savepoint, tratando a violação do índice único
+    inseridos = []
+    for linha in linhas:
+        try:
+            with session.begin_nested():
+                inseridos.append(session.execute(insert(modelo).values(**linha)).inserted_primary_key[0])
+        except IntegrityError:
+            pass
+    return inseridos
+
+def inserir_ou_somar(
+    session: Session, modelo: Any, linhas: List[Dict[str, Any]], colunas_unicas: List[str], coluna: str
+) -> None:
+    """
+    INSERT ... ON CONFLICT DO UPDATE somando `coluna` ao valor existente, para
+    contagens acumuladas por vários processos sem sobrescrever umas às outras.
+    """
+    if not linhas:
+        return
+    dialeto = session.get_bind().dialect.name
+    if dialeto in ("sqlite", "postgresql"):
+        insercao = (sqlite_insert if dialeto == "sqlite" else postgresql_insert)(modelo).values(linhas)
+        session.execute(insercao.on_conflict_do_update(
+            index_elements=colunas_unicas,
+            set_={coluna: getattr(modelo, coluna) + insercao.excluded[coluna]},
+        ))
+        return
+    # Outros bancos: UPDATE somando e, se a linha não existir, INSERT
+    for linha in linhas:
+        resultado = session.execute(
+            update(modelo)
+            .where(*(getattr(modelo, nome) == linha[nome] for nome in colunas_unicas))
+            .values({coluna: getattr(modelo, coluna) + linha[coluna]})
+        )
+        if resultado.rowcount == 0:
+            session.execute(insert(modelo).values(**linha))
 
 def get_session() -> Generator[Session, None, None]:
-    logger.info("Criando sessão do banco de dados")
+    logger.debug("Criando sessão do banco de dados")
     with Session(engine) as session:
-        logger.info("Sessão do banco de dados criada")
+        logger.debug("Sessão do banco de dados criada")
+        yield session
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Sessão assíncrona para rotas `async def`. Os objetos continuam legíveis após o
+    commit; relacionamentos não são carregados sob demanda e precisam ser consultados.
+    Código síncrono (ex.: services/events.py) roda com `await session.run_sync(...)`.
+    """
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
         yield session
 
@@ -0,0 +1,7 @@
+"""
+Migrações versionadas do esquema do banco de dados.
+Uso: python -m core.migrations [status|up|down|new] (a partir de backend/app).
+"""
+from core.migrations.runner import aplicadas, aplicar, migracoes, pendentes, reverter
+
+__all__ = ["aplicadas", "aplicar", "migracoes", "pendentes", "reverter"]
@@ -0,0 +1,75 @@
+import argparse
+import logging
+import re
+import unicodedata
+from pathlib import Path
+from typing import Optional, Sequence
+
+from core.migrations import versions
+from core.migrations.runner import aplicadas, aplicar, migracoes, reverter
+
+logger = logging.getLogger(__name__)
+
+MODELO = '''"""
+{descricao}
+"""
+# Descomente para índices concorrentes e preenchimentos em lotes (ctx.preencher_em_lotes)
+# TRANSACIONAL = False
+
+
+def up(ctx):
+    pass
+
+
+def down(ctx):
+    pass
+'''
+
+
+def status() -> None:
+    ja_aplicadas = aplicadas()
+    for migracao in migracoes():
+        aplicada_em = ja_aplicadas.get(migracao.versao)
+        situacao = f"aplicada em {aplicada_em:%Y-%m-%d %H:%M:%S}" if aplicada_em else "pendente"
+        print(f"{migracao.versao}  {situacao:<32} {migracao.descricao}")
+
+
+def nova(nome: str) -> Path:
+    """Cria o arquivo da próxima versão com up/down vazios."""
+    nome = unicodedata.normalize("NFKD", nome).encode("ascii", "ignore").decode()
+    nome = re.sub(r"\W+", "_", nome.strip().lower()).strip("_")
+    if not nome:
+        raise ValueError("Nome de migração inválido")
+    existentes = migracoes()
+    versao = int(existentes[-1].versao) + 1 if existentes else 1
+    caminho = Path(versions.__path__[0]) / f"{versao:04d}_{nome}.py"
+    caminho.write_text(MODELO.format(descricao=nome.replace("_", " ").capitalize()), encoding="utf-8")
+    return caminho
+
+
+def _parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Migrações versionadas do esquema do banco de dados.")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    comandos.add_parser("status", help="Lista as migrações aplicadas e pendentes.")
+    up = comandos.add_parser("up", help="Aplica as migrações pendentes.")
+    up.add_argument("--to", default=None, help="Aplica apenas até esta versão (inclusive).")
+    down = comandos.add_parser("down", help="Reverte as últimas migrações aplicadas.")
+    down.add_argument("--steps", type=int, default=1, help="Quantidade de migrações a reverter.")
+    new = comandos.add_parser("new", help="Cria o arquivo de uma nova migração.")
+    new.add_argument("nome", help="Descrição curta, usada no nome do arquivo.")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    args = _parse_args()
+    if args.comando == "status":
+        status()
+    elif args.comando == "up":
+        executadas = aplicar(ate=args.to)
+        logger.info(f"{len(executadas)} migrações aplicadas")
+    elif args.comando == "down":
+        revertidas = reverter(passos=args.steps)
+        logger.info(f"{len(revertidas)} migrações revertidas")
+    else:
+        logger.info(f"Migração criada: {nova(args.nome)}")
@@ -0,0 +1,155 @@
+"""
+Operações disponíveis para as migrações (core/migrations/versions).
+Todas são idempotentes, para que uma migração interrompida possa ser executada de novo.
+"""
+import logging
+import time
+from typing import Any, Dict, Iterable, Sequence, Set
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE = 1000
+# Pausa entre lotes, para que as escritas da aplicação não fiquem esperando
+PAUSA_ENTRE_LOTES = 0.05
+
+
+class Contexto:
+    """
+    Conexão da migração. Em migrações transacionais (padrão) tudo roda em uma
+    única transação; nas demais (TRANSACIONAL = False) cada instrução é
+    confirmada ao terminar, o que permite índices concorrentes e preenchimentos em lotes.
+    """
+
+    def __init__(self, engine: Engine, conexao: Connection, transacional: bool):
+        self.engine = engine
+        self.conexao = conexao
+        self.transacional = transacional
+
+    @property
+    def dialeto(self) -> str:
+        return self.conexao.dialect.name
+
+    def nome(self, identificador: str) -> str:
+        """Identificador entre aspas quando necessário (ex.: a tabela user no PostgreSQL)."""
+        return self.conexao.dialect.identifier_preparer.quote(identificador)
+
+    def executar(self, sql: str, **parametros: Any):
+        return self.conexao.execute(text(sql), parametros)
+
+    def colunas(self, tabela: str) -> Set[str]:
+        return {coluna["name"] for coluna in inspect(self.conexao).get_columns(tabela)}
+
+    def tem_tabela(self, tabela: str) -> bool:
+        return inspect(self.conexao).has_table(tabela)
+
+    def adicionar_coluna(self, tabela: str, coluna: str, tipo: str) -> bool:
+        """Adiciona a coluna se ainda não existir. Retorna True se ela foi criada."""
+        if coluna in self.colunas(tabela):
+            logger.info(f"Coluna '{coluna}' já existe na tabela {tabela}. Nenhuma ação necessária.")
+            return False
+        self.executar(f"ALTER TABLE {self.nome(tabela)} ADD COLUMN {self.nome(coluna)} {tipo}")
+        logger.info(f"Coluna '{coluna}' adicionada à tabela {tabela}")
+        return True
+
+    def remover_coluna(self, tabela: str, coluna: str) -> bool:
+        if coluna not in self.colunas(tabela):
+            return False
+        self.executar(f"ALTER TABLE {self.nome(tabela)} DROP COLUMN {self.nome(coluna)}")
+        logger.info(f"Coluna '{coluna}' removida da tabela {tabela}")
+        return True
+
+    def criar_indice(self, nome: str, tabela: str, colunas: Iterable[str], unico: bool = False) -> None:
+        """
+        CREATE INDEX IF NOT EXISTS. No PostgreSQL, fora de transação, usa
+        CONCURRENTLY para não bloquear as escritas na tabela durante a criação.
+        """
+        concorrente = "CONCURRENTLY " if self._online() else ""
+        self.executar(
+            f"CREATE {'UNIQUE ' if unico else ''}INDEX {concorrente}IF NOT EXISTS {self.nome(nome)} "
+            f"ON {self.nome(tabela)} ({', '.join(self.nome(c) for c in colunas)})"
+        )
+        logger.info(f"Índice {nome} verificado")
+
+    def remover_indice(self, nome: str) -> None:
+        concorrente = "CONCURRENTLY " if self._online() else ""
+        self.executar(f"DROP INDEX {concorrente}IF EXISTS {self.nome(nome)}")
+        logger.info(f"Índice {nome} removido")
+
+    def preencher_em_lotes(
+        self,
+        tabela: str,
+        atribuicoes: str,
+        condicao: str = "1 = 1",
+        tamanho_lote: int = TAMANHO_LOTE,
+        pausa: float = PAUSA_ENTRE_LOTES,
+        **parametros: Any,
+    ) -> int:
+        """
+        UPDATE tabela SET atribuicoes WHERE condicao, em faixas de id de
+        `tamanho_lote` linhas, cada faixa na sua própria transação curta.
+        Disponível apenas em migrações não transacionais.
+        """
+        total = self.executar_em_lotes(
+            tabela,
+            f"UPDATE {self.nome(tabela)} SET {atribuicoes} "
+            f"WHERE id >= :inicio AND id < :fim AND ({condicao})",
+            tamanho_lote,
+            pausa,
+            **parametros,
+        )
+        logger.info(f"{total} linhas de {tabela} preenchidas em lotes de {tamanho_lote}")
+        return total
+
+    def executar_em_lotes(
+        self,
+        tabela: str,
+        sql: str,
+        tamanho_lote: int = TAMANHO_LOTE,
+        pausa: float = PAUSA_ENTRE_LOTES,
+        **parametros: Any,
+    ) -> int:
+        """
+        Executa `sql` para cada faixa [:inicio, :fim) dos ids de `tabela`, cada
+        faixa na sua própria transação curta. Retorna o total de linhas afetadas.
+        Disponível apenas em migrações não transacionais.
+        """
+        if self.transacional:
+            raise RuntimeError("Operações em lotes exigem uma migração com TRANSACIONAL = False")
+        minimo, maximo = self.executar(f"SELECT MIN(id), MAX(id) FROM {self.nome(tabela)}").one()
+        if minimo is None:
+            return 0
+        total = 0
+        for inicio in range(minimo, maximo + 1, tamanho_lote):
+            with self.engine.begin() as conexao:
+                total += conexao.execute(
+                    text(sql), {**parametros, "inicio": inicio, "fim": inicio + tamanho_lote}
+                ).rowcount
+            if pausa:
+                time.sleep(pausa)
+        return total
+
+    def gravar_em_lotes(
+        self,
+        sql: str,
+        linhas: Sequence[Dict[str, Any]],
+        tamanho_lote: int = TAMANHO_LOTE,
+        pausa: float = PAUSA_ENTRE_LOTES,
+    ) -> int:
+        """
+        Executa `sql` uma vez para cada linha (executemany), `tamanho_lote`
+        linhas por transação curta. Disponível apenas em migrações não transacionais.
+        """
+        if self.transacional:
+            raise RuntimeError("Operações em lotes exigem uma migração com TRANSACIONAL = False")
+        for inicio in range(0, len(linhas), tamanho_lote):
+            with self.engine.begin() as conexao:
+                conexao.execute(text(sql), list(linhas[inicio:inicio + tamanho_lote]))
+            if pausa:
+                time.sleep(pausa)
+        return len(linhas)
+
+    def _online(self) -> bool:
+        return self.dialeto == "postgresql" and not self.transacional
@@ -0,0 +1,148 @@
+"""
+Recontagem em SQL dos contadores de Book/Movie e UserStats a partir de Rating,
+Follow, bibliotecas e UserReview, usada pelas migrações 0003 e 0004.
+Escrita sobre o esquema da época dessas migrações, sem os modelos do ORM:
+migrações futuras que precisem de outra recontagem devem copiar este código
+em vez de alterá-lo, para que as antigas continuem executáveis.
+"""
+import json
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+FAIXAS_NOTA = 10
+
+
+def faixa_nota(nota: float) -> int:
+    """Índice da faixa de meia estrela da nota (0 -> 0.5, ..., 9 -> 5.0)."""
+    return min(max(int(round(float(nota) * 2)) - 1, 0), FAIXAS_NOTA - 1)
+
+
+def recontar_itens(ctx, tabela: str, coluna: str) -> int:
+    """rating_count, rating_sum e score_histogram de `tabela` (book/movie); `coluna` é rating.book_id/movie_id."""
+    esperado: Dict[int, Dict[str, Any]] = defaultdict(
+        lambda: {"total": 0, "soma": 0.0, "histograma": [0] * FAIXAS_NOTA}
+    )
+    for item_id, nota, total in ctx.executar(
+        f"SELECT {coluna}, score, COUNT(*) FROM rating WHERE {coluna} IS NOT NULL GROUP BY {coluna}, score"
+    ):
+        valores = esperado[item_id]
+        valores["total"] += total
+        valores["soma"] += nota * total
+        valores["histograma"][faixa_nota(nota)] += total
+
+    # Itens que ficaram sem avaliações
+    ctx.executar(
+        f"UPDATE {tabela} SET rating_count = 0, rating_sum = 0, score_histogram = NULL "
+        f"WHERE id NOT IN (SELECT {coluna} FROM rating WHERE {coluna} IS NOT NULL) "
+        f"AND (rating_count <> 0 OR score_histogram IS NOT NULL)"
+    )
+    linhas = [
+        {"id": item_id, "total": v["total"], "soma": v["soma"], "histograma": json.dumps(v["histograma"])}
+        for item_id, v in esperado.items()
+    ]
+    ctx.gravar_em_lotes(
+        f"UPDATE {tabela} SET rating_count = :total, rating_sum = :soma, score_histogram = :histograma "
+        f"WHERE id = :id",
+        linhas,
+    )
+    logger.info(f"Contadores de {len(linhas)} registros de {tabela} recalculados")
+    return len(linhas)
+
+
+def _valores_iniciais() -> Dict[str, Any]:
+    return {
+        "follower_count": 0,
+        "following_count": 0,
+        "rating_count": 0,
+        "rating_sum": 0.0,
+        "score_histogram": [0] * FAIXAS_NOTA,
+        "genre_counts": {},
+        "book_library_count": 0,
+        "movie_library_count": 0,
+        "review_count": 0,
+        "review_sum": 0.0,
+        "review_histogram": [0] * FAIXAS_NOTA,
+    }
+
+
+def _json(valor: Any) -> Any:
+    # SQLite devolve colunas JSON como texto; o PostgreSQL já decodificado
+    return json.loads(valor) if isinstance(valor, str) else valor
+
+
+def recontar_usuarios(ctx) -> int:
+    """Recria os valores de userstats de todos os usuários com alguma atividade."""
+    esperado: Dict[int, Dict[str, Any]] = defaultdict(_valores_iniciais)
+    for sql, campo in (
+        ("SELECT following_id, COUNT(*) FROM follow GROUP BY following_id", "follower_count"),
+        ("SELECT follower_id, COUNT(*) FROM follow GROUP BY follower_id", "following_count"),
+        ("SELECT user_id, COUNT(*) FROM userlibrary GROUP BY user_id", "book_library_count"),
+        ("SELECT user_id, COUNT(*) FROM usermovielibrary GROUP BY user_id", "movie_library_count"),
+    ):
+        for user_id, total in ctx.executar(sql):
+            esperado[user_id][campo] = total
+    for sql, prefixo in (
+        ("SELECT user_id, score, COUNT(*) FROM rating GROUP BY user_id, score", "rating"),
+        ("SELECT target_user_id, rating, COUNT(*) FROM userreview GROUP BY target_user_id, rating", "review"),
+    ):
+        histograma = "score_histogram" if prefixo == "rating" else "review_histogram"
+        for user_id, nota, total in ctx.executar(sql):
+            valores = esperado[user_id]
+            valores[f"{prefixo}_count"] += total
+            valores[f"{prefixo}_sum"] += nota * total
+            valores[histograma][faixa_nota(nota)] += total
+    for tabela, coluna in (("book", "book_id"), ("movie", "movie_id")):
+        generos_por_item = {
+            item_id: _json(generos)
+            for item_id, generos in ctx.executar(
+                f"SELECT id, genres FROM {tabela} WHERE id IN (SELECT {coluna} FROM rating)"
+            )
+        }
+        for user_id, item_id, total in ctx.executar(
+            f"SELECT user_id, {coluna}, COUNT(*) FROM rating WHERE {coluna} IS NOT NULL GROUP BY user_id, {coluna}"
+        ):
+            contagens = esperado[user_id]["genre_counts"]
+            for genero in set(generos_por_item.get(item_id) or []):
+                if genero:
+                    contagens[genero] = contagens.get(genero, 0) + total
+
+    usuarios = {user_id for (user_id,) in ctx.executar(f"SELECT id FROM {ctx.nome('user')}")}
+    existentes = {user_id for (user_id,) in ctx.executar("SELECT user_id FROM userstats")}
+    novas: List[Dict[str, Any]] = []
+    atualizadas: List[Dict[str, Any]] = []
+    for user_id in usuarios:
+        valores = esperado[user_id]
+        if user_id not in existentes and valores == _valores_iniciais():
+            # Usuário sem atividade: a linha é criada na primeira mutação
+            continue
+        linha = {
+            **valores,
+            "user_id": user_id,
+            "score_histogram": json.dumps(valores["score_histogram"]),
+            "genre_counts": json.dumps(valores["genre_counts"]),
+            "review_histogram": json.dumps(valores["review_histogram"]),
+        }
+        (atualizadas if user_id in existentes else novas).append(linha)
+
+    campos = list(_valores_iniciais())
+    ctx.gravar_em_lotes(
+        f"INSERT INTO userstats (user_id, {', '.join(campos)}) "
+        f"VALUES (:user_id, {', '.join(':' + campo for campo in campos)})",
+        novas,
+    )
+    ctx.gravar_em_lotes(
+        f"UPDATE userstats SET {', '.join(f'{campo} = :{campo}' for campo in campos)} WHERE user_id = :user_id",
+        atualizadas,
+    )
+    ctx.executar(f"DELETE FROM userstats WHERE user_id NOT IN (SELECT id FROM {ctx.nome('user')})")
+    logger.info(f"Contadores de {len(novas) + len(atualizadas)} usuários recalculados")
+    return len(novas) + len(atualizadas)
+
+
+def recontar(ctx) -> None:
+    recontar_itens(ctx, "book", "book_id")
+    recontar_itens(ctx, "movie", "movie_id")
+    recontar_usuarios(ctx)
@@ -0,0 +1,138 @@
+"""
+Execução das migrações versionadas de core/migrations/versions.
+Cada arquivo NNNN_descricao.py define up(ctx) e, se reversível, down(ctx); as
+versões aplicadas ficam registradas na tabela schema_migrations.
+"""
+import importlib
+import logging
+import pkgutil
+import re
+import time
+from datetime import datetime
+from types import ModuleType
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, delete, insert, select
+from sqlalchemy.engine import Engine
+
+from core.database import engine as engine_padrao
+from core.migrations import versions
+from core.migrations.contexto import Contexto
+
+logger = logging.getLogger(__name__)
+
+PADRAO_ARQUIVO = re.compile(r"^(\d{4})_(\w+)$")
+
+metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    metadata,
+    Column("version", String, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+    Column("duration_ms", Integer, nullable=False),
+)
+
+
+class Migracao(NamedTuple):
+    versao: str
+    nome: str
+    modulo: ModuleType
+
+    @property
+    def descricao(self) -> str:
+        return self.modulo.__doc__.strip().splitlines()[0] if self.modulo.__doc__ else self.nome
+
+    @property
+    def transacional(self) -> bool:
+        return getattr(self.modulo, "TRANSACIONAL", True)
+
+    @property
+    def reversivel(self) -> bool:
+        return hasattr(self.modulo, "down")
+
+
+def migracoes() -> List[Migracao]:
+    """Migrações disponíveis, em ordem de versão."""
+    encontradas = []
+    for modulo in pkgutil.iter_modules(versions.__path__):
+        correspondencia = PADRAO_ARQUIVO.match(modulo.name)
+        if not correspondencia:
+            continue
+        encontradas.append(Migracao(
+            versao=correspondencia.group(1),
+            nome=correspondencia.group(2),
+            modulo=importlib.import_module(f"{versions.__name__}.{modulo.name}"),
+        ))
+    encontradas.sort(key=lambda migracao: migracao.versao)
+    versoes = [migracao.versao for migracao in encontradas]
+    if len(versoes) != len(set(versoes)):
+        raise RuntimeError(f"Versões de migração duplicadas: {versoes}")
+    return encontradas
+
+
+def aplicadas(engine: Engine = engine_padrao) -> Dict[str, datetime]:
+    metadata.create_all(engine, tables=[schema_migrations])
+    with engine.connect() as conexao:
+        return dict(conexao.execute(select(schema_migrations.c.version, schema_migrations.c.applied_at)).all())
+
+
+def pendentes(engine: Engine = engine_padrao) -> List[Migracao]:
+    ja_aplicadas = aplicadas(engine)
+    return [migracao for migracao in migracoes() if migracao.versao not in ja_aplicadas]
+
+
+def aplicar(ate: Optional[str] = None, engine: Engine = engine_padrao) -> List[Migracao]:
+    """Aplica as migrações pendentes, em ordem, até a versão `ate` (inclusive)."""
+    executadas = []
+    for migracao in pendentes(engine):
+        if ate is not None and migracao.versao > ate:
+            break
+        logger.info(f"Aplicando migração {migracao.versao}: {migracao.descricao}")
+        inicio = time.perf_counter()
+        if migracao.transacional:
+            with engine.begin() as conexao:
+                migracao.modulo.up(Contexto(engine, conexao, transacional=True))
+                _registrar(conexao, migracao, inicio)
+        else:
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conexao:
+                migracao.modulo.up(Contexto(engine, conexao, transacional=False))
+            with engine.begin() as conexao:
+                _registrar(conexao, migracao, inicio)
+        logger.info(f"Migração {migracao.versao} aplicada em {time.perf_counter() - inicio:.2f}s")
+        executadas.append(migracao)
+    return executadas
+
+
+def reverter(passos: int = 1, engine: Engine = engine_padrao) -> List[Migracao]:
+    """Reverte as `passos` últimas migrações aplicadas, da mais recente para a mais antiga."""
+    ja_aplicadas = aplicadas(engine)
+    alvo = [migracao for migracao in migracoes() if migracao.versao in ja_aplicadas][::-1][:passos]
+    irreversiveis = [migracao.versao for migracao in alvo if not migracao.reversivel]
+    if irreversiveis:
+        raise RuntimeError(f"Migrações sem down(): {', '.join(irreversiveis)}")
+    for migracao in alvo:
+        logger.info(f"Revertendo migração {migracao.versao}: {migracao.descricao}")
+        if migracao.transacional:
+            with engine.begin() as conexao:
+                migracao.modulo.down(Contexto(engine, conexao, transacional=True))
+                _remover_registro(conexao, migracao)
+        else:
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conexao:
+                migracao.modulo.down(Contexto(engine, conexao, transacional=False))
+            with engine.begin() as conexao:
+                _remover_registro(conexao, migracao)
+    return alvo
+
+
+def _registrar(conexao, migracao: Migracao, inicio: float) -> None:
+    conexao.execute(insert(schema_migrations).values(
+        version=migracao.versao,
+        name=migracao.nome,
+        applied_at=datetime.utcnow(),
+        duration_ms=int((time.perf_counter() - inicio) * 1000),
+    ))
+
+
+def _remover_registro(conexao, migracao: Migracao) -> None:
+    conexao.execute(delete(schema_migrations).where(schema_migrations.c.version == migracao.versao))
@@ -0,0 +1,12 @@
+"""
+Cria as tabelas dos modelos que ainda não existem.
+Bancos criados antes das migrações já têm as tabelas; as colunas e índices
+adicionados depois vêm nas migrações seguintes.
+"""
+from sqlmodel import SQLModel
+
+from core import models  # noqa: F401 (registra as tabelas em SQLModel.metadata)
+
+
+def up(ctx):
+    SQLModel.metadata.create_all(ctx.conexao)
@@ -0,0 +1,15 @@
+"""
+Adiciona a coluna role à tabela user.
+"""
+TRANSACIONAL = False
+
+
+def up(ctx):
+    ctx.adicionar_coluna("user", "role", "VARCHAR DEFAULT 'normal'")
+    ctx.preencher_em_lotes("user", "role = 'normal'", "role IS NULL")
+    ctx.criar_indice("ix_user_role", "user", ["role"])
+
+
+def down(ctx):
+    ctx.remover_indice("ix_user_role")
+    ctx.remover_coluna("user", "role")
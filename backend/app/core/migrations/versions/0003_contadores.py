@@ -0,0 +1,48 @@
+"""
+Cria a tabela userstats e adiciona as colunas de contadores de Book, Movie e UserStats.
+Os contadores são preenchidos a partir dos dados existentes quando alguma coluna é criada.
+"""
+from core.migrations.recontagem import recontar
+
+TRANSACIONAL = False
+
+# userstats como criada originalmente; as demais colunas vêm de COLUNAS
+CRIAR_USERSTATS = """
+CREATE TABLE IF NOT EXISTS userstats (
+    user_id INTEGER NOT NULL PRIMARY KEY REFERENCES {user} (id),
+    follower_count INTEGER NOT NULL DEFAULT 0,
+    following_count INTEGER NOT NULL DEFAULT 0,
+    rating_count INTEGER NOT NULL DEFAULT 0,
+    rating_sum FLOAT NOT NULL DEFAULT 0
+)
+"""
+
+COLUNAS = [
+    ("book", "rating_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("book", "rating_sum", "FLOAT NOT NULL DEFAULT 0"),
+    ("movie", "rating_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("movie", "rating_sum", "FLOAT NOT NULL DEFAULT 0"),
+    ("book", "score_histogram", "JSON"),
+    ("movie", "score_histogram", "JSON"),
+    ("userstats", "score_histogram", "JSON"),
+    ("userstats", "genre_counts", "JSON"),
+    ("userstats", "book_library_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("userstats", "movie_library_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("userstats", "review_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("userstats", "review_sum", "FLOAT NOT NULL DEFAULT 0"),
+    ("userstats", "review_histogram", "JSON"),
+]
+
+
+def up(ctx):
+    ctx.executar(CRIAR_USERSTATS.format(user=ctx.nome("user")))
+    adicionadas = [ctx.adicionar_coluna(tabela, coluna, tipo) for tabela, coluna, tipo in COLUNAS]
+    if any(adicionadas):
+        recontar(ctx)
+
+
+def down(ctx):
+    for tabela, coluna, _ in reversed(COLUNAS):
+        if tabela != "userstats":
+            ctx.remover_coluna(tabela, coluna)
+    ctx.executar("DROP TABLE IF EXISTS userstats")
@@ -0,0 +1,96 @@
+"""
+Avaliações únicas por usuário e item.
+Unifica livros/filmes com o mesmo external_id (as avaliações passam para o
+registro mais antigo), remove avaliações duplicadas, mantendo a mais recente
+(as denúncias das removidas passam para ela), e cria os índices únicos de
+Book, Movie e Rating. Os contadores são
+recalculados e os perfis de gosto afetados descartados.
+Cada passo pode ser repetido se a migração for interrompida.
+"""
+import logging
+from typing import List, Tuple
+
+from sqlalchemy import bindparam, text
+
+from core.migrations.recontagem import recontar
+
+logger = logging.getLogger(__name__)
+
+TRANSACIONAL = False
+TAMANHO_LOTE = 500
+
+INDICES = [
+    ("uq_book_external_id", "book", ["external_id"]),
+    ("uq_movie_external_id", "movie", ["external_id"]),
+    ("uq_rating_user_book", "rating", ["user_id", "book_id"]),
+    ("uq_rating_user_movie", "rating", ["user_id", "movie_id"]),
+]
+
+
+def up(ctx):
+    itens_unificados = 0
+    for tabela, coluna in (("book", "book_id"), ("movie", "movie_id")):
+        for id_externo, manter in ctx.executar(
+            f"SELECT external_id, MIN(id) FROM {tabela} WHERE external_id IS NOT NULL "
+            f"GROUP BY external_id HAVING COUNT(*) > 1"
+        ).all():
+            ctx.executar(
+                f"UPDATE rating SET {coluna} = :manter WHERE {coluna} IN "
+                f"(SELECT id FROM {tabela} WHERE external_id = :id_externo AND id <> :manter)",
+                manter=manter, id_externo=id_externo,
+            )
+            itens_unificados += ctx.executar(
+                f"DELETE FROM {tabela} WHERE external_id = :id_externo AND id <> :manter",
+                manter=manter, id_externo=id_externo,
+            ).rowcount
+    logger.info(f"{itens_unificados} registros duplicados do catálogo unificados")
+
+    # (avaliação duplicada, avaliação mantida)
+    duplicadas: List[Tuple[int, int]] = []
+    usuarios_afetados = set()
+    for coluna in ("book_id", "movie_id"):
+        for user_id, item_id in ctx.executar(
+            f"SELECT user_id, {coluna} FROM rating WHERE {coluna} IS NOT NULL "
+            f"GROUP BY user_id, {coluna} HAVING COUNT(*) > 1"
+        ).all():
+            ids = ctx.executar(
+                f"SELECT id FROM rating WHERE user_id = :user_id AND {coluna} = :item_id "
+                f"ORDER BY created_at DESC, id DESC",
+                user_id=user_id, item_id=item_id,
+            ).scalars().all()
+            duplicadas.extend((duplicada, ids[0]) for duplicada in ids[1:])
+            usuarios_afetados.add(user_id)
+
+    logger.info(f"{len(duplicadas)} avaliações duplicadas de {len(usuarios_afetados)} usuários")
+    for inicio in range(0, len(duplicadas), TAMANHO_LOTE):
+        lote = duplicadas[inicio:inicio + TAMANHO_LOTE]
+        ctx.conexao.execute(
+            text(
+                "UPDATE report SET target_id = :mantida "
+                "WHERE report_type = 'rating' AND target_id = :duplicada"
+            ),
+            [{"duplicada": duplicada, "mantida": mantida} for duplicada, mantida in lote],
+        )
+        ids_lote = [duplicada for duplicada, _ in lote]
+        for sql in (
+            "DELETE FROM timelineinboxentry WHERE rating_id IN :ids",
+            "DELETE FROM rating WHERE id IN :ids",
+        ):
+            ctx.conexao.execute(text(sql).bindparams(bindparam("ids", expanding=True)), {"ids": ids_lote})
+    if usuarios_afetados:
+        # Reconstruídos na próxima leitura
+        ctx.conexao.execute(
+            text("DELETE FROM usertasteprofile WHERE user_id IN :ids").bindparams(bindparam("ids", expanding=True)),
+            {"ids": sorted(usuarios_afetados)},
+        )
+
+    for nome, tabela, colunas in INDICES:
+        ctx.criar_indice(nome, tabela, colunas, unico=True)
+
+    if itens_unificados or duplicadas:
+        recontar(ctx)
+
+
+def down(ctx):
+    for nome, _, _ in reversed(INDICES):
+        ctx.remover_indice(nome)
@@ -0,0 +1,30 @@
+"""
+Índices das consultas de timeline, atividades, seguidores e avaliações.
+Criados sem bloquear as escritas (CONCURRENTLY no PostgreSQL). Inclui
+ix_rating_book e ix_rating_movie, usados ao listar e remover as avaliações de um item.
+"""
+TRANSACIONAL = False
+
+INDICES = [
+    ("ix_rating_user_created", "rating", ["user_id", "created_at"]),
+    ("ix_rating_created", "rating", ["created_at"]),
+    ("ix_rating_book", "rating", ["book_id"]),
+    ("ix_rating_movie", "rating", ["movie_id"]),
+    ("ix_userreview_target_created", "userreview", ["target_user_id", "created_at"]),
+    ("ix_userreview_author_created", "userreview", ["author_user_id", "created_at"]),
+    ("ix_activityevent_actor_created", "activityevent", ["actor_id", "created_at"]),
+    ("ix_activityevent_created", "activityevent", ["created_at"]),
+    ("ix_timelineinboxentry_owner_created", "timelineinboxentry", ["owner_id", "created_at"]),
+    ("ix_follow_following_created", "follow", ["following_id", "created_at"]),
+    ("ix_follow_follower_created", "follow", ["follower_id", "created_at"]),
+]
+
+
+def up(ctx):
+    for nome, tabela, colunas in INDICES:
+        ctx.criar_indice(nome, tabela, colunas)
+
+
+def down(ctx):
+    for nome, _, _ in reversed(INDICES):
+        ctx.remover_indice(nome)
@@ -0,0 +1,55 @@
+"""
+Preenche as caixas de entrada da timeline "apenas seguindo" a partir de Follow e Rating.
+Bancos anteriores à caixa de entrada começam com ela vazia; aqui cada seguidor
+recebe as avaliações mais recentes de quem segue, como core/rebuild_timeline_inbox.py,
+em lotes de seguidores. Autores acima do limite de fan-out são lidos sob demanda
+e ficam de fora. Entradas já existentes são mantidas.
+"""
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+TRANSACIONAL = False
+TAMANHO_LOTE = 200
+
+# Mesmas variáveis de services/feed.py
+LIMITE_SEGUIDORES_FAN_OUT = int(os.getenv("FEED_FANOUT_MAX_FOLLOWERS", "5000"))
+AVALIACOES_POR_CAIXA = int(os.getenv("FEED_REBUILD_SIZE", "500"))
+
+PREENCHER_CAIXAS = """
+INSERT INTO timelineinboxentry (owner_id, rating_id, author_id, created_at)
+SELECT owner_id, rating_id, author_id, created_at FROM (
+    SELECT
+        f.follower_id AS owner_id,
+        r.id AS rating_id,
+        r.user_id AS author_id,
+        r.created_at AS created_at,
+        ROW_NUMBER() OVER (PARTITION BY f.follower_id ORDER BY r.created_at DESC, r.id DESC) AS posicao
+    FROM follow f
+    JOIN rating r ON r.user_id = f.following_id
+    WHERE f.follower_id >= :inicio AND f.follower_id < :fim
+      AND (SELECT COUNT(*) FROM follow s WHERE s.following_id = f.following_id) <= :limite_seguidores
+) candidatas
+WHERE posicao <= :por_caixa
+  AND NOT EXISTS (
+      SELECT 1 FROM timelineinboxentry t
+      WHERE t.owner_id = candidatas.owner_id AND t.rating_id = candidatas.rating_id
+  )
+"""
+
+
+def up(ctx):
+    total = ctx.executar_em_lotes(
+        "user",
+        PREENCHER_CAIXAS,
+        TAMANHO_LOTE,
+        limite_seguidores=LIMITE_SEGUIDORES_FAN_OUT,
+        por_caixa=AVALIACOES_POR_CAIXA,
+    )
+    logger.info(f"{total} entradas adicionadas às caixas de entrada da timeline")
+
+
+def down(ctx):
+    # Dados derivados, válidos também sem esta migração: nada a desfazer
+    pass
@@ -0,0 +1,61 @@
+"""
+Preenche o log de atividades (ActivityEvent) a partir de Rating, Follow, bibliotecas e UserReview.
+Bancos anteriores ao log o têm vazio ou incompleto, e /users/{id}/activities
+passa a lê-lo; aqui cada linha de origem sem evento correspondente recebe um,
+como core/backfill_activity_events.py, em lotes de ids. Eventos já existentes são mantidos.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+TRANSACIONAL = False
+TAMANHO_LOTE = 1000
+
+INSERIR = """
+INSERT INTO activityevent (actor_id, verb, object_type, object_id, payload, created_at)
+SELECT {ator}, '{verbo}', {tipo}, {objeto}, {payload}, o.created_at
+FROM {tabela} o
+WHERE o.id >= :inicio AND o.id < :fim
+  AND NOT EXISTS (
+      SELECT 1 FROM activityevent e
+      WHERE e.actor_id = {ator} AND e.verb = '{verbo}'
+        AND e.object_type = {tipo} AND e.object_id = {objeto}
+  )
+"""
+
+
+def _fontes(funcao_json):
+    """(tabela de origem, ator, verbo, tipo do objeto, id do objeto, payload) de cada evento."""
+    return [
+        (
+            "rating", "o.user_id", "rated", "'rating'", "CAST(o.id AS VARCHAR)",
+            f"CASE WHEN o.book_id IS NOT NULL THEN {funcao_json}('score', o.score, 'book_id', o.book_id) "
+            f"WHEN o.movie_id IS NOT NULL THEN {funcao_json}('score', o.score, 'movie_id', o.movie_id) "
+            f"ELSE {funcao_json}('score', o.score) END",
+        ),
+        ("follow", "o.follower_id", "followed", "'user'", "CAST(o.following_id AS VARCHAR)", "NULL"),
+        ("userlibrary", "o.user_id", "library_added", "'book'", "o.book_external_id", "NULL"),
+        ("usermovielibrary", "o.user_id", "library_added", "'movie'", "o.movie_external_id", "NULL"),
+        (
+            "userreview", "o.author_user_id", "reviewed_user", "'user'", "CAST(o.target_user_id AS VARCHAR)",
+            f"{funcao_json}('review_id', o.id, 'rating', o.rating)",
+        ),
+    ]
+
+
+def up(ctx):
+    funcao_json = "json_build_object" if ctx.dialeto == "postgresql" else "json_object"
+    for tabela, ator, verbo, tipo, objeto, payload in _fontes(funcao_json):
+        total = ctx.executar_em_lotes(
+            tabela,
+            INSERIR.format(
+                tabela=tabela, ator=ator, verbo=verbo, tipo=tipo, objeto=objeto, payload=payload
+            ),
+            TAMANHO_LOTE,
+        )
+        logger.info(f"{total} eventos '{verbo}' gerados a partir de {tabela}")
+
+
+def down(ctx):
+    # Eventos válidos também sem esta migração: nada a desfazer
+    pass
@@ -0,0 +1,39 @@
+"""
+Contadores de popularidade gravados por bucket (TrendingBucket) no lugar dos
+totais por janela de TrendingCounter. Os totais antigos não indicam a que
+bucket pertencem e são descartados; as janelas se refazem com os novos eventos.
+"""
+
+
+def _tipo_data(ctx) -> str:
+    return "TIMESTAMP" if ctx.dialeto == "postgresql" else "DATETIME"
+
+
+def up(ctx):
+    ctx.executar(f"""
+        CREATE TABLE IF NOT EXISTS trendingbucket (
+            media_type VARCHAR NOT NULL,
+            period VARCHAR NOT NULL,
+            bucket_start {_tipo_data(ctx)} NOT NULL,
+            item_id VARCHAR NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (media_type, period, bucket_start, item_id)
+        )
+    """)
+    ctx.criar_indice("ix_trendingbucket_period_start", "trendingbucket", ["media_type", "period", "bucket_start"])
+    ctx.executar("DROP TABLE IF EXISTS trendingcounter")
+
+
+def down(ctx):
+    ctx.executar(f"""
+        CREATE TABLE IF NOT EXISTS trendingcounter (
+            media_type VARCHAR NOT NULL,
+            period VARCHAR NOT NULL,
+            item_id VARCHAR NOT NULL,
+            score INTEGER NOT NULL DEFAULT 0,
+            updated_at {_tipo_data(ctx)} NOT NULL,
+            PRIMARY KEY (media_type, period, item_id)
+        )
+    """)
+    ctx.remover_indice("ix_trendingbucket_period_start")
+    ctx.executar("DROP TABLE IF EXISTS trendingbucket")
@@ -0,0 +1,31 @@
+"""
+Adiciona a coluna pendente a book e movie: marca os registros provisórios que
+ainda aguardam os dados das APIs externas, no lugar do título "Sem título".
+Os provisórios existentes são os registros com esse título e nenhum outro dado
+além do id externo.
+"""
+TRANSACIONAL = False
+
+CAMPOS_VAZIOS = {
+    "book": ("author", "description", "cover_url"),
+    "movie": ("director", "description", "cover_url"),
+}
+
+
+def up(ctx):
+    for tabela, campos in CAMPOS_VAZIOS.items():
+        ctx.adicionar_coluna(tabela, "pendente", "BOOLEAN NOT NULL DEFAULT FALSE")
+        ctx.preencher_em_lotes(
+            tabela,
+            "pendente = TRUE",
+            "title = :titulo AND external_id IS NOT NULL AND "
+            + " AND ".join(f"{campo} IS NULL" for campo in campos),
+            titulo="Sem título",
+        )
+        ctx.criar_indice(f"ix_{tabela}_pendente", tabela, ["pendente"])
+
+
+def down(ctx):
+    for tabela in CAMPOS_VAZIOS:
+        ctx.remover_indice(f"ix_{tabela}_pendente")
+        ctx.remover_coluna(tabela, "pendente")
@@ -0,0 +1,7 @@
+"""
+Migrações NNNN_descricao.py, aplicadas em ordem de versão. Cada uma define
+up(ctx) e, se reversível, down(ctx), recebendo um core.migrations.contexto.Contexto.
+Migrações com TRANSACIONAL = False rodam fora de transação (índices concorrentes,
+preenchimentos em lotes). O SQLite não inclui DDL na transação aberta pelo driver,
+então todas as migrações devem poder ser executadas de novo após uma falha.
+"""
@@ -1,6 +1,6 @@
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column, JSON, UniqueConstraint
-from typing import List, Optional
+from sqlalchemy import Column, Index, JSON, UniqueConstraint
+from typing import Any, Dict, List, Optional
 from datetime import datetime, date
 from enum import Enum
 
@@ -52,8 +52,17 @@ class Book(SQLModel, table=True):
     genres: Optional[List[str]] = Field(default=None, sa_column=Column(JSON))
     is_banned: bool = Field(default=False, index=True)
     is_muted: bool = Field(default=False, index=True)
+    rating_count: int = Field(default=0)
+    rating_sum: float = Field(default=0)
+    score_histogram: Optional[List[int]] = Field(default=None, sa_column=Column(JSON))
+    # Registro provisório aguardando os dados do Google Books (services/catalog.py)
+    pendente: bool = Field(default=False, index=True)
     ratings: List["Rating"] = Relationship(back_populates="book")
 
+    __table_args__ = (
+        Index("uq_book_external_id", "external_id", unique=True),
+    )
+
 
 class Movie(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -67,8 +76,17 @@ class Movie(SQLModel, table=True):
     cast: Optional[List[str]] = Field(default=None, sa_column=Column(JSON))
     is_banned: bool = Field(default=False, index=True)
     is_muted: bool = Field(default=False, index=True)
+    rating_count: int = Field(default=0)
+    rating_sum: float = Field(default=0)
+    score_histogram: Optional[List[int]] = Field(default=None, sa_column=Column(JSON))
+    # Registro provisório aguardando os dados do OMDb (services/catalog.py)
+    pendente: bool = Field(default=False, index=True)
     ratings: List["Rating"] = Relationship(back_populates="movie")
 
+    __table_args__ = (
+        Index("uq_movie_external_id", "external_id", unique=True),
+    )
+
 
 class Rating(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -83,12 +101,22 @@ class Rating(SQLModel, table=True):
     book: Optional["Book"] = Relationship(back_populates="ratings")
     movie: Optional["Movie"] = Relationship(back_populates="ratings")
 
+    __table_args__ = (
+        Index("ix_rating_user_created", "user_id", "created_at"),
+        Index("ix_rating_created", "created_at"),
+        Index("ix_rating_book", "book_id"),
+        Index("ix_rating_movie", "movie_id"),
+        Index("uq_rating_user_book", "user_id", "book_id", unique=True),
+        Index("uq_rating_user_movie", "user_id", "movie_id", unique=True),
+    )
+
 
 class Recommendation(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="user.id")
-    recommended_books: Optional[List[int]] = Field(default=None, sa_column=Column(JSON))
-    recommended_movies: Optional[List[int]] = Field(default=None, sa_column=Column(JSON))
+    user_id: int = Field(foreign_key="user.id", index=True)
+    # Itens completos (BookRead/Movie), servidos pelas rotas de recomendação
+    recommended_books: Optional[List[Dict[str, Any]]] = Field(default=None, sa_column=Column(JSON))
+    recommended_movies: Optional[List[Dict[str, Any]]] = Field(default=None, sa_column=Column(JSON))
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     user: "User" = Relationship(back_populates="recommendations")
@@ -117,6 +145,11 @@ class UserReview(SQLModel, table=True):
         },
     )
 
+    __table_args__ = (
+        Index("ix_userreview_target_created", "target_user_id", "created_at"),
+        Index("ix_userreview_author_created", "author_user_id", "created_at"),
+    )
+
 
 class UserProfile(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -144,6 +177,75 @@ class UserMovieLibrary(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class UserTasteProfile(SQLModel, table=True):
+    """Afinidade do usuário por gêneros/autores, mantida incrementalmente."""
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    book_genres: Optional[Dict[str, float]] = Field(default=None, sa_column=Column(JSON))
+    book_authors: Optional[Dict[str, float]] = Field(default=None, sa_column=Column(JSON))
+    movie_genres: Optional[Dict[str, float]] = Field(default=None, sa_column=Column(JSON))
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TrendingBucket(SQLModel, table=True):
+    """Soma dos eventos de popularidade de um item em um bucket de uma janela (início em UTC)."""
+    media_type: str = Field(primary_key=True)
+    period: str = Field(primary_key=True)
+    bucket_start: datetime = Field(primary_key=True)
+    item_id: str = Field(primary_key=True)
+    count: int = Field(default=0)
+
+    __table_args__ = (
+        Index("ix_trendingbucket_period_start", "media_type", "period", "bucket_start"),
+    )
+
+
+class UserStats(SQLModel, table=True):
+    """Contadores do usuário, mantidos na mesma transação de follows e avaliações."""
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    follower_count: int = Field(default=0)
+    following_count: int = Field(default=0)
+    rating_count: int = Field(default=0)
+    rating_sum: float = Field(default=0)
+    # Quantidade de avaliações por faixa de meia estrela (0.5, 1.0, ..., 5.0)
+    score_histogram: Optional[List[int]] = Field(default=None, sa_column=Column(JSON))
+    # Quantidade de avaliações por gênero dos livros/filmes avaliados
+    genre_counts: Optional[Dict[str, int]] = Field(default=None, sa_column=Column(JSON))
+    book_library_count: int = Field(default=0)
+    movie_library_count: int = Field(default=0)
+    # Avaliações (UserReview) recebidas de outros usuários
+    review_count: int = Field(default=0)
+    review_sum: float = Field(default=0)
+    review_histogram: Optional[List[int]] = Field(default=None, sa_column=Column(JSON))
+
+
+class ActivityEvent(SQLModel, table=True):
+    """Registro append-only das ações dos usuários (avaliações, follows, biblioteca, reviews)."""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    actor_id: int = Field(foreign_key="user.id")
+    verb: str
+    object_type: str
+    object_id: str
+    payload: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_activityevent_actor_created", "actor_id", "created_at"),
+        Index("ix_activityevent_created", "created_at"),
+    )
+
+
+class TimelineInboxEntry(SQLModel, table=True):
+    """Avaliação de um usuário seguido, distribuída para a timeline do seguidor."""
+    owner_id: int = Field(foreign_key="user.id", primary_key=True)
+    rating_id: int = Field(foreign_key="rating.id", primary_key=True, ondelete="CASCADE")
+    author_id: int = Field(foreign_key="user.id", index=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_timelineinboxentry_owner_created", "owner_id", "created_at"),
+    )
+
+
 class Follow(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     follower_id: int = Field(foreign_key="user.id", index=True)
@@ -152,6 +254,8 @@ class Follow(SQLModel, table=True):
     
     __table_args__ = (
         UniqueConstraint("follower_id", "following_id", name="unique_follow"),
+        Index("ix_follow_following_created", "following_id", "created_at"),
+        Index("ix_follow_follower_created", "follower_id", "created_at"),
     )
 
 
@@ -208,3 +312,26 @@ class Moderation(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+
+class ImportJobStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ImportJob(SQLModel, table=True):
+    """Importação em lote de avaliações a partir de um arquivo CSV/NDJSON."""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id", index=True)
+    filename: Optional[str] = None
+    format: str
+    status: str = Field(default=ImportJobStatus.PENDING.value, index=True)
+    total_rows: int = Field(default=0)
+    imported: int = Field(default=0)
+    skipped: int = Field(default=0)
+    failed: int = Field(default=0)
+    pending_items: int = Field(default=0)
+    errors: Optional[List[Dict[str, Any]]] = Field(default=None, sa_column=Column(JSON))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
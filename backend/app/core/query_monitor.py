@@ -0,0 +1,199 @@
+"""
+Instrumentação das consultas SQL por requisição.
+Os eventos de cursor de todas as engines (principal, réplicas e as engines
+síncronas por trás das assíncronas) contam as consultas e somam o tempo no
+banco da requisição atual, aberta pelo middleware em main.py. Com
+SQL_DEBUG_HEADERS ativo, a resposta inclui X-DB-Queries, X-DB-Time-Ms e
+Server-Timing; os totais por rota ficam em GET /metrics/sql.
+
+Detector de N+1: a mesma consulta (parâmetros e listas de IN normalizados)
+executada mais de SQL_N_PLUS_ONE_THRESHOLD vezes em uma requisição é registrada
+como suspeita. Com SQL_N_PLUS_ONE_MODE=raise (testes/CI) a requisição falha
+com ConsultasRepetidas. Scripts e testes podem usar monitorar() diretamente.
+"""
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from core import config
+
+logger = logging.getLogger(__name__)
+
+CABECALHO_CONSULTAS = "X-DB-Queries"
+CABECALHO_TEMPO = "X-DB-Time-Ms"
+MAX_ALERTAS = 50
+TAMANHO_CONSULTA_ALERTA = 300
+
+PARAMETRO = re.compile(r"\?|%\(\w+\)s|%s|\$\d+|(?<!:):\w+")
+LISTA_PARAMETROS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+ESPACOS = re.compile(r"\s+")
+
+
+class ConsultasRepetidas(RuntimeError):
+    """Levantada no modo raise quando uma consulta se repete acima do limite na mesma requisição."""
+
+    def __init__(self, descricao: str, repetidas: List[Tuple[str, int]]):
+        self.repetidas = repetidas
+        detalhes = "; ".join(f"{vezes}x {consulta}" for consulta, vezes in repetidas)
+        super().__init__(f"Possível N+1 em {descricao}: {detalhes}")
+
+
+class Monitoramento:
+    """
+    Consultas executadas em uma requisição (ou bloco monitorar()). Seguro para
+    uso entre threads: rotas síncronas e tarefas em to_thread registram no mesmo objeto.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.consultas = 0
+        self.tempo = 0.0
+        self.formas: Counter = Counter()
+
+    @property
+    def tempo_ms(self) -> float:
+        return round(self.tempo * 1000, 2)
+
+    def registrar(self, instrucao: str, duracao: float) -> None:
+        chave = forma(instrucao)
+        with self._lock:
+            self.consultas += 1
+            self.tempo += duracao
+            self.formas[chave] += 1
+
+    def repetidas(self, limite: int) -> List[Tuple[str, int]]:
+        with self._lock:
+            mais_comuns = self.formas.most_common()
+        return [(consulta, vezes) for consulta, vezes in mais_comuns if vezes > limite]
+
+
+_atual: ContextVar[Optional[Monitoramento]] = ContextVar("monitoramento_sql", default=None)
+
+
+def forma(instrucao: str) -> str:
+    """Consulta sem os parâmetros, para agrupar execuções da mesma instrução."""
+    instrucao = PARAMETRO.sub("?", instrucao)
+    instrucao = LISTA_PARAMETROS.sub("(?)", instrucao)
+    return ESPACOS.sub(" ", instrucao).strip()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes(conexao, cursor, instrucao, parametros, contexto, executemany) -> None:
+    if _atual.get() is not None:
+        conexao.info.setdefault("inicio_consultas", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _depois(conexao, cursor, instrucao, parametros, contexto, executemany) -> None:
+    monitoramento = _atual.get()
+    inicios = conexao.info.get("inicio_consultas")
+    if monitoramento is None or not inicios:
+        return
+    monitoramento.registrar(instrucao, time.perf_counter() - inicios.pop())
+
+
+@contextmanager
+def monitorar() -> Iterator[Monitoramento]:
+    """Conta as consultas executadas dentro do bloco (inclusive em threads e tarefas iniciadas nele)."""
+    monitoramento = Monitoramento()
+    token = _atual.set(monitoramento)
+    try:
+        yield monitoramento
+    finally:
+        _atual.reset(token)
+
+
+def verificar(monitoramento: Monitoramento, descricao: str) -> List[Tuple[str, int]]:
+    """Aplica o detector de N+1 conforme SQL_N_PLUS_ONE_MODE e retorna as consultas repetidas."""
+    if config.SQL_N_PLUS_ONE_MODE == "off":
+        return []
+    repetidas = monitoramento.repetidas(config.SQL_N_PLUS_ONE_THRESHOLD)
+    if not repetidas:
+        return []
+    if config.SQL_N_PLUS_ONE_MODE == "raise":
+        raise ConsultasRepetidas(descricao, repetidas)
+    for consulta, vezes in repetidas:
+        logger.warning(f"Possível N+1 em {descricao}: {vezes} execuções de {consulta}")
+    return repetidas
+
+
+class MetricasRotas:
+    """Totais de consultas por rota e alertas de N+1 recentes, seguros para uso entre threads."""
+
+    def __init__(self, max_alertas: int = MAX_ALERTAS):
+        self._lock = threading.Lock()
+        self._rotas: Dict[str, Dict[str, Any]] = {}
+        self._alertas: Deque[Dict[str, Any]] = deque(maxlen=max_alertas)
+
+    def registrar(self, rota: str, monitoramento: Monitoramento, repetidas: List[Tuple[str, int]]) -> None:
+        with self._lock:
+            totais = self._rotas.setdefault(rota, {
+                "requests": 0, "queries": 0, "db_time_ms": 0.0, "max_queries": 0, "n_plus_one": 0,
+            })
+            totais["requests"] += 1
+            totais["queries"] += monitoramento.consultas
+            totais["db_time_ms"] += monitoramento.tempo * 1000
+            totais["max_queries"] = max(totais["max_queries"], monitoramento.consultas)
+            if repetidas:
+                totais["n_plus_one"] += 1
+            for consulta, vezes in repetidas:
+                self._alertas.appendleft({
+                    "route": rota,
+                    "query": consulta[:TAMANHO_CONSULTA_ALERTA],
+                    "executions": vezes,
+                    "at": datetime.utcnow().isoformat(),
+                })
+
+    def resumo(self) -> Dict[str, Any]:
+        with self._lock:
+            rotas = [
+                {
+                    "route": rota,
+                    **totais,
+                    "db_time_ms": round(totais["db_time_ms"], 2),
+                    "avg_queries": round(totais["queries"] / totais["requests"], 2),
+                    "avg_db_time_ms": round(totais["db_time_ms"] / totais["requests"], 2),
+                }
+                for rota, totais in self._rotas.items()
+            ]
+            alertas = list(self._alertas)
+        rotas.sort(key=lambda r: r["db_time_ms"], reverse=True)
+        return {"routes": rotas, "n_plus_one_alerts": alertas}
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._rotas.clear()
+            self._alertas.clear()
+
+
+metricas = MetricasRotas()
+
+
+def nome_rota(request: Request) -> str:
+    """Método e caminho declarado da rota (ex.: GET /users/{user_id}), para não separar por id."""
+    rota = request.scope.get("route")
+    return f"{request.method} {getattr(rota, 'path', '(sem rota)')}"
+
+
+def finalizar(request: Request, resposta: Response, monitoramento: Monitoramento) -> None:
+    """
+    Chamado pelo middleware ao fim da requisição. Respostas em streaming
+    contam apenas as consultas feitas até o envio dos cabeçalhos.
+    """
+    rota = nome_rota(request)
+    repetidas = verificar(monitoramento, rota)
+    metricas.registrar(rota, monitoramento, repetidas)
+    if config.SQL_DEBUG_HEADERS:
+        resposta.headers[CABECALHO_CONSULTAS] = str(monitoramento.consultas)
+        resposta.headers[CABECALHO_TEMPO] = f"{monitoramento.tempo_ms:.2f}"
+        resposta.headers["Server-Timing"] = f"db;dur={monitoramento.tempo_ms:.2f}"
@@ -0,0 +1,74 @@
+import argparse
+import logging
+from typing import List, Optional, Sequence
+
+from sqlmodel import Session, select
+
+from core.database import engine
+from core.models import User
+from services.feed import AVALIACOES_POR_CAIXA, reconstruir_caixa
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE_PADRAO = 200
+
+
+def reconstruir_caixas(
+    ids_usuarios: Optional[List[int]] = None,
+    por_usuario: int = AVALIACOES_POR_CAIXA,
+    tamanho_lote: int = TAMANHO_LOTE_PADRAO,
+) -> int:
+    """
+    Recria as caixas de entrada da timeline a partir da tabela Follow.
+    Usado após mudanças no limite de fan-out ou para corrigir distribuições perdidas.
+    Cada lote de usuários é gravado em uma transação.
+    """
+    with Session(engine) as session:
+        if ids_usuarios is None:
+            ids_usuarios = list(session.exec(select(User.id).order_by(User.id)).all())
+
+        total = 0
+        for inicio in range(0, len(ids_usuarios), tamanho_lote):
+            for user_id in ids_usuarios[inicio:inicio + tamanho_lote]:
+                total += reconstruir_caixa(session, user_id, por_usuario)
+            session.commit()
+            logger.info(
+                "Caixas reconstruídas: %s/%s usuários",
+                min(inicio + tamanho_lote, len(ids_usuarios)),
+                len(ids_usuarios),
+            )
+
+    logger.info("Reconstrução concluída (%s entradas).", total)
+    return total
+
+
+def _parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Reconstrói as caixas de entrada da timeline \"apenas seguindo\"."
+    )
+    parser.add_argument(
+        "--user",
+        type=int,
+        action="append",
+        dest="users",
+        help="Reconstrói apenas a caixa deste usuário (pode ser repetido).",
+    )
+    parser.add_argument(
+        "--per-user",
+        type=int,
+        default=AVALIACOES_POR_CAIXA,
+        help="Quantidade máxima de avaliações por caixa de entrada.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=TAMANHO_LOTE_PADRAO,
+        help="Quantidade de usuários por transação.",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    args = _parse_args()
+    reconstruir_caixas(args.users, por_usuario=args.per_user, tamanho_lote=args.batch_size)
@@ -0,0 +1,243 @@
+import argparse
+import logging
+import multiprocessing
+import os
+from collections import defaultdict
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import delete, insert
+from sqlmodel import Session, select
+
+from core.database import engine
+from core.models import (
+    ActivityEvent,
+    Rating,
+    Recommendation,
+    User,
+    UserLibrary,
+    UserMovieLibrary,
+    UserTasteProfile,
+)
+from services.api_clients import buscar_dados_filme, buscar_detalhes_filme
+from services.google_books import buscar_livros, obter_livro_por_id
+from services.recommendations import (
+    LIMITE_RECOMENDACOES,
+    VERBOS_QUE_ALTERAM,
+    recomendar_filmes,
+    recomendar_livros,
+)
+from services.taste_profile import principais, reconstruir_perfil
+from services.trending import ids_populares_gravados
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_LOTE_PADRAO = 500
+TAMANHO_CACHE_API = 20000
+
+
+def recomputar_recomendacoes(
+    since: Optional[datetime] = None,
+    processos: Optional[int] = None,
+    tamanho_lote: int = TAMANHO_LOTE_PADRAO,
+) -> int:
+    """
+    Recalcula as recomendações de todos os usuários (ou apenas dos que tiveram
+    alterações na biblioteca/avaliações desde `since`) usando um pool de processos.
+    Cada processo recebe um lote de usuários e grava o resultado em uma única transação.
+    """
+    processos = processos or os.cpu_count() or 1
+    ids_usuarios = _usuarios_alvo(since)
+    if not ids_usuarios:
+        logger.info("Nenhum usuário para recalcular recomendações.")
+        return 0
+
+    lotes = list(_dividir_em_lotes(ids_usuarios, tamanho_lote))
+    logger.info(
+        "Recalculando recomendações de %s usuários em %s lotes com %s processos.",
+        len(ids_usuarios),
+        len(lotes),
+        processos,
+    )
+
+    total = 0
+    with multiprocessing.Pool(processes=processos, initializer=_inicializar_processo) as pool:
+        for gravados in pool.imap_unordered(_processar_lote, lotes):
+            total += gravados
+            logger.info("Recomendações gravadas: %s/%s", total, len(ids_usuarios))
+
+    logger.info("Recálculo de recomendações concluído (%s usuários).", total)
+    return total
+
+
+def _usuarios_alvo(since: Optional[datetime]) -> List[int]:
+    with Session(engine) as session:
+        if since is None:
+            return list(session.exec(select(User.id).where(User.is_banned == False)).all())  # noqa: E712
+
+        alterados = set()
+        for coluna_usuario, coluna_data in (
+            (UserLibrary.user_id, UserLibrary.created_at),
+            (UserMovieLibrary.user_id, UserMovieLibrary.created_at),
+            (Rating.user_id, Rating.created_at),
+        ):
+            alterados.update(
+                session.exec(select(coluna_usuario).where(coluna_data >= since).distinct()).all()
+            )
+        # Edições e remoções só deixam rastro no log de atividades
+        alterados.update(session.exec(
+            select(ActivityEvent.actor_id)
+            .where(ActivityEvent.created_at >= since)
+            .where(ActivityEvent.verb.in_(VERBOS_QUE_ALTERAM))
+            .distinct()
+        ).all())
+        return sorted(alterados)
+
+
+def _dividir_em_lotes(ids: Sequence[int], tamanho: int) -> Iterator[List[int]]:
+    for inicio in range(0, len(ids), tamanho):
+        yield list(ids[inicio:inicio + tamanho])
+
+
+def _inicializar_processo() -> None:
+    # Conexões herdadas do processo pai não podem ser compartilhadas após o fork
+    engine.dispose(close=False)
+
+
+# Caches por processo: usuários com gostos parecidos compartilham as mesmas
+# consultas às APIs externas, então cada item/busca é requisitado uma única vez por processo.
+@lru_cache(maxsize=TAMANHO_CACHE_API)
+def _obter_livro(id_livro: str):
+    return obter_livro_por_id(id_livro)
+
+
+@lru_cache(maxsize=TAMANHO_CACHE_API)
+def _buscar_livros(consulta: str):
+    return buscar_livros(consulta)
+
+
+@lru_cache(maxsize=TAMANHO_CACHE_API)
+def _obter_filme(id_filme: str):
+    return buscar_detalhes_filme(id_filme)
+
+
+@lru_cache(maxsize=TAMANHO_CACHE_API)
+def _buscar_filmes(consulta: str, limite: int = 20):
+    return buscar_dados_filme(consulta, limite=limite)
+
+
+def _processar_lote(ids_usuarios: List[int]) -> int:
+    with Session(engine) as session:
+        livros_por_usuario: Dict[int, List[str]] = defaultdict(list)
+        for user_id, id_externo in session.exec(
+            select(UserLibrary.user_id, UserLibrary.book_external_id)
+            .where(UserLibrary.user_id.in_(ids_usuarios))
+        ):
+            livros_por_usuario[user_id].append(id_externo)
+
+        filmes_por_usuario: Dict[int, List[str]] = defaultdict(list)
+        for user_id, id_externo in session.exec(
+            select(UserMovieLibrary.user_id, UserMovieLibrary.movie_external_id)
+            .where(UserMovieLibrary.user_id.in_(ids_usuarios))
+        ):
+            filmes_por_usuario[user_id].append(id_externo)
+
+        perfis: Dict[int, UserTasteProfile] = {
+            perfil.user_id: perfil
+            for perfil in session.exec(
+                select(UserTasteProfile).where(UserTasteProfile.user_id.in_(ids_usuarios))
+            )
+        }
+
+        livros_populares = ids_populares_gravados(session, "book", limite=LIMITE_RECOMENDACOES)
+        filmes_populares = ids_populares_gravados(session, "movie", limite=LIMITE_RECOMENDACOES)
+
+        agora = datetime.utcnow()
+        linhas = []
+        for user_id in ids_usuarios:
+            livros = livros_por_usuario.get(user_id, [])
+            filmes = filmes_por_usuario.get(user_id, [])
+            try:
+                perfil = perfis.get(user_id)
+                if perfil is None and (livros or filmes):
+                    perfil = reconstruir_perfil(
+                        session, user_id, obter_livro=_obter_livro, obter_filme=_obter_filme
+                    )
+                linhas.append({
+                    "user_id": user_id,
+                    "recommended_books": _recomendar_livros(perfil, livros, livros_populares),
+                    "recommended_movies": _recomendar_filmes(perfil, filmes, filmes_populares),
+                    "created_at": agora,
+                })
+            except Exception:
+                logger.exception("Falha ao calcular recomendações do usuário %s", user_id)
+
+        # Usuários cujo cálculo falhou mantêm as recomendações anteriores
+        calculados = [linha["user_id"] for linha in linhas]
+        if calculados:
+            session.execute(delete(Recommendation).where(Recommendation.user_id.in_(calculados)))
+            session.execute(insert(Recommendation), linhas)
+        session.commit()
+        return len(linhas)
+
+
+def _recomendar_livros(
+    perfil: Optional[UserTasteProfile], ids_externos: List[str], populares: List[str]
+) -> List[Dict[str, Any]]:
+    if perfil is None or not ids_externos:
+        return []
+    generos = principais(perfil.book_genres, 3)
+    autores = principais(perfil.book_authors, 2)
+    if not generos and not autores:
+        return []
+    recomendados = recomendar_livros(
+        generos, autores, ids_externos, buscar=_buscar_livros, populares=populares, obter_livro=_obter_livro
+    )
+    # Gravados completos: as rotas servem estes dados sem consultar as APIs externas
+    return [livro.dict() for livro in recomendados]
+
+
+def _recomendar_filmes(
+    perfil: Optional[UserTasteProfile], ids_externos: List[str], populares: List[str]
+) -> List[Dict[str, Any]]:
+    if perfil is None or not ids_externos:
+        return []
+    generos = principais(perfil.movie_genres, 3)
+    if not generos:
+        return []
+    recomendados = recomendar_filmes(
+        generos, ids_externos, buscar=_buscar_filmes, populares=populares, obter_filme=_obter_filme
+    )
+    return [filme.dict() for filme in recomendados]
+
+
+def _parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Recalcula as recomendações de livros e filmes de todos os usuários."
+    )
+    parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        default=None,
+        help="Processa apenas usuários com alterações desde esta data (ISO 8601).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Número de processos (padrão: número de CPUs).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=TAMANHO_LOTE_PADRAO,
+        help="Quantidade de usuários por lote enviado a cada processo.",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    args = _parse_args()
+    recomputar_recomendacoes(since=args.since, processos=args.workers, tamanho_lote=args.batch_size)
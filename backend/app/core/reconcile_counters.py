@@ -0,0 +1,218 @@
+import argparse
+import logging
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from core.database import engine
+from core.models import (
+    Book as DBBook,
+    Follow,
+    Movie as DBMovie,
+    Rating,
+    User,
+    UserLibrary,
+    UserMovieLibrary,
+    UserReview,
+    UserStats,
+)
+from services.counters import FAIXAS_NOTA, faixa_nota
+
+logger = logging.getLogger(__name__)
+
+TOLERANCIA_SOMA = 1e-6
+
+
+def reconciliar_contadores(corrigir: bool = True) -> int:
+    """
+    Recalcula os contadores de usuários e itens a partir das tabelas Follow e
+    Rating e corrige (ou apenas relata, com corrigir=False) os que divergirem.
+    Retorna a quantidade de linhas com divergência.
+    """
+    with Session(engine) as session:
+        divergentes = _reconciliar_usuarios(session, corrigir)
+        for coluna, modelo in ((Rating.book_id, DBBook), (Rating.movie_id, DBMovie)):
+            divergentes += _reconciliar_itens(session, coluna, modelo, corrigir)
+        if corrigir:
+            session.commit()
+
+    logger.info(
+        "Reconciliação concluída: %s linhas divergentes%s.",
+        divergentes,
+        " corrigidas" if corrigir else "",
+    )
+    return divergentes
+
+
+def _valores_iniciais() -> Dict[str, Any]:
+    return {
+        "follower_count": 0,
+        "following_count": 0,
+        "rating_count": 0,
+        "rating_sum": 0.0,
+        "score_histogram": [0] * FAIXAS_NOTA,
+        "genre_counts": {},
+        "book_library_count": 0,
+        "movie_library_count": 0,
+        "review_count": 0,
+        "review_sum": 0.0,
+        "review_histogram": [0] * FAIXAS_NOTA,
+    }
+
+
+def _reconciliar_usuarios(session: Session, corrigir: bool) -> int:
+    esperado: Dict[int, Dict[str, Any]] = defaultdict(_valores_iniciais)
+    for user_id, total in session.exec(
+        select(Follow.following_id, func.count()).group_by(Follow.following_id)
+    ):
+        esperado[user_id]["follower_count"] = total
+    for user_id, total in session.exec(
+        select(Follow.follower_id, func.count()).group_by(Follow.follower_id)
+    ):
+        esperado[user_id]["following_count"] = total
+    for user_id, total in session.exec(
+        select(UserLibrary.user_id, func.count()).group_by(UserLibrary.user_id)
+    ):
+        esperado[user_id]["book_library_count"] = total
+    for user_id, total in session.exec(
+        select(UserMovieLibrary.user_id, func.count()).group_by(UserMovieLibrary.user_id)
+    ):
+        esperado[user_id]["movie_library_count"] = total
+    for user_id, nota, total in session.exec(
+        select(Rating.user_id, Rating.score, func.count()).group_by(Rating.user_id, Rating.score)
+    ):
+        valores = esperado[user_id]
+        valores["rating_count"] += total
+        valores["rating_sum"] += nota * total
+        valores["score_histogram"][faixa_nota(nota)] += total
+    for user_id, nota, total in session.exec(
+        select(UserReview.target_user_id, UserReview.rating, func.count())
+        .group_by(UserReview.target_user_id, UserReview.rating)
+    ):
+        valores = esperado[user_id]
+        valores["review_count"] += total
+        valores["review_sum"] += nota * total
+        valores["review_histogram"][faixa_nota(nota)] += total
+    for coluna, modelo in ((Rating.book_id, DBBook), (Rating.movie_id, DBMovie)):
+        generos_por_item = dict(session.exec(
+            select(modelo.id, modelo.genres).where(modelo.id.in_(select(coluna).distinct()))
+        ).all())
+        for user_id, item_id, total in session.exec(
+            select(Rating.user_id, coluna, func.count())
+            .where(coluna.is_not(None))
+            .group_by(Rating.user_id, coluna)
+        ):
+            contagens = esperado[user_id]["genre_counts"]
+            for genero in set(generos_por_item.get(item_id) or []):
+                if genero:
+                    contagens[genero] = contagens.get(genero, 0) + total
+
+    atuais = {estatisticas.user_id: estatisticas for estatisticas in session.exec(select(UserStats))}
+    ids_usuarios = set(session.exec(select(User.id)).all())
+
+    divergentes = 0
+    for user_id in ids_usuarios:
+        valores = esperado[user_id]
+        estatisticas = atuais.get(user_id)
+        if estatisticas is None and valores == _valores_iniciais():
+            # Usuário sem atividade: a linha é criada na primeira mutação
+            continue
+        if estatisticas is not None and not _diverge(estatisticas, valores):
+            continue
+        divergentes += 1
+        logger.warning("Contadores do usuário %s divergentes: esperado %s", user_id, valores)
+        if not corrigir:
+            continue
+        if estatisticas is None:
+            estatisticas = UserStats(user_id=user_id)
+        for campo, valor in valores.items():
+            setattr(estatisticas, campo, valor)
+        session.add(estatisticas)
+
+    # Contadores de usuários que não existem mais
+    for user_id, estatisticas in atuais.items():
+        if user_id not in ids_usuarios:
+            divergentes += 1
+            if corrigir:
+                session.delete(estatisticas)
+    return divergentes
+
+
+def _reconciliar_itens(session: Session, coluna, modelo, corrigir: bool) -> int:
+    esperado: Dict[int, Tuple[int, float, List[int]]] = defaultdict(lambda: (0, 0.0, [0] * FAIXAS_NOTA))
+    for item_id, nota, total in session.exec(
+        select(coluna, Rating.score, func.count())
+        .where(coluna.is_not(None))
+        .group_by(coluna, Rating.score)
+    ):
+        quantidade, soma, histograma = esperado[item_id]
+        histograma[faixa_nota(nota)] += total
+        esperado[item_id] = (quantidade + total, soma + nota * total, histograma)
+
+    divergentes = 0
+    for item in session.exec(select(modelo)):
+        total, soma, histograma = esperado.get(item.id, (0, 0.0, [0] * FAIXAS_NOTA))
+        if (
+            item.rating_count == total
+            and abs((item.rating_sum or 0.0) - soma) <= TOLERANCIA_SOMA
+            and (item.score_histogram or [0] * FAIXAS_NOTA) == histograma
+        ):
+            continue
+        divergentes += 1
+        logger.warning(
+            "Contadores de %s %s divergentes: esperado %s avaliações, soma %s, histograma %s",
+            modelo.__name__, item.id, total, soma, histograma,
+        )
+        if corrigir:
+            item.rating_count = total
+            item.rating_sum = soma
+            item.score_histogram = histograma
+            session.add(item)
+    return divergentes
+
+
+def _diverge(estatisticas: UserStats, valores: Dict[str, Any]) -> bool:
+    return (
+        estatisticas.follower_count != valores["follower_count"]
+        or estatisticas.following_count != valores["following_count"]
+        or estatisticas.rating_count != valores["rating_count"]
+        or abs((estatisticas.rating_sum or 0.0) - valores["rating_sum"]) > TOLERANCIA_SOMA
+        or (estatisticas.score_histogram or [0] * FAIXAS_NOTA) != valores["score_histogram"]
+        or (estatisticas.genre_counts or {}) != valores["genre_counts"]
+        or estatisticas.book_library_count != valores["book_library_count"]
+        or estatisticas.movie_library_count != valores["movie_library_count"]
+        or estatisticas.review_count != valores["review_count"]
+        or abs((estatisticas.review_sum or 0.0) - valores["review_sum"]) > TOLERANCIA_SOMA
+        or (estatisticas.review_histogram or [0] * FAIXAS_NOTA) != valores["review_histogram"]
+    )
+
+
+def _parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Recalcula os contadores e estatísticas de usuários e itens e corrige divergências."
+    )
+    parser.add_argument(
+        "--every",
+        type=int,
+        default=None,
+        help="Repete a verificação a cada N segundos (execução contínua).",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Apenas relata as divergências, sem gravar correções.",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    args = _parse_args()
+    while True:
+        reconciliar_contadores(corrigir=not args.dry_run)
+        if not args.every:
+            break
+        time.sleep(args.every)
@@ -0,0 +1,180 @@
+"""
+Réplicas de leitura do banco de dados.
+As rotas somente leitura usam get_read_session/get_async_read_session, que
+escolhem uma réplica saudável em rodízio; as mutações continuam no banco
+principal (get_session/get_async_session). Quem acabou de escrever lê do
+principal durante DB_READ_YOUR_WRITES_SECONDS, para não ver dados atrasados.
+Sem réplicas configuradas, as sessões de leitura usam o banco principal.
+
+Para testes locais, uma réplica pode ser outro arquivo SQLite, copiado do
+principal pela API de backup a cada SQLITE_REPLICA_SYNC_INTERVAL segundos.
+"""
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from typing import AsyncGenerator, Dict, Generator, List, Optional, Tuple
+
+from fastapi import Request
+from sqlalchemy import select
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core import config
+from core.database import async_engine, criar_engines, engine
+from core.models import Rating
+
+logger = logging.getLogger(__name__)
+
+MAX_CHAVES_JANELA = 100000
+METODOS_LEITURA = ("GET", "HEAD", "OPTIONS")
+
+
+class Replica:
+    def __init__(self, url: str):
+        self.url = url
+        self.nome = make_url(url).render_as_string(hide_password=True)
+        self.engine, self.async_engine = criar_engines(url, config.url_assincrona(url), somente_leitura=True)
+        self.saudavel = False
+
+
+class Replicas:
+    """Réplicas configuradas, com rodízio entre as saudáveis; seguro para uso entre threads."""
+
+    def __init__(self, urls: List[str]):
+        self._lock = threading.Lock()
+        self._replicas = [Replica(url) for url in urls]
+        self._proxima = 0
+
+    def __bool__(self) -> bool:
+        return bool(self._replicas)
+
+    def escolher(self) -> Optional[Replica]:
+        with self._lock:
+            saudaveis = [replica for replica in self._replicas if replica.saudavel]
+            if not saudaveis:
+                return None
+            self._proxima = (self._proxima + 1) % len(saudaveis)
+            return saudaveis[self._proxima]
+
+    def verificar(self) -> None:
+        """Consulta cada réplica (com o esquema já criado) e atualiza quais podem receber leituras."""
+        for replica in self._replicas:
+            try:
+                with replica.engine.connect() as conexao:
+                    conexao.execute(select(Rating.id).limit(1))
+                saudavel = True
+            except Exception as e:
+                saudavel = False
+                if replica.saudavel:
+                    logger.error(f"Réplica {replica.nome} indisponível: {e}")
+            if saudavel and not replica.saudavel:
+                logger.info(f"Réplica {replica.nome} disponível para leituras")
+            replica.saudavel = saudavel
+
+    def sincronizar_sqlite(self) -> None:
+        """Copia o banco SQLite principal para as réplicas SQLite com a API de backup."""
+        if not config.eh_sqlite() or config.eh_sqlite_em_memoria():
+            return
+        for replica in self._replicas:
+            if not config.eh_sqlite(replica.url) or config.eh_sqlite_em_memoria(replica.url):
+                continue
+            inicio = time.perf_counter()
+            origem = sqlite3.connect(make_url(config.DATABASE_URL).database)
+            destino = sqlite3.connect(
+                make_url(replica.url).database, timeout=config.SQLITE_BUSY_TIMEOUT_MS / 1000
+            )
+            try:
+                origem.backup(destino)
+            except sqlite3.Error as e:
+                logger.error(f"Erro ao sincronizar a réplica {replica.nome}: {e}")
+                continue
+            finally:
+                destino.close()
+                origem.close()
+            logger.debug(f"Réplica {replica.nome} sincronizada em {time.perf_counter() - inicio:.3f}s")
+
+
+class JanelaEscritas:
+    """Clientes que escreveram recentemente e devem ler do banco principal."""
+
+    def __init__(self, segundos: float, max_chaves: int = MAX_CHAVES_JANELA):
+        self._lock = threading.Lock()
+        self._segundos = segundos
+        self._max_chaves = max_chaves
+        self._expira_em: Dict[str, float] = {}
+
+    def registrar(self, chave: str) -> None:
+        agora = time.monotonic()
+        with self._lock:
+            if len(self._expira_em) >= self._max_chaves:
+                self._expira_em = {c: t for c, t in self._expira_em.items() if t > agora}
+            self._expira_em[chave] = agora + self._segundos
+
+    def recente(self, chave: str) -> bool:
+        with self._lock:
+            expira_em = self._expira_em.get(chave)
+        return expira_em is not None and expira_em > time.monotonic()
+
+
+replicas = Replicas(config.DATABASE_REPLICA_URLS)
+janela = JanelaEscritas(config.DB_READ_YOUR_WRITES_SECONDS)
+
+
+def chave_cliente(request: Request) -> str:
+    """Identifica o cliente pelo token enviado ou, sem ele, pelo endereço de origem."""
+    autorizacao = request.headers.get("authorization")
+    if autorizacao:
+        return autorizacao
+    return request.client.host if request.client else ""
+
+
+def registrar_escrita(request: Request, status_code: int) -> None:
+    """Chamado pelo middleware após cada resposta: mutações bem-sucedidas abrem a janela."""
+    if replicas and request.method not in METODOS_LEITURA and status_code < 400:
+        janela.registrar(chave_cliente(request))
+
+
+def engines_leitura(request: Request) -> Tuple[Engine, AsyncEngine]:
+    if not replicas or janela.recente(chave_cliente(request)):
+        return engine, async_engine
+    replica = replicas.escolher()
+    if replica is None:
+        return engine, async_engine
+    return replica.engine, replica.async_engine
+
+
+def get_read_session(request: Request) -> Generator[Session, None, None]:
+    """Sessão para rotas somente leitura: réplica saudável ou, se não houver, o banco principal."""
+    alvo, _ = engines_leitura(request)
+    with Session(alvo) as session:
+        yield session
+
+
+async def get_async_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    _, alvo = engines_leitura(request)
+    async with AsyncSession(alvo, expire_on_commit=False) as session:
+        yield session
+
+
+async def manter_periodicamente() -> None:
+    """
+    Tarefa de fundo: sincroniza as réplicas SQLite locais (se configurado) e
+    verifica a saúde das réplicas a cada DB_REPLICA_HEALTH_INTERVAL segundos.
+    """
+    sincronizado_em = 0.0
+    while True:
+        try:
+            if config.SQLITE_REPLICA_SYNC_INTERVAL > 0 and time.time() - sincronizado_em >= config.SQLITE_REPLICA_SYNC_INTERVAL:
+                await asyncio.to_thread(replicas.sincronizar_sqlite)
+                sincronizado_em = time.time()
+            await asyncio.to_thread(replicas.verificar)
+        except Exception:
+            logger.exception("Falha ao verificar as réplicas de leitura")
+        intervalo = config.DB_REPLICA_HEALTH_INTERVAL
+        if config.SQLITE_REPLICA_SYNC_INTERVAL > 0:
+            intervalo = min(intervalo, config.SQLITE_REPLICA_SYNC_INTERVAL)
+        await asyncio.sleep(intervalo)
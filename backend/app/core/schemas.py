@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import date, datetime
 from sqlmodel import SQLModel
 from pydantic import Field, validator, BaseModel
@@ -33,6 +33,18 @@ class UserRead(UserBase):
     class Config:
         orm_mode = True
 
+class UserPublic(SQLModel):
+    """Dados de um usuário visíveis para outros usuários (sem email)."""
+    id: int
+    username: str
+    role: str
+    is_banned: bool = False
+    is_muted: bool = False
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
 class UserUpdate(SQLModel):
     username: Optional[str] = None
     email: Optional[str] = None
@@ -50,6 +62,11 @@ class Token(SQLModel):
 class TokenData(SQLModel):
     username: Optional[str]
 
+class CommunityRating(SQLModel):
+    count: int = 0
+    average: Optional[float] = None
+    histogram: Dict[str, int] = {}
+
 class BookBase(SQLModel):
     title: str
     author: Optional[str] = None
@@ -71,6 +88,7 @@ class BookRead(BookBase):
     published_date: Optional[str] = None       # Ano de publicação
     is_banned: bool = False
     is_muted: bool = False
+    community_rating: Optional[CommunityRating] = None
 
     class Config:
         orm_mode = True
@@ -134,18 +152,97 @@ class RatingUpdate(SQLModel):
     score: Optional[float] = None
     comment: Optional[str] = None
 
+class RatingUpsert(SQLModel):
+    score: float
+    comment: Optional[str] = None
+
 class RecommendationBase(SQLModel):
     user_id: int
 
 class RecommendationRead(RecommendationBase):
     id: int
-    recommended_books: Optional[List[int]] = None
-    recommended_movies: Optional[List[int]] = None
+    recommended_books: Optional[List[Dict[str, Any]]] = None
+    recommended_movies: Optional[List[Dict[str, Any]]] = None
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class ActivityEventRead(SQLModel):
+    id: int
+    actor_id: int
+    verb: str
+    object_type: str
+    object_id: str
+    payload: Optional[Dict[str, Any]] = None
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class GenreCount(SQLModel):
+    genre: str
+    count: int
+
+
+class UserStatsRead(SQLModel):
+    user_id: int
+    followers: int = 0
+    following: int = 0
+    ratings: int = 0
+    rating_sum: float = 0
+    average_rating: Optional[float] = None
+    score_histogram: Dict[str, int] = {}
+    top_genres: List[GenreCount] = []
+    books_in_library: int = 0
+    movies_in_library: int = 0
+
+
+class UserReviewSummary(SQLModel):
+    user_id: int
+    count: int = 0
+    average: Optional[float] = None
+    histogram: Dict[str, int] = {}
+
+
+class ImportJobRead(SQLModel):
+    id: int
+    user_id: int
+    filename: Optional[str] = None
+    format: str
+    status: str
+    total_rows: int = 0
+    imported: int = 0
+    skipped: int = 0
+    failed: int = 0
+    pending_items: int = 0
+    errors: Optional[List[Dict[str, Any]]] = None
     created_at: datetime
+    finished_at: Optional[datetime] = None
 
     class Config:
         orm_mode = True
 
+
+class FollowStatusRequest(SQLModel):
+    user_ids: List[int]
+
+
+class FollowStatus(SQLModel):
+    user_id: int
+    following: bool
+    can_follow: bool
+
+
+class UserCounts(SQLModel):
+    user_id: int
+    followers: int = 0
+    following: int = 0
+    ratings: int = 0
+    average_rating: Optional[float] = None
+
 class Book(BaseModel):
     id: str
     title: str
@@ -168,6 +265,7 @@ class Movie(BaseModel):
     genres: Optional[List[str]] = None
     director: Optional[str] = None
     cast: Optional[List[str]] = None
+    community_rating: Optional[CommunityRating] = None
 
     class Config:
         orm_mode = True
@@ -1,13 +1,17 @@
+import asyncio
 import logging
 import os
-from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from routers import router as api_router
-from core.database import create_db_and_tables
+from routers.utils import CABECALHO_PROXIMO_CURSOR
+from core import query_monitor, replicas
+from core.database import create_db_and_tables, registrar_configuracao
 from core.seed import seed_initial_data
+from services import catalog, leaderboards, trending
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,6 +20,10 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Iniciando ciclo de vida da aplicação...")
+    try:
+        registrar_configuracao()
+    except Exception as e:
+        logger.error(f"Erro ao verificar a configuração do banco: {e}")
     try:
         create_db_and_tables()
         logger.info("Banco de dados verificado.")
@@ -24,8 +32,31 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Erro na inicialização: {e}")
     
+    try:
+        trending.contadores.carregar()
+    except Exception as e:
+        logger.error(f"Erro ao restaurar contadores de popularidade: {e}")
+    tarefa_trending = asyncio.create_task(trending.gravar_periodicamente())
+    tarefa_rankings = asyncio.create_task(leaderboards.atualizar_periodicamente())
+    tarefas = [tarefa_trending, tarefa_rankings]
+    if replicas.replicas:
+        tarefas.append(asyncio.create_task(replicas.manter_periodicamente()))
+    try:
+        catalog.agendar_provisorios()
+    except Exception as e:
+        logger.error(f"Erro ao reenfileirar itens provisórios do catálogo: {e}")
+    
     yield
     
+    for tarefa in tarefas:
+        tarefa.cancel()
+        with suppress(asyncio.CancelledError):
+            await tarefa
+    try:
+        trending.contadores.gravar()
+    except Exception as e:
+        logger.error(f"Erro ao gravar contadores de popularidade: {e}")
+    
     logger.info("Encerrando ciclo de vida da aplicação.")
 
 
@@ -47,8 +78,32 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        CABECALHO_PROXIMO_CURSOR,
+        query_monitor.CABECALHO_CONSULTAS,
+        query_monitor.CABECALHO_TEMPO,
+        "Server-Timing",
+    ],
 )
 
+
+@app.middleware("http")
+async def registrar_escritas(request: Request, call_next):
+    """Abre a janela de leitura no banco principal para quem acabou de escrever."""
+    resposta = await call_next(request)
+    replicas.registrar_escrita(request, resposta.status_code)
+    return resposta
+
+
+@app.middleware("http")
+async def monitorar_consultas(request: Request, call_next):
+    """Conta as consultas SQL e o tempo no banco da requisição (core/query_monitor.py)."""
+    with query_monitor.monitorar() as monitoramento:
+        resposta = await call_next(request)
+    query_monitor.finalizar(request, resposta, monitoramento)
+    return resposta
+
+
 app.include_router(api_router)
 
 base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -11,6 +11,9 @@ from .recommendations import router as recommendations_router
 from .profile import router as profile_router
 from .reports import router as reports_router
 from .moderation import router as moderation_router
+from .trending import router as trending_router
+from .leaderboards import router as leaderboards_router
+from .metrics import router as metrics_router
 
 # Router principal que agrega todos os routers
 from fastapi import APIRouter
@@ -28,6 +31,9 @@ router.include_router(recommendations_router)
 router.include_router(profile_router)
 router.include_router(reports_router)
 router.include_router(moderation_router)
+router.include_router(trending_router)
+router.include_router(leaderboards_router)
+router.include_router(metrics_router)
 
 __all__ = ["router"]
 
@@ -1,20 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session
 from typing import List
 
 from core.database import get_session
 from core.models import Book, User
 from core.schemas import BookCreate, BookRead
-from core.auth import get_current_admin, get_current_curator_or_admin
+from core.auth import get_current_curator_or_admin_sync
 
 router = APIRouter()
 
 
 @router.post("/books/manual", response_model=BookRead, status_code=status.HTTP_201_CREATED)
-async def create_book_manually(
+def create_book_manually(
     book: BookCreate,
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_curator_or_admin)
+    current_user: User = Depends(get_current_curator_or_admin_sync)
 ):
     if current_user.is_muted:
         raise HTTPException(
@@ -24,7 +25,14 @@ async def create_book_manually(
     
     db_book = Book(**book.dict())
     session.add(db_book)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail="Já existe um livro com este id externo"
+        )
     session.refresh(db_book)
     
     return BookRead(
@@ -5,9 +5,12 @@ from fastapi import APIRouter, HTTPException, Depends
 import logging
 
 from sqlmodel import Session
-from core.schemas import BookRead
+from core.schemas import BookRead, CommunityRating
+from core.models import Book
 from core.database import get_session
+from services import counters
 from services.google_books import obter_livro_por_id
+from services.trending import registrar_evento
 from ..utils import google_book_to_bookread
 
 logger = logging.getLogger(__name__)
@@ -16,11 +19,15 @@ router = APIRouter(tags=["books"])
 
 
 @router.get("/books/{book_id}", response_model=BookRead)
-async def get_book(book_id: str, session: Session = Depends(get_session)):
+def get_book(book_id: str, session: Session = Depends(get_session)):
     logger.info(f"Obtendo livro com book_id: {book_id}")
     livro = obter_livro_por_id(book_id)
     if livro:
         dados_livro = google_book_to_bookread(livro)
+        nota_comunidade = counters.resumos_por_id_externo(session, Book, [book_id]).get(book_id)
+        if nota_comunidade:
+            dados_livro.community_rating = CommunityRating(**nota_comunidade)
+        registrar_evento("book", book_id, "view")
         return dados_livro
     else:
         raise HTTPException(status_code=404, detail="Livro não encontrado")
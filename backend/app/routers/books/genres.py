@@ -16,7 +16,7 @@ router = APIRouter(tags=["books"])
 
 
 @router.put("/books/{book_id}/update-genres")
-async def update_book_genres(book_id: int, session: Session = Depends(get_session)):
+def update_book_genres(book_id: int, session: Session = Depends(get_session)):
     """
     Atualiza os gêneros de um livro existente no banco de dados buscando da API do Google Books.
     """
@@ -49,7 +49,7 @@ async def update_book_genres(book_id: int, session: Session = Depends(get_sessio
 
 
 @router.post("/books/update-all-genres")
-async def update_all_books_genres(session: Session = Depends(get_session)):
+def update_all_books_genres(session: Session = Depends(get_session)):
     """
     Atualiza os gêneros de todos os livros no banco de dados que têm external_id mas não têm gêneros.
     """
@@ -6,9 +6,10 @@ from typing import List
 import logging
 
 from sqlmodel import Session, select
-from core.schemas import BookRead
+from core.schemas import BookRead, CommunityRating
 from core.models import Book
 from core.database import get_session
+from services import counters
 from services.google_books import buscar_livros as google_buscar_livros
 from ..utils import google_book_to_bookread
 
@@ -18,7 +19,7 @@ router = APIRouter(tags=["books"])
 
 
 @router.get("/books/search", response_model=List[BookRead])
-async def search_books(query: str, session: Session = Depends(get_session)):
+def search_books(query: str, session: Session = Depends(get_session)):
     logger.info(f"Buscando livros com consulta: {query}")
     
     lista_livros = []
@@ -46,13 +47,17 @@ async def search_books(query: str, session: Session = Depends(get_session)):
             isbn=livro.isbn,
             publisher=livro.publisher,
             publication_date=livro.publication_date,
-            genres=livro.genres
+            genres=livro.genres,
+            community_rating=CommunityRating(**counters.resumo_item(livro)) if livro.rating_count else None
         ))
     
     # Buscar livros na Google Books API
     livros_api = google_buscar_livros(query)
-    for livro in livros_api:
-        dados_livro = google_book_to_bookread(livro)
+    livros_api = [google_book_to_bookread(livro) for livro in livros_api]
+    notas_comunidade = counters.resumos_por_id_externo(session, Book, [livro.id for livro in livros_api])
+    for dados_livro in livros_api:
+        if dados_livro.id in notas_comunidade:
+            dados_livro.community_rating = CommunityRating(**notas_comunidade[dados_livro.id])
         lista_livros.append(dados_livro)
     
     return lista_livros
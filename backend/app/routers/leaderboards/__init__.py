@@ -0,0 +1,15 @@
+"""
+Módulo de rotas de rankings (mais bem avaliados).
+Agrega todos os sub-módulos de rotas relacionadas aos rankings.
+"""
+from fastapi import APIRouter
+from . import books, movies
+
+# Router principal que agrega todos os sub-routers
+router = APIRouter(tags=["leaderboards"])
+
+# Incluir todos os sub-routers
+router.include_router(books.router)
+router.include_router(movies.router)
+
+__all__ = ["router"]
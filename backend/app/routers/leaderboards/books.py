@@ -0,0 +1,45 @@
+"""
+Rotas do ranking de livros mais bem avaliados.
+"""
+from fastapi import APIRouter, Query
+from typing import List, Dict, Any, Optional
+import logging
+
+from services import leaderboards
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["leaderboards"])
+
+
+@router.get("/leaderboards/books", response_model=List[Dict[str, Any]])
+def get_top_rated_books(
+    genre: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Livros mais bem avaliados (média bayesiana), no geral ou do gênero informado.
+    Para a próxima página, aumente `offset`.
+    """
+    logger.info(f"Obtendo ranking de livros (gênero: {genre}, offset: {offset})")
+    posicoes = leaderboards.pagina("book", genre, limit, offset)
+    return [
+        {
+            "rank": offset + indice + 1,
+            "id": posicao.external_id,
+            "title": posicao.title,
+            "author": posicao.creator,
+            "cover_url": posicao.cover_url,
+            "rating_count": posicao.rating_count,
+            "average": posicao.average,
+            "score": posicao.pontuacao,
+        }
+        for indice, posicao in enumerate(posicoes)
+    ]
+
+
+@router.get("/leaderboards/books/genres", response_model=List[Dict[str, Any]])
+def get_leaderboard_books_genres():
+    """Gêneros com ranking de livros e a quantidade de itens de cada um."""
+    return [{"genre": genero, "count": total} for genero, total in leaderboards.generos("book")]
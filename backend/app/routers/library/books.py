@@ -3,14 +3,18 @@ Rotas relacionadas à biblioteca de livros do usuário.
 """
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Dict
+import asyncio
 import logging
 
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from core.models import User, UserLibrary
 from core.schemas import BookRead
 from core.database import get_session
-from core.auth import get_current_active_user
+from core.replicas import get_async_read_session
+from core.auth import get_current_active_user_sync
 from services.google_books import obter_livro_por_id
+from services import events
 from ..utils import google_book_to_bookread
 
 logger = logging.getLogger(__name__)
@@ -19,24 +23,31 @@ router = APIRouter(tags=["library"])
 
 
 @router.get("/users/{user_id}/library", response_model=List[BookRead])
-async def get_user_library(user_id: int, session: Session = Depends(get_session)):
+async def get_user_library(user_id: int, session: AsyncSession = Depends(get_async_read_session)):
     """Obtém a biblioteca de livros do usuário (mantido para compatibilidade com versões anteriores)."""
     logger.info(f"Obtendo biblioteca de livros para o usuário: {user_id}")
-    entries = session.exec(select(UserLibrary).where(UserLibrary.user_id == user_id)).all()
+    ids_livros = (await session.exec(
+        select(UserLibrary.book_external_id).where(UserLibrary.user_id == user_id)
+    )).all()
+    # As consultas ao Google Books são bloqueantes: rodam fora do event loop
+    return await asyncio.to_thread(_detalhes_livros, ids_livros)
+
+
+def _detalhes_livros(ids_livros: List[str]) -> List[BookRead]:
     books: List[BookRead] = []
-    for entry in entries:
+    for id_livro in ids_livros:
         try:
-            livro = obter_livro_por_id(entry.book_external_id)
+            livro = obter_livro_por_id(id_livro)
             if livro:
                 dados_livro = google_book_to_bookread(livro)
                 books.append(dados_livro)
         except Exception:
-            logger.exception("Failed to fetch book details for %s", entry.book_external_id)
+            logger.exception("Failed to fetch book details for %s", id_livro)
     return books
 
 
 @router.post("/library/add")
-async def add_book_to_library(book_id: Dict[str, str], current_user: User = Depends(get_current_active_user), session: Session = Depends(get_session)):
+def add_book_to_library(book_id: Dict[str, str], current_user: User = Depends(get_current_active_user_sync), session: Session = Depends(get_session)):
     logger.info(f"Adicionando livro {book_id} à biblioteca do usuário {current_user.username}")
     
     if current_user.is_muted:
@@ -59,13 +70,14 @@ async def add_book_to_library(book_id: Dict[str, str], current_user: User = Depe
         return {"message": "Livro já está na biblioteca"}
     entrada = UserLibrary(user_id=current_user.id, book_external_id=id_livro_str)
     session.add(entrada)
+    events.ao_adicionar_livro_biblioteca(session, current_user.id, id_livro_str, livro)
     session.commit()
     session.refresh(entrada)
     return {"message": "Livro adicionado à biblioteca", "book_id": id_livro_str}
 
 
 @router.delete("/library/remove")
-async def remove_book_from_library(book_id: str, current_user: User = Depends(get_current_active_user), session: Session = Depends(get_session)):
+def remove_book_from_library(book_id: str, current_user: User = Depends(get_current_active_user_sync), session: Session = Depends(get_session)):
     logger.info(f"Removendo livro {book_id} da biblioteca do usuário {current_user.username}")
     
     entrada_biblioteca = session.exec(
@@ -78,6 +90,7 @@ async def remove_book_from_library(book_id: str, current_user: User = Depends(ge
         raise HTTPException(status_code=404, detail="Livro não encontrado na biblioteca")
     
     session.delete(entrada_biblioteca)
+    events.ao_remover_livro_biblioteca(session, current_user.id, book_id)
     session.commit()
     return {"message": "Livro removido da biblioteca", "book_id": book_id}
 
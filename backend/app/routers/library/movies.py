@@ -3,14 +3,18 @@ Rotas relacionadas à biblioteca de filmes do usuário.
 """
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List, Dict
+import asyncio
 import logging
 
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from core.models import User, UserMovieLibrary
 from core.schemas import Movie
 from core.database import get_session
-from core.auth import get_current_active_user
+from core.replicas import get_async_read_session
+from core.auth import get_current_active_user_sync
 from services.api_clients import buscar_detalhes_filme
+from services import events
 from ..utils import omdb_title_to_movie
 
 logger = logging.getLogger(__name__)
@@ -19,27 +23,34 @@ router = APIRouter(tags=["library"])
 
 
 @router.get("/users/{user_id}/library/movies", response_model=List[Movie])
-async def get_user_movie_library(user_id: int, session: Session = Depends(get_session)):
+async def get_user_movie_library(user_id: int, session: AsyncSession = Depends(get_async_read_session)):
     """Obtém a biblioteca de filmes do usuário."""
     logger.info(f"Obtendo biblioteca de filmes para o usuário: {user_id}")
-    entries = session.exec(select(UserMovieLibrary).where(UserMovieLibrary.user_id == user_id)).all()
+    ids_filmes = (await session.exec(
+        select(UserMovieLibrary.movie_external_id).where(UserMovieLibrary.user_id == user_id)
+    )).all()
+    # As consultas ao OMDb são bloqueantes: rodam fora do event loop
+    return await asyncio.to_thread(_detalhes_filmes, ids_filmes)
+
+
+def _detalhes_filmes(ids_filmes: List[str]) -> List[Movie]:
     movies: List[Movie] = []
     seen_ids = set()
-    for entry in entries:
+    for id_filme in ids_filmes:
         try:
-            movie_data = buscar_detalhes_filme(entry.movie_external_id)
+            movie_data = buscar_detalhes_filme(id_filme)
             if movie_data:
                 movie = omdb_title_to_movie(movie_data)
                 if movie is not None and movie.id and movie.id not in seen_ids:
                     seen_ids.add(movie.id)
                     movies.append(movie)
         except Exception:
-            logger.exception("Failed to fetch movie details for %s", entry.movie_external_id)
+            logger.exception("Failed to fetch movie details for %s", id_filme)
     return movies
 
 
 @router.post("/library/movies/add")
-async def add_movie_to_library(movie_id: Dict[str, str], current_user: User = Depends(get_current_active_user), session: Session = Depends(get_session)):
+def add_movie_to_library(movie_id: Dict[str, str], current_user: User = Depends(get_current_active_user_sync), session: Session = Depends(get_session)):
     logger.info(f"Adicionando filme {movie_id} à biblioteca do usuário {current_user.username}")
     
     if current_user.is_muted:
@@ -62,13 +73,14 @@ async def add_movie_to_library(movie_id: Dict[str, str], current_user: User = De
         return {"message": "Filme já está na biblioteca"}
     entrada = UserMovieLibrary(user_id=current_user.id, movie_external_id=id_filme_str)
     session.add(entrada)
+    events.ao_adicionar_filme_biblioteca(session, current_user.id, id_filme_str, dados_filme)
     session.commit()
     session.refresh(entrada)
     return {"message": "Filme adicionado à biblioteca", "movie_id": id_filme_str}
 
 
 @router.delete("/library/movies/remove")
-async def remove_movie_from_library(movie_id: str, current_user: User = Depends(get_current_active_user), session: Session = Depends(get_session)):
+def remove_movie_from_library(movie_id: str, current_user: User = Depends(get_current_active_user_sync), session: Session = Depends(get_session)):
     logger.info(f"Removendo filme {movie_id} da biblioteca do usuário {current_user.username}")
     
     entrada_biblioteca = session.exec(
@@ -81,6 +93,7 @@ async def remove_movie_from_library(movie_id: str, current_user: User = Depends(
         raise HTTPException(status_code=404, detail="Filme não encontrado na biblioteca")
     
     session.delete(entrada_biblioteca)
+    events.ao_remover_filme_biblioteca(session, current_user.id, movie_id)
     session.commit()
     return {"message": "Filme removido da biblioteca", "movie_id": movie_id}
 
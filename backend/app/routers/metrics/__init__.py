@@ -0,0 +1,11 @@
+"""
+Módulo de rotas de métricas internas, restritas a administradores.
+"""
+from fastapi import APIRouter
+from . import sql
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+router.include_router(sql.router)
+
+__all__ = ["router"]
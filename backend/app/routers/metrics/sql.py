@@ -0,0 +1,27 @@
+"""
+Rotas das métricas de consultas SQL por rota (ver core/query_monitor.py).
+"""
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, status
+
+from core.auth import get_current_admin
+from core.models import User
+from core.query_monitor import metricas
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/sql", response_model=Dict[str, Any])
+async def get_sql_metrics(current_user: User = Depends(get_current_admin)):
+    """
+    Consultas e tempo no banco por rota desde o início do processo (ou da última
+    limpeza), ordenadas pelo tempo total, e os alertas de N+1 mais recentes.
+    """
+    return metricas.resumo()
+
+
+@router.delete("/sql", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_sql_metrics(current_user: User = Depends(get_current_admin)):
+    """Zera as métricas, por exemplo antes de medir uma alteração."""
+    metricas.limpar()
@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List
 from datetime import datetime
 
-from core.database import get_session
+from core.database import get_async_session
 from core.models import Moderation, User, Book, Movie, ModerationStatus
 from core.schemas import ModerationCreate, ModerationRead, ModerationUpdate, UserRead, BookRead, MovieRead
 from core.auth import get_current_user, get_current_curator_or_admin, get_current_admin
@@ -14,7 +15,7 @@ router = APIRouter()
 @router.post("/", response_model=ModerationRead, status_code=status.HTTP_201_CREATED)
 async def create_moderation(
     moderation: ModerationCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_curator_or_admin)
 ):
     db_moderation = Moderation(
@@ -26,32 +27,32 @@ async def create_moderation(
         expires_at=moderation.expires_at
     )
     session.add(db_moderation)
-    session.commit()
-    session.refresh(db_moderation)
+    await session.commit()
+    await session.refresh(db_moderation)
     return db_moderation
 
 
 @router.get("/", response_model=List[ModerationRead])
 async def list_moderations(
     status_filter: str = None,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_curator_or_admin)
 ):
     query = select(Moderation)
     if status_filter:
         query = query.where(Moderation.status == status_filter)
     query = query.order_by(Moderation.created_at.desc())
-    moderations = session.exec(query).all()
+    moderations = (await session.exec(query)).all()
     return moderations
 
 
 @router.get("/{moderation_id}", response_model=ModerationRead)
 async def get_moderation(
     moderation_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_curator_or_admin)
 ):
-    moderation = session.get(Moderation, moderation_id)
+    moderation = await session.get(Moderation, moderation_id)
     if not moderation:
         raise HTTPException(status_code=404, detail="Ação de moderação não encontrada")
     return moderation
@@ -61,10 +62,10 @@ async def get_moderation(
 async def update_moderation(
     moderation_id: int,
     moderation_update: ModerationUpdate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_curator_or_admin)
 ):
-    moderation = session.get(Moderation, moderation_id)
+    moderation = await session.get(Moderation, moderation_id)
     if not moderation:
         raise HTTPException(status_code=404, detail="Ação de moderação não encontrada")
     
@@ -78,30 +79,30 @@ async def update_moderation(
     moderation.updated_at = datetime.utcnow()
     
     session.add(moderation)
-    session.commit()
-    session.refresh(moderation)
+    await session.commit()
+    await session.refresh(moderation)
     return moderation
 
 
 @router.delete("/{moderation_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_moderation(
     moderation_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_curator_or_admin)
 ):
-    moderation = session.get(Moderation, moderation_id)
+    moderation = await session.get(Moderation, moderation_id)
     if not moderation:
         raise HTTPException(status_code=404, detail="Ação de moderação não encontrada")
     
-    session.delete(moderation)
-    session.commit()
+    await session.delete(moderation)
+    await session.commit()
     return None
 
 
 @router.get("/search/users", response_model=List[UserRead])
 async def search_users(
     query: str,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_curator_or_admin)
 ):
     query_lower = query.lower()
@@ -109,20 +110,20 @@ async def search_users(
         (User.username.ilike(f"%{query_lower}%")) |
         (User.email.ilike(f"%{query_lower}%"))
     ).limit(20)
-    users = session.exec(statement).all()
+    users = (await session.exec(statement)).all()
     return users
 
 
 @router.post("/users/{user_id}/ban")
 async def ban_user(
     user_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_admin)
 ):
     if user_id == current_user.id:
         raise HTTPException(status_code=400, detail="Você não pode banir a si mesmo")
     
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     
@@ -141,17 +142,17 @@ async def ban_user(
     )
     session.add(moderation)
     
-    session.commit()
+    await session.commit()
     return {"message": "Usuário banido com sucesso"}
 
 
 @router.post("/users/{user_id}/unban")
 async def unban_user(
     user_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_admin)
 ):
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     
@@ -170,20 +171,20 @@ async def unban_user(
     )
     session.add(moderation)
     
-    session.commit()
+    await session.commit()
     return {"message": "Usuário desbanido com sucesso"}
 
 
 @router.post("/users/{user_id}/mute")
 async def mute_user(
     user_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_curator_or_admin)
 ):
     if user_id == current_user.id:
         raise HTTPException(status_code=400, detail="Você não pode silenciar a si mesmo")
     
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     
@@ -205,17 +206,17 @@ async def mute_user(
     )
     session.add(moderation)
     
-    session.commit()
+    await session.commit()
     return {"message": "Usuário silenciado com sucesso"}
 
 
 @router.post("/users/{user_id}/unmute")
 async def unmute_user(
     user_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_curator_or_admin)
 ):
-    user = session.get(User, user_id)
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     
@@ -237,5 +238,5 @@ async def unmute_user(
     )
     session.add(moderation)
     
-    session.commit()
+    await session.commit()
     return {"message": "Usuário desmutado com sucesso"}
@@ -1,20 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session
 from typing import List
 
 from core.database import get_session
 from core.models import Movie, User
 from core.schemas import MovieCreate, MovieRead
-from core.auth import get_current_admin, get_current_curator_or_admin
+from core.auth import get_current_curator_or_admin_sync
 
 router = APIRouter()
 
 
 @router.post("/movies/manual", response_model=MovieRead, status_code=status.HTTP_201_CREATED)
-async def create_movie_manually(
+def create_movie_manually(
     movie: MovieCreate,
     session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_curator_or_admin)
+    current_user: User = Depends(get_current_curator_or_admin_sync)
 ):
     if current_user.is_muted:
         raise HTTPException(
@@ -24,6 +25,13 @@ async def create_movie_manually(
     
     db_movie = Movie(**movie.dict())
     session.add(db_movie)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail="Já existe um filme com este id externo"
+        )
     session.refresh(db_movie)
     return db_movie
@@ -5,9 +5,12 @@ from fastapi import APIRouter, HTTPException, Depends
 import logging
 
 from sqlmodel import Session
-from core.schemas import Movie
+from core.schemas import CommunityRating, Movie
+from core.models import Movie as MovieModel
 from core.database import get_session
+from services import counters
 from services.api_clients import buscar_detalhes_filme
+from services.trending import registrar_evento
 from ..utils import omdb_title_to_movie
 
 logger = logging.getLogger(__name__)
@@ -16,7 +19,7 @@ router = APIRouter(tags=["movies"])
 
 
 @router.get("/movies/{external_id}", response_model=Movie)
-async def get_movie(external_id: str, session: Session = Depends(get_session)):
+def get_movie(external_id: str, session: Session = Depends(get_session)):
     logger.info(f"get_movie chamado com external_id: {external_id}")
     dados_filme = buscar_detalhes_filme(external_id)
     if not dados_filme:
@@ -25,5 +28,9 @@ async def get_movie(external_id: str, session: Session = Depends(get_session)):
     filme = omdb_title_to_movie(dados_filme)
     if not filme:
         raise HTTPException(status_code=404, detail="Filme não encontrado")
+    nota_comunidade = counters.resumos_por_id_externo(session, MovieModel, [external_id]).get(external_id)
+    if nota_comunidade:
+        filme.community_rating = CommunityRating(**nota_comunidade)
+    registrar_evento("movie", external_id, "view")
     return filme
 
@@ -16,7 +16,7 @@ router = APIRouter(tags=["movies"])
 
 
 @router.put("/movies/{movie_id}/update-genres")
-async def update_movie_genres(movie_id: int, session: Session = Depends(get_session)):
+def update_movie_genres(movie_id: int, session: Session = Depends(get_session)):
     """
     Atualiza os gêneros de um filme existente no banco de dados buscando da API do OMDb.
     """
@@ -48,7 +48,7 @@ async def update_movie_genres(movie_id: int, session: Session = Depends(get_sess
 
 
 @router.post("/movies/update-all-genres")
-async def update_all_movies_genres(session: Session = Depends(get_session)):
+def update_all_movies_genres(session: Session = Depends(get_session)):
     """
     Atualiza os gêneros de todos os filmes no banco de dados que têm external_id mas não têm gêneros.
     """
@@ -8,9 +8,10 @@ import asyncio
 import concurrent.futures
 
 from sqlmodel import Session, select
-from core.schemas import Movie
+from core.schemas import CommunityRating, Movie
 from core.models import Movie as MovieModel
 from core.database import get_session
+from services import counters
 from services.api_clients import buscar_dados_filme, buscar_detalhes_filme
 from ..utils import omdb_title_to_movie, VALID_OMDB_SORT, VALID_SORT_ORDER
 
@@ -51,7 +52,8 @@ async def _search_movies_impl(
                 release_date=str(filme.release_date.year) if filme.release_date else None,
                 genres=filme.genres,
                 director=filme.director,
-                cast=filme.cast
+                cast=filme.cast,
+                community_rating=CommunityRating(**counters.resumo_item(filme)) if filme.rating_count else None
             ))
     
     sort_by_normalizado = sort_by if sort_by in VALID_OMDB_SORT else None
@@ -104,11 +106,18 @@ async def _search_movies_impl(
         if filme.id not in ids_vistos:
             ids_vistos.add(filme.id)
     
-    # Adicionar filmes da API externa
+    # Adicionar filmes da API externa, com a nota da comunidade dos que já estão no catálogo
+    notas_comunidade = {}
+    if session:
+        notas_comunidade = counters.resumos_por_id_externo(
+            session, MovieModel, [filme.id for filme in filmes if filme is not None]
+        )
     for filme in filmes:
         if filme is not None and filme.id:
             if filme.id not in ids_vistos:
                 ids_vistos.add(filme.id)
+                if filme.id in notas_comunidade:
+                    filme.community_rating = CommunityRating(**notas_comunidade[filme.id])
                 filmes_resultado.append(filme)
     
     return filmes_resultado
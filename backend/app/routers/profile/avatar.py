@@ -5,7 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from sqlmodel import Session, select
 from core.database import get_session
 from core.models import User, UserProfile
-from core.auth import get_current_active_user
+from core.auth import get_current_active_user_sync
 import shutil
 import uuid
 from pathlib import Path
@@ -21,10 +21,10 @@ AVATAR_DIR.mkdir(parents=True, exist_ok=True)
 
 
 @router.post("/{user_id}/upload-avatar")
-async def upload_avatar(
+def upload_avatar(
     user_id: int,
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_sync),
     session: Session = Depends(get_session)
 ):
     """Upload de arquivo de avatar para o perfil do usuário"""
@@ -76,9 +76,9 @@ async def upload_avatar(
 
 
 @router.delete("/{user_id}/avatar")
-async def remove_avatar(
+def remove_avatar(
     user_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_sync),
     session: Session = Depends(get_session)
 ):
     """Remover avatar do perfil do usuário"""
@@ -2,10 +2,15 @@
 Rotas relacionadas à deleção de perfis.
 """
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import delete, update
 from sqlmodel import Session, select
 from core.database import get_session
-from core.models import User, UserProfile, Rating, UserLibrary, Recommendation
-from core.auth import get_current_active_user
+from core.models import (
+    User, UserProfile, Rating, UserLibrary, UserMovieLibrary, Recommendation, UserTasteProfile,
+    Follow, UserReview, ImportJob, Report, Moderation,
+)
+from core.auth import get_current_active_user_sync
+from services import activity_log, counters, feed
 from pathlib import Path
 import logging
 
@@ -18,9 +23,9 @@ AVATAR_DIR = Path("uploads/avatars")
 
 
 @router.delete("/{user_id}")
-async def delete_profile(
+def delete_profile(
     user_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(get_current_active_user_sync),
     session: Session = Depends(get_session)
 ):
     """Deletar perfil e usuário"""
@@ -43,21 +48,56 @@ async def delete_profile(
     if profile:
         session.delete(profile)
     
+    # Deletar timeline "apenas seguindo" do usuário e entradas das suas avaliações
+    feed.remover_usuario(session, user_id)
+    
+    # Descontar dos livros/filmes as avaliações do usuário e remover seus contadores
+    counters.remover_usuario(session, user_id)
+    
+    # Deletar log de atividades do usuário
+    activity_log.remover_usuario(session, user_id)
+    
     # Deletar avaliações do usuário
     ratings = session.exec(select(Rating).where(Rating.user_id == user_id)).all()
     for rating in ratings:
         session.delete(rating)
     
-    # Deletar biblioteca do usuário
+    # Deletar bibliotecas do usuário
     library_entries = session.exec(select(UserLibrary).where(UserLibrary.user_id == user_id)).all()
     for entry in library_entries:
         session.delete(entry)
+    session.execute(delete(UserMovieLibrary).where(UserMovieLibrary.user_id == user_id))
+    
+    # Deletar follows, reviews e importações do usuário (contadores já descontados acima)
+    session.execute(delete(Follow).where((Follow.follower_id == user_id) | (Follow.following_id == user_id)))
+    session.execute(
+        delete(UserReview).where(
+            (UserReview.author_user_id == user_id) | (UserReview.target_user_id == user_id)
+        )
+    )
+    session.execute(delete(ImportJob).where(ImportJob.user_id == user_id))
+    
+    # Denúncias feitas pelo usuário e ações de moderação que o envolvem
+    session.execute(delete(Report).where(Report.reporter_id == user_id))
+    session.execute(
+        update(Report).where(Report.reviewed_by == user_id).values(reviewed_by=None)
+    )
+    session.execute(
+        delete(Moderation).where(
+            (Moderation.moderator_id == user_id) | (Moderation.target_user_id == user_id)
+        )
+    )
     
     # Deletar recomendações do usuário
     recommendations = session.exec(select(Recommendation).where(Recommendation.user_id == user_id)).all()
     for rec in recommendations:
         session.delete(rec)
     
+    # Deletar perfil de gosto do usuário
+    taste_profile = session.get(UserTasteProfile, user_id)
+    if taste_profile:
+        session.delete(taste_profile)
+    
     # Deletar usuário
     user = session.get(User, user_id)
     if user:
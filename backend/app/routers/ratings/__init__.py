@@ -3,7 +3,7 @@ Módulo de rotas de avaliações (ratings).
 Agrega todos os sub-módulos de rotas relacionadas a avaliações.
 """
 from fastapi import APIRouter
-from . import crud, user_ratings, reviews
+from . import crud, user_ratings, reviews, imports
 
 # Router principal que agrega todos os sub-routers
 router = APIRouter(tags=["ratings"])
@@ -12,6 +12,7 @@ router = APIRouter(tags=["ratings"])
 router.include_router(crud.router)
 router.include_router(user_ratings.router)
 router.include_router(reviews.router)
+router.include_router(imports.router)
 
 __all__ = ["router"]
 
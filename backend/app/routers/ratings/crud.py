@@ -1,17 +1,18 @@
 """
 Rotas CRUD de avaliações (ratings).
 """
-from fastapi import APIRouter, HTTPException, Depends, status, Response
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, status, Response
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 import logging
 
 from sqlmodel import Session, select
-from core.models import User, Rating, Book as DBBook, Movie as DBMovie
-from core.schemas import RatingCreate, RatingRead, RatingUpdate
-from core.database import get_session
-from core.auth import get_current_active_user
-from services.api_clients import buscar_detalhes_filme
-from services.google_books import obter_livro_por_id
-from ..utils import omdb_title_to_movie
+from sqlmodel.ext.asyncio.session import AsyncSession
+from core.models import User, Rating
+from core.schemas import RatingCreate, RatingRead, RatingUpdate, RatingUpsert
+from core.database import get_async_session, get_session, inserir_ignorando_duplicados
+from core.auth import get_current_active_user, get_current_active_user_sync
+from services import catalog, events, feed
 
 logger = logging.getLogger(__name__)
 
@@ -21,111 +22,149 @@ router = APIRouter(tags=["ratings"])
 @router.post("/ratings/", response_model=RatingRead, status_code=status.HTTP_201_CREATED)
 async def create_rating(
     avaliacao: RatingCreate, 
-    session: Session = Depends(get_session),
+    background_tasks: BackgroundTasks,
+    session: AsyncSession = Depends(get_async_session),
     usuario_atual: User = Depends(get_current_active_user)
 ):
     logger.info(f"Criando avaliação para usuário: {usuario_atual.username}")
     if not avaliacao.book_id and not avaliacao.movie_id and not getattr(avaliacao, "book_external_id", None) and not getattr(avaliacao, "movie_external_id", None):
         raise HTTPException(status_code=400, detail="Uma avaliação deve estar associada a um livro (id interno ou externo) ou filme (id interno ou externo).")
     
-    # Resolver book_external_id para um registro local se necessário
+    avaliacao_db, pendentes = await session.run_sync(_inserir_avaliacao, usuario_atual.id, avaliacao)
+    if avaliacao_db is None:
+        await session.rollback()
+        raise HTTPException(status_code=409, detail="Você já avaliou este item.")
+    await session.commit()
+    await session.refresh(avaliacao_db)
+    await _apos_criar_avaliacao(session, background_tasks, avaliacao_db, pendentes)
+    return avaliacao_db
+
+
+def _inserir_avaliacao(
+    session: Session, user_id: int, avaliacao: RatingCreate
+) -> Tuple[Optional[Rating], Dict[str, List[str]]]:
+    """Parte síncrona de create_rating (ganchos de services/events.py), executada com run_sync."""
+    # Resolver ids externos para registros locais. Itens ainda desconhecidos ganham um
+    # registro provisório na mesma transação e são completados em segundo plano.
+    pendentes = {}
     livro_id_resolvido = avaliacao.book_id
     if not livro_id_resolvido and getattr(avaliacao, "book_external_id", None):
-        id_externo = avaliacao.book_external_id
-        livro_db = session.exec(select(DBBook).where(DBBook.external_id == id_externo)).first()
-        if not livro_db:
-            livro = None
-            try:
-                livro = obter_livro_por_id(id_externo)
-            except Exception:
-                logger.exception("Falha ao buscar detalhes do livro externo %s", id_externo)
-            titulo = None
-            autores = None
-            url_imagem = None
-            generos = None
-            if livro:
-                info_volume = livro.get("volumeInfo", {})
-                titulo = info_volume.get("title", "Sem título")
-                authors_list = info_volume.get("authors", [])
-                if isinstance(authors_list, list) and authors_list:
-                    autores = ", ".join(authors_list)
-                elif isinstance(authors_list, str):
-                    autores = authors_list
-                image_links = info_volume.get("imageLinks", {})
-                url_imagem = image_links.get("thumbnail") if image_links else None
-                categorias = info_volume.get("categories", [])
-                generos = categorias if isinstance(categorias, list) else []
-            livro_db = DBBook(
-                title=titulo or "Sem título",
-                author=autores,
-                cover_url=url_imagem,
-                external_id=id_externo,
-                genres=generos
-            )
-            session.add(livro_db)
-            session.commit()
-            session.refresh(livro_db)
-        livro_id_resolvido = livro_db.id
-
-    # Resolver movie_external_id para um registro local se necessário
+        ids_resolvidos, pendentes["book"] = catalog.resolver_ids_externos(session, "book", [avaliacao.book_external_id])
+        livro_id_resolvido = ids_resolvidos[avaliacao.book_external_id]
+
     filme_id_resolvido = avaliacao.movie_id
     if not filme_id_resolvido and getattr(avaliacao, "movie_external_id", None):
-        id_externo = avaliacao.movie_external_id
-        filme_db = session.exec(select(DBMovie).where(DBMovie.external_id == id_externo)).first()
-        if not filme_db:
-            dados_filme = buscar_detalhes_filme(id_externo)
-            if dados_filme:
-                objeto_filme = omdb_title_to_movie(dados_filme)
-                data_lancamento = None
-                if objeto_filme.release_date:
-                    try:
-                        if len(objeto_filme.release_date) == 4:
-                            from datetime import date
-                            data_lancamento = date(int(objeto_filme.release_date), 1, 1)
-                        elif '-' in objeto_filme.release_date:
-                            from datetime import datetime
-                            data_lancamento = datetime.strptime(objeto_filme.release_date, '%Y-%m-%d').date()
-                    except (ValueError, TypeError):
-                        pass
-                
-                generos = getattr(objeto_filme, "genres", None)
-                
-                filme_db = DBMovie(
-                    title=objeto_filme.title,
-                    description=objeto_filme.overview,
-                    cover_url=objeto_filme.poster_path,
-                    external_id=id_externo,
-                    release_date=data_lancamento,
-                    genres=generos,
-                )
-                session.add(filme_db)
-                session.commit()
-                session.refresh(filme_db)
-                filme_id_resolvido = filme_db.id
-        else:
-            filme_id_resolvido = filme_db.id
+        ids_resolvidos, pendentes["movie"] = catalog.resolver_ids_externos(session, "movie", [avaliacao.movie_external_id])
+        filme_id_resolvido = ids_resolvidos[avaliacao.movie_external_id]
 
     dados_avaliacao = {
-        "user_id": usuario_atual.id,
+        "user_id": user_id,
         "book_id": livro_id_resolvido,
         "movie_id": filme_id_resolvido,
         "score": avaliacao.score,
         "comment": avaliacao.comment,
+        "created_at": datetime.utcnow(),
     }
     
-    avaliacao_db = Rating(**dados_avaliacao)
-    session.add(avaliacao_db)
-    session.commit()
-    session.refresh(avaliacao_db)
+    coluna_item = "book_id" if livro_id_resolvido else "movie_id"
+    inseridas = inserir_ignorando_duplicados(session, Rating, [dados_avaliacao], ["user_id", coluna_item])
+    if not inseridas:
+        return None, pendentes
+    avaliacao_db = session.get(Rating, inseridas[0])
+    events.ao_criar_avaliacao(session, avaliacao_db)
+    return avaliacao_db, pendentes
+
+
+@router.put("/ratings/{media_type}/{external_id}", response_model=RatingRead)
+async def upsert_rating(
+    media_type: str,
+    external_id: str,
+    dados: RatingUpsert,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    session: AsyncSession = Depends(get_async_session),
+    usuario_atual: User = Depends(get_current_active_user)
+):
+    """
+    Cria ou substitui a avaliação do usuário para um livro ou filme (por id externo).
+    Idempotente: repetir a requisição não cria avaliações duplicadas.
+    Retorna 201 quando a avaliação é criada e 200 quando é atualizada.
+    """
+    logger.info(f"Gravando avaliação de {media_type} {external_id} para usuário: {usuario_atual.username}")
+    if media_type not in ("book", "movie"):
+        raise HTTPException(status_code=404, detail="Tipo de mídia inválido. Use 'book' ou 'movie'.")
+
+    avaliacao_db, desconhecidos = await session.run_sync(
+        _gravar_avaliacao, usuario_atual.id, media_type, external_id, dados
+    )
+    await session.commit()
+    await session.refresh(avaliacao_db)
+    if desconhecidos is not None:
+        await _apos_criar_avaliacao(session, background_tasks, avaliacao_db, {media_type: desconhecidos})
+        response.status_code = status.HTTP_201_CREATED
     return avaliacao_db
 
 
+def _gravar_avaliacao(
+    session: Session, user_id: int, media_type: str, external_id: str, dados: RatingUpsert
+) -> Tuple[Rating, Optional[List[str]]]:
+    """
+    Parte síncrona de upsert_rating, executada com run_sync. Retorna a avaliação e,
+    quando ela foi criada, os ids externos ainda desconhecidos do catálogo (senão None).
+    """
+    ids_resolvidos, desconhecidos = catalog.resolver_ids_externos(session, media_type, [external_id])
+    item_id = ids_resolvidos[external_id]
+    coluna_item = "book_id" if media_type == "book" else "movie_id"
+    dados_avaliacao = {
+        "user_id": user_id,
+        coluna_item: item_id,
+        "score": dados.score,
+        "comment": dados.comment or None,
+        "created_at": datetime.utcnow(),
+    }
+
+    # INSERT ... ON CONFLICT DO NOTHING: sem leitura prévia e sem duplicatas em envios simultâneos
+    inseridas = inserir_ignorando_duplicados(session, Rating, [dados_avaliacao], ["user_id", coluna_item])
+    if inseridas:
+        avaliacao_db = session.get(Rating, inseridas[0])
+        events.ao_criar_avaliacao(session, avaliacao_db)
+        return avaliacao_db, desconhecidos
+
+    # Já existia: bloquear a linha para que envios simultâneos apliquem os deltas em sequência
+    avaliacao_db = session.exec(
+        select(Rating)
+        .where(Rating.user_id == user_id)
+        .where(getattr(Rating, coluna_item) == item_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    ).one()
+    nota_anterior = avaliacao_db.score
+    avaliacao_db.score = dados.score
+    avaliacao_db.comment = dados.comment or None
+    session.add(avaliacao_db)
+    if nota_anterior != dados.score:
+        events.ao_atualizar_avaliacao(session, avaliacao_db, nota_anterior)
+    return avaliacao_db, None
+
+
+async def _apos_criar_avaliacao(
+    session: AsyncSession,
+    background_tasks: BackgroundTasks,
+    avaliacao_db: Rating,
+    pendentes: Dict[str, List[str]],
+) -> None:
+    for tipo, ids_externos in pendentes.items():
+        catalog.fila.agendar(tipo, ids_externos)
+    background_tasks.add_task(feed.distribuir_avaliacao, avaliacao_db.id)
+    await session.run_sync(feed.publicar_avaliacao, avaliacao_db.id)
+
+
 @router.put("/ratings/{rating_id}", response_model=RatingRead)
-async def update_rating(
+def update_rating(
     rating_id: int,
     atualizacao_avaliacao: RatingUpdate,
     session: Session = Depends(get_session),
-    usuario_atual: User = Depends(get_current_active_user)
+    usuario_atual: User = Depends(get_current_active_user_sync)
 ):
     logger.info(f"Atualizando avaliação {rating_id} para usuário: {usuario_atual.username}")
     avaliacao_db = session.get(Rating, rating_id)
@@ -134,22 +173,27 @@ async def update_rating(
     if avaliacao_db.user_id != usuario_atual.id:
         raise HTTPException(status_code=403, detail="Você não tem permissão para editar esta avaliação.")
 
+    nota_anterior, comentario_anterior = avaliacao_db.score, avaliacao_db.comment
     if atualizacao_avaliacao.score is not None:
         avaliacao_db.score = atualizacao_avaliacao.score
     if atualizacao_avaliacao.comment is not None:
         avaliacao_db.comment = atualizacao_avaliacao.comment or None
+    if (avaliacao_db.score, avaliacao_db.comment) == (nota_anterior, comentario_anterior):
+        # Nada mudou: sem evento, contadores, perfil ou rankings a atualizar
+        return avaliacao_db
 
     session.add(avaliacao_db)
+    events.ao_atualizar_avaliacao(session, avaliacao_db, nota_anterior)
     session.commit()
     session.refresh(avaliacao_db)
     return avaliacao_db
 
 
 @router.delete("/ratings/{rating_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_rating(
+def delete_rating(
     rating_id: int,
     session: Session = Depends(get_session),
-    usuario_atual: User = Depends(get_current_active_user)
+    usuario_atual: User = Depends(get_current_active_user_sync)
 ):
     logger.info(f"Deletando avaliação {rating_id} para usuário: {usuario_atual.username}")
     avaliacao_db = session.get(Rating, rating_id)
@@ -158,6 +202,8 @@ async def delete_rating(
     if avaliacao_db.user_id != usuario_atual.id:
         raise HTTPException(status_code=403, detail="Você não tem permissão para excluir esta avaliação.")
 
+    # Dependentes (ex.: entradas da timeline) antes da avaliação, por causa das chaves estrangeiras
+    events.ao_remover_avaliacao(session, avaliacao_db)
     session.delete(avaliacao_db)
     session.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,69 @@
+"""
+Rotas de importação em lote de avaliações (CSV/NDJSON).
+"""
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile, status
+from typing import Optional
+import logging
+import shutil
+import tempfile
+
+from sqlmodel import Session
+from core.models import ImportJob, User
+from core.schemas import ImportJobRead
+from core.database import get_session
+from core.auth import get_current_active_user_sync
+from services import rating_import
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["ratings"])
+
+TAMANHO_BLOCO_UPLOAD = 1024 * 1024
+
+
+@router.post("/ratings/import", response_model=ImportJobRead, status_code=status.HTTP_202_ACCEPTED)
+def import_ratings(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    usuario_atual: User = Depends(get_current_active_user_sync),
+    session: Session = Depends(get_session)
+):
+    """
+    Importa avaliações de um arquivo CSV ou NDJSON (formato pelo parâmetro `format`
+    ou pela extensão). Cada linha deve ter book_external_id ou movie_external_id
+    (ou type + external_id), score e, opcionalmente, comment e created_at.
+    O processamento é feito em segundo plano; acompanhe por GET /ratings/import/{job_id}.
+    """
+    formato = rating_import.detectar_formato(file.filename, format)
+    if not formato:
+        raise HTTPException(status_code=400, detail="Formato inválido. Use CSV ou NDJSON.")
+    if usuario_atual.is_muted:
+        raise HTTPException(status_code=403, detail="Você está silenciado e não pode importar avaliações")
+    
+    # Copiar o upload em blocos para um arquivo próprio, lido depois linha a linha
+    with tempfile.NamedTemporaryFile(delete=False, suffix=f".{formato}") as destino:
+        shutil.copyfileobj(file.file, destino, TAMANHO_BLOCO_UPLOAD)
+        caminho = destino.name
+    
+    job = ImportJob(user_id=usuario_atual.id, filename=file.filename, format=formato)
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+    logger.info(f"Importação {job.id} criada para o usuário {usuario_atual.username}")
+    
+    background_tasks.add_task(rating_import.processar_importacao, job.id, caminho)
+    return job
+
+
+@router.get("/ratings/import/{job_id}", response_model=ImportJobRead)
+def get_import_job(
+    job_id: int,
+    usuario_atual: User = Depends(get_current_active_user_sync),
+    session: Session = Depends(get_session)
+):
+    """Consulta o andamento de uma importação de avaliações"""
+    job = session.get(ImportJob, job_id)
+    if not job or job.user_id != usuario_atual.id:
+        raise HTTPException(status_code=404, detail="Importação não encontrada")
+    return job
@@ -3,13 +3,19 @@ Rotas relacionadas a reviews (avaliações enriquecidas).
 Este módulo mantém compatibilidade com código legado que usa /reviews.
 A lógica real está consolidada em user_ratings.py.
 """
-from fastapi import APIRouter, Depends
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, Query, Response
+from typing import List, Dict, Any, Optional
 import logging
 
 from sqlmodel import Session
-from core.database import get_session
-from .user_ratings import get_user_ratings
+from core.replicas import get_read_session
+from ..utils import definir_proximo_cursor
+from .user_ratings import (
+    MAX_AVALIACOES_POR_PAGINA,
+    listar_avaliacoes_usuario,
+    montar_avaliacao,
+    resolver_campos,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -17,13 +23,22 @@ router = APIRouter(tags=["reviews"])
 
 
 @router.get("/users/{user_id}/reviews", response_model=List[Dict[str, Any]])
-async def get_user_reviews(user_id: int, session: Session = Depends(get_session)):
+def get_user_reviews(
+    user_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_AVALIACOES_POR_PAGINA),
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_read_session)
+):
     """
     Obtém avaliações do usuário com detalhes completos (book/movie objects).
-    Este endpoint é um wrapper que chama get_user_ratings com include_details=True
+    Este endpoint é um wrapper da lógica de get_user_ratings com include_details=True
     para manter compatibilidade com código legado.
     """
     logger.info(f"Obtendo avaliações (reviews) para o usuário: {user_id}")
     # Reutilizar a lógica consolidada de ratings com include_details=True
-    return await get_user_ratings(user_id, include_details=True, session=session)
-
+    campos = resolver_campos(None, include_details=True)
+    linhas = listar_avaliacoes_usuario(session, user_id, campos, limit, cursor)
+    if limit:
+        definir_proximo_cursor(response, linhas, limit)
+    return [montar_avaliacao(linha, campos) for linha in linhas]
@@ -1,25 +1,147 @@
 """
 Rotas relacionadas a avaliações de usuários específicos.
 """
-from fastapi import APIRouter, Depends
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Dict, Any, Optional, Set
 import logging
 
 from sqlmodel import Session, select
 from core.models import Book as DBBook, Movie as DBMovie
 from core.models import Rating
-from core.database import get_session
+from core.replicas import get_read_session
+from ..utils import filtro_cursor, definir_proximo_cursor
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["ratings"])
 
+CAMPOS_PADRAO = (
+    "id",
+    "user_id",
+    "book_id",
+    "movie_id",
+    "score",
+    "rating",
+    "comment",
+    "created_at",
+    "book_external_id",
+    "movie_external_id",
+)
+CAMPOS_DETALHES = ("book", "movie")
+MAX_AVALIACOES_POR_PAGINA = 1000
+
+
+def resolver_campos(fields: Optional[str], include_details: bool) -> Set[str]:
+    """Campos pedidos em `fields` (separados por vírgula) ou os padrões do endpoint."""
+    if not fields:
+        return set(CAMPOS_PADRAO) | (set(CAMPOS_DETALHES) if include_details else set())
+    campos = {campo.strip() for campo in fields.split(",") if campo.strip()}
+    invalidos = campos - set(CAMPOS_PADRAO) - set(CAMPOS_DETALHES)
+    if invalidos:
+        raise HTTPException(status_code=400, detail=f"Campos inválidos: {', '.join(sorted(invalidos))}")
+    return campos
+
+
+def listar_avaliacoes_usuario(
+    session: Session,
+    user_id: int,
+    campos: Set[str],
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> List[Any]:
+    """
+    Avaliações do usuário em uma única consulta, com junções externas a Book e
+    Movie apenas quando algum campo delas foi pedido. Ordem: (created_at, id).
+    """
+    colunas = [Rating.id, Rating.created_at, Rating.book_id, Rating.movie_id]
+    if "user_id" in campos:
+        colunas.append(Rating.user_id)
+    if "score" in campos or "rating" in campos:
+        colunas.append(Rating.score)
+    if "comment" in campos:
+        colunas.append(Rating.comment)
+    
+    usa_livro = usa_filme = False
+    if "book_external_id" in campos:
+        colunas.append(DBBook.external_id.label("book_external_id"))
+        usa_livro = True
+    if "book" in campos:
+        colunas += [
+            DBBook.id.label("book_db_id"),
+            DBBook.title.label("book_title"),
+            DBBook.author.label("book_author"),
+            DBBook.genres.label("book_genres"),
+        ]
+        usa_livro = True
+    if "movie_external_id" in campos:
+        colunas.append(DBMovie.external_id.label("movie_external_id"))
+        usa_filme = True
+    if "movie" in campos:
+        colunas += [
+            DBMovie.id.label("movie_db_id"),
+            DBMovie.title.label("movie_title"),
+            DBMovie.director.label("movie_director"),
+            DBMovie.genres.label("movie_genres"),
+        ]
+        usa_filme = True
+    
+    consulta = select(*colunas).where(Rating.user_id == user_id)
+    if usa_livro:
+        consulta = consulta.outerjoin(DBBook, DBBook.id == Rating.book_id)
+    if usa_filme:
+        consulta = consulta.outerjoin(DBMovie, DBMovie.id == Rating.movie_id)
+    if cursor:
+        consulta = consulta.where(filtro_cursor(Rating.created_at, Rating.id, cursor, crescente=True))
+    consulta = consulta.order_by(Rating.created_at, Rating.id)
+    if limit:
+        consulta = consulta.limit(limit)
+    return session.exec(consulta).all()
+
+
+def montar_avaliacao(linha, campos: Set[str]) -> Dict[str, Any]:
+    dicionario_avaliacao = {
+        "id": linha.id,
+        "user_id": getattr(linha, "user_id", None),
+        "book_id": linha.book_id,
+        "movie_id": linha.movie_id,
+        "score": getattr(linha, "score", None),
+        "rating": getattr(linha, "score", None),  # Compatibilidade com reviews
+        "comment": getattr(linha, "comment", None),
+        "created_at": linha.created_at,
+        "book_external_id": getattr(linha, "book_external_id", None),
+        "movie_external_id": getattr(linha, "movie_external_id", None),
+    }
+    dicionario_avaliacao = {chave: valor for chave, valor in dicionario_avaliacao.items() if chave in campos}
+    
+    # Objetos book/movie completos apenas quando pedidos e existentes no catálogo
+    if "book" in campos and linha.book_id and linha.book_db_id is not None:
+        dicionario_avaliacao["book"] = {
+            "id": linha.book_db_id,
+            "title": linha.book_title,
+            "author": linha.book_author,
+            "genres": linha.book_genres or [],
+            "genre": ", ".join(linha.book_genres) if linha.book_genres else None,
+        }
+    if "movie" in campos and linha.movie_id and linha.movie_db_id is not None:
+        dicionario_avaliacao["movie"] = {
+            "id": linha.movie_db_id,
+            "title": linha.movie_title,
+            "director": linha.movie_director,
+            "genres": linha.movie_genres or [],
+            "genre": ", ".join(linha.movie_genres) if linha.movie_genres else None,
+        }
+    return dicionario_avaliacao
+
 
 @router.get("/users/{user_id}/ratings", response_model=List[Dict[str, Any]])
-async def get_user_ratings(
-    user_id: int, 
+def get_user_ratings(
+    user_id: int,
+    response: Response,
     include_details: bool = False,
-    session: Session = Depends(get_session)
+    fields: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_AVALIACOES_POR_PAGINA),
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_read_session)
 ):
     """
     Obtém avaliações do usuário.
@@ -28,56 +150,14 @@ async def get_user_ratings(
         user_id: ID do usuário
         include_details: Se True, retorna objetos book/movie completos (como /reviews)
                         Se False, retorna apenas external_ids (comportamento padrão)
+        fields: Lista de campos separados por vírgula (ex: "id,score,book_external_id");
+                apenas as colunas necessárias são consultadas
+        limit: Quantidade máxima por página (sem limite, retorna todas)
+        cursor: Valor do cabeçalho X-Next-Cursor da página anterior
     """
     logger.info(f"Obtendo avaliações para usuário: {user_id}, include_details={include_details}")
-    avaliacoes = session.exec(select(Rating).where(Rating.user_id == user_id)).all()
-    avaliacoes_com_id_externo = []
-    for avaliacao in avaliacoes:
-        dicionario_avaliacao = {
-            "id": avaliacao.id,
-            "user_id": avaliacao.user_id,
-            "book_id": avaliacao.book_id,
-            "movie_id": avaliacao.movie_id,
-            "score": avaliacao.score,
-            "rating": avaliacao.score,  # Compatibilidade com reviews
-            "comment": avaliacao.comment,
-            "created_at": avaliacao.created_at,
-            "book_external_id": None,
-            "movie_external_id": None,
-        }
-        
-        if avaliacao.book_id:
-            livro_db = session.get(DBBook, avaliacao.book_id)
-            if livro_db:
-                if livro_db.external_id:
-                    dicionario_avaliacao["book_external_id"] = livro_db.external_id
-                
-                # Se include_details=True, adicionar objeto book completo
-                if include_details:
-                    dicionario_avaliacao["book"] = {
-                        "id": livro_db.id,
-                        "title": livro_db.title,
-                        "author": livro_db.author,
-                        "genres": livro_db.genres or [],
-                        "genre": ", ".join(livro_db.genres) if livro_db.genres else None,
-                    }
-        
-        if avaliacao.movie_id:
-            filme_db = session.get(DBMovie, avaliacao.movie_id)
-            if filme_db:
-                if filme_db.external_id:
-                    dicionario_avaliacao["movie_external_id"] = filme_db.external_id
-                
-                # Se include_details=True, adicionar objeto movie completo
-                if include_details:
-                    dicionario_avaliacao["movie"] = {
-                        "id": filme_db.id,
-                        "title": filme_db.title,
-                        "director": filme_db.director,
-                        "genres": filme_db.genres or [],
-                        "genre": ", ".join(filme_db.genres) if filme_db.genres else None,
-                    }
-        
-        avaliacoes_com_id_externo.append(dicionario_avaliacao)
-    return avaliacoes_com_id_externo
-
+    campos = resolver_campos(fields, include_details)
+    linhas = listar_avaliacoes_usuario(session, user_id, campos, limit, cursor)
+    if limit:
+        definir_proximo_cursor(response, linhas, limit)
+    return [montar_avaliacao(linha, campos) for linha in linhas]
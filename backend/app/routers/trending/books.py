@@ -0,0 +1,50 @@
+"""
+Rotas relacionadas aos livros em alta.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Dict, Any
+import logging
+
+from sqlmodel import Session, select
+from core.database import get_session
+from core.models import Book as DBBook
+from services.trending import JANELAS, mais_populares
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["trending"])
+
+
+@router.get("/trending/books", response_model=List[Dict[str, Any]])
+def get_trending_books(
+    window: str = "24h",
+    limit: int = Query(20, ge=1, le=100),
+    session: Session = Depends(get_session)
+):
+    """Livros mais populares na janela informada (1h, 24h ou 7d)."""
+    logger.info(f"Obtendo livros em alta na janela {window}")
+    if window not in JANELAS:
+        raise HTTPException(status_code=400, detail=f"Janela inválida. Use uma de: {', '.join(JANELAS)}")
+    
+    populares = mais_populares("book", window, limit)
+    if not populares:
+        return []
+    
+    livros = {
+        livro.external_id: livro
+        for livro in session.exec(
+            select(DBBook).where(DBBook.external_id.in_([id_externo for id_externo, _ in populares]))
+        ).all()
+    }
+    
+    resultado = []
+    for id_externo, pontuacao in populares:
+        livro = livros.get(id_externo)
+        resultado.append({
+            "id": id_externo,
+            "score": pontuacao,
+            "title": livro.title if livro else None,
+            "author": livro.author if livro else None,
+            "cover_url": livro.cover_url if livro else None,
+        })
+    return resultado
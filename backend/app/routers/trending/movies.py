@@ -0,0 +1,50 @@
+"""
+Rotas relacionadas aos filmes em alta.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Dict, Any
+import logging
+
+from sqlmodel import Session, select
+from core.database import get_session
+from core.models import Movie as DBMovie
+from services.trending import JANELAS, mais_populares
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["trending"])
+
+
+@router.get("/trending/movies", response_model=List[Dict[str, Any]])
+def get_trending_movies(
+    window: str = "24h",
+    limit: int = Query(20, ge=1, le=100),
+    session: Session = Depends(get_session)
+):
+    """Filmes mais populares na janela informada (1h, 24h ou 7d)."""
+    logger.info(f"Obtendo filmes em alta na janela {window}")
+    if window not in JANELAS:
+        raise HTTPException(status_code=400, detail=f"Janela inválida. Use uma de: {', '.join(JANELAS)}")
+    
+    populares = mais_populares("movie", window, limit)
+    if not populares:
+        return []
+    
+    filmes = {
+        filme.external_id: filme
+        for filme in session.exec(
+            select(DBMovie).where(DBMovie.external_id.in_([id_externo for id_externo, _ in populares]))
+        ).all()
+    }
+    
+    resultado = []
+    for id_externo, pontuacao in populares:
+        filme = filmes.get(id_externo)
+        resultado.append({
+            "id": id_externo,
+            "score": pontuacao,
+            "title": filme.title if filme else None,
+            "director": filme.director if filme else None,
+            "cover_url": filme.cover_url if filme else None,
+        })
+    return resultado
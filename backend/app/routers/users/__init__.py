@@ -3,7 +3,7 @@ Módulo de rotas de usuários.
 Agrega todos os sub-módulos de rotas relacionadas a usuários.
 """
 from fastapi import APIRouter
-from . import auth, crud, search, follow, activities, user_reviews, timeline, moderation
+from . import auth, crud, search, follow, activities, user_reviews, timeline, moderation, stats, export
 
 # Router principal que agrega todos os sub-routers
 router = APIRouter(tags=["users"])
@@ -17,6 +17,8 @@ router.include_router(activities.router)
 router.include_router(user_reviews.router)
 router.include_router(timeline.router)
 router.include_router(moderation.router)
+router.include_router(stats.router)
+router.include_router(export.router)
 
 __all__ = ["router"]
 
@@ -1,64 +1,185 @@
 """
 Rotas relacionadas às atividades dos usuários.
 """
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from typing import Any, Dict, List, Optional, Set
 import logging
 
+from sqlalchemy import case
+from sqlalchemy.orm import aliased
 from sqlmodel import Session, select
-from core.models import User
-from core.database import get_session
+from core.models import ActivityEvent, User, Rating, Book as DBBook, Movie as DBMovie
+from core.schemas import ActivityEventRead
+from core.replicas import get_read_session
+from ..utils import filtro_cursor, definir_proximo_cursor
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["users"])
 
+# Verbos exibidos em /activities e o texto da ação. Edições de avaliação não
+# geram entrada própria: a atividade "avaliou" já mostra a nota e o comentário atuais
+ACOES = {
+    "rated": "avaliou",
+    "followed": "começou a seguir",
+    "library_added": "adicionou à biblioteca",
+    "reviewed_user": "avaliou o perfil de",
+}
+# Evento que desfaz cada ação; a ação some de /activities quando há um reverso posterior
+REVERSOS = {
+    "rated": "rating_deleted",
+    "followed": "unfollowed",
+    "library_added": "library_removed",
+}
+
 
 @router.get("/users/{user_id}/activities", response_model=List[dict])
 def get_user_activities(
     user_id: int,
-    limit: int = 10,
-    session: Session = Depends(get_session)
+    response: Response,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_read_session)
 ):
-    """Buscar atividades recentes de um usuário (avaliações)"""
+    """
+    Buscar atividades recentes de um usuário (avaliações, follows, biblioteca e reviews),
+    lidas do log de atividades. Ações desfeitas depois (avaliação removida, unfollow,
+    item retirado da biblioteca) não aparecem; avaliações mostram a nota atual.
+    Para a próxima página, envie em `cursor` o valor do cabeçalho X-Next-Cursor.
+    """
     logger.info(f"Obtendo atividades para o usuário {user_id}")
     
     target_user = session.get(User, user_id)
     if not target_user:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     
-    from core.models import Rating, Book as DBBook, Movie as DBMovie
+    reverso = aliased(ActivityEvent)
+    desfeita = (
+        select(reverso.id)
+        .where(reverso.actor_id == ActivityEvent.actor_id)
+        .where(reverso.object_type == ActivityEvent.object_type)
+        .where(reverso.object_id == ActivityEvent.object_id)
+        .where(reverso.verb == case(REVERSOS, value=ActivityEvent.verb))
+        .where(reverso.id > ActivityEvent.id)
+        .exists()
+    )
+    consulta = (
+        select(ActivityEvent)
+        .where(ActivityEvent.actor_id == user_id)
+        .where(ActivityEvent.verb.in_(list(ACOES)))
+        .where(~desfeita)
+    )
+    if cursor:
+        consulta = consulta.where(filtro_cursor(ActivityEvent.created_at, ActivityEvent.id, cursor))
     
-    ratings = session.exec(
-        select(Rating)
-        .where(Rating.user_id == user_id)
-        .order_by(Rating.created_at.desc())
+    eventos = session.exec(
+        consulta
+        .order_by(ActivityEvent.created_at.desc(), ActivityEvent.id.desc())
         .limit(limit)
     ).all()
     
+    activities = _montar_atividades(session, eventos)
+    definir_proximo_cursor(response, eventos, limit)
+    return activities
+
+
+def _montar_atividades(session: Session, eventos: List[ActivityEvent]) -> List[dict]:
+    """Converte os eventos no formato de atividade, buscando títulos, nomes e comentários em lote."""
+    ids_avaliacoes, ids_usuarios = set(), set()
+    ids_itens: Dict[str, Set[int]] = {"book": set(), "movie": set()}
+    externos: Dict[str, Set[str]] = {"book": set(), "movie": set()}
+    for evento in eventos:
+        payload = evento.payload or {}
+        if evento.object_type == "rating":
+            ids_avaliacoes.add(int(evento.object_id))
+            for tipo in ("book", "movie"):
+                if payload.get(f"{tipo}_id"):
+                    ids_itens[tipo].add(payload[f"{tipo}_id"])
+        elif evento.object_type == "user":
+            ids_usuarios.add(int(evento.object_id))
+        elif not payload.get("title"):
+            externos[evento.object_type].add(evento.object_id)
+    
+    avaliacoes = {
+        linha.id: linha
+        for linha in session.exec(
+            select(Rating.id, Rating.score, Rating.comment).where(Rating.id.in_(ids_avaliacoes))
+        )
+    } if ids_avaliacoes else {}
+    nomes = dict(session.exec(
+        select(User.id, User.username).where(User.id.in_(ids_usuarios))
+    ).all()) if ids_usuarios else {}
+    titulos: Dict[str, Dict[Any, str]] = {}
+    for tipo, modelo in (("book", DBBook), ("movie", DBMovie)):
+        titulos[tipo] = dict(session.exec(
+            select(modelo.id, modelo.title).where(modelo.id.in_(ids_itens[tipo]))
+        ).all()) if ids_itens[tipo] else {}
+        titulos[f"{tipo}_externo"] = dict(session.exec(
+            select(modelo.external_id, modelo.title).where(modelo.external_id.in_(externos[tipo]))
+        ).all()) if externos[tipo] else {}
+    
     activities = []
-    for rating in ratings:
+    for evento in eventos:
+        payload = evento.payload or {}
+        if evento.object_type == "rating" and int(evento.object_id) not in avaliacoes:
+            # Removida sem evento próprio (ex.: unificação de duplicatas)
+            continue
         activity = {
-            "id": rating.id,
-            "type": "rating",
-            "action": "avaliou",
-            "rating": rating.score,
-            "comment": rating.comment,
-            "created_at": rating.created_at.isoformat() if rating.created_at else None,
+            "id": evento.id,
+            "type": evento.object_type,
+            "verb": evento.verb,
+            "action": ACOES[evento.verb],
+            "created_at": evento.created_at.isoformat() if evento.created_at else None,
         }
-        
-        if rating.book_id:
-            book = session.get(DBBook, rating.book_id)
-            if book:
-                activity["highlight"] = book.title
-                activity["book_id"] = book.id
-        elif rating.movie_id:
-            movie = session.get(DBMovie, rating.movie_id)
-            if movie:
-                activity["highlight"] = movie.title
-                activity["movie_id"] = movie.id
-        
+        if evento.object_type == "rating":
+            avaliacao = avaliacoes[int(evento.object_id)]
+            activity["rating"] = avaliacao.score
+            activity["comment"] = avaliacao.comment
+            for tipo in ("book", "movie"):
+                item_id = payload.get(f"{tipo}_id")
+                if item_id and item_id in titulos[tipo]:
+                    activity["highlight"] = titulos[tipo][item_id]
+                    activity[f"{tipo}_id"] = item_id
+        elif evento.object_type == "user":
+            activity["target_user_id"] = int(evento.object_id)
+            activity["highlight"] = nomes.get(int(evento.object_id))
+            if evento.verb == "reviewed_user":
+                activity["rating"] = payload.get("rating")
+        else:
+            activity["external_id"] = evento.object_id
+            activity["highlight"] = payload.get("title") or titulos[f"{evento.object_type}_externo"].get(evento.object_id)
         activities.append(activity)
-    
     return activities
 
+
+@router.get("/users/{user_id}/events", response_model=List[ActivityEventRead])
+def get_user_activity_events(
+    user_id: int,
+    response: Response,
+    limit: int = Query(20, ge=1, le=200),
+    verb: Optional[List[str]] = Query(None),
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_read_session)
+):
+    """
+    Buscar o log de atividades de um usuário (avaliações, follows, biblioteca e reviews),
+    do mais recente para o mais antigo. `verb` pode ser repetido para filtrar.
+    Para a próxima página, envie em `cursor` o valor do cabeçalho X-Next-Cursor.
+    """
+    if not session.get(User, user_id):
+        raise HTTPException(status_code=404, detail="Usuário não encontrado")
+    
+    consulta = select(ActivityEvent).where(ActivityEvent.actor_id == user_id)
+    if verb:
+        consulta = consulta.where(ActivityEvent.verb.in_(verb))
+    if cursor:
+        consulta = consulta.where(filtro_cursor(ActivityEvent.created_at, ActivityEvent.id, cursor))
+    
+    eventos = session.exec(
+        consulta
+        .order_by(ActivityEvent.created_at.desc(), ActivityEvent.id.desc())
+        .limit(limit)
+    ).all()
+    
+    definir_proximo_cursor(response, eventos, limit)
+    return eventos
@@ -20,7 +20,7 @@ router = APIRouter(tags=["auth"])
 
 
 @router.post("/token", response_model=Token)
-async def login_for_access_token(
+def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     session: Session = Depends(get_session)
 ):
@@ -48,7 +48,7 @@ async def login_for_access_token(
 
 
 @router.post("/login", response_model=Token)
-async def login(login_usuario: UserLogin, session: Session = Depends(get_session)):
+def login(login_usuario: UserLogin, session: Session = Depends(get_session)):
     logger.info(f"Tentativa de login para usuário: {login_usuario.username} (JSON)")
     """Endpoint de login alternativo usando JSON"""
     usuario = authenticate_user(session, login_usuario.username, login_usuario.password)
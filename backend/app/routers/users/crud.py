@@ -8,7 +8,7 @@ from sqlmodel import Session, select
 from core.models import User
 from core.schemas import UserCreate, UserRead, UserUpdate
 from core.database import get_session
-from core.auth import get_current_active_user, get_password_hash
+from core.auth import get_current_active_user, get_current_active_user_sync, get_password_hash
 
 logger = logging.getLogger(__name__)
 
@@ -58,7 +58,7 @@ async def read_users_me(usuario_atual: User = Depends(get_current_active_user)):
 def update_user(
     user_id: int, 
     atualizacao_usuario: UserUpdate, 
-    usuario_atual: User = Depends(get_current_active_user),
+    usuario_atual: User = Depends(get_current_active_user_sync),
     session: Session = Depends(get_session)
 ):
     logger.info(f"Atualizando usuário com id: {user_id}")
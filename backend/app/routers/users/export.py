@@ -0,0 +1,181 @@
+"""
+Exportação completa dos dados de um usuário (avaliações, bibliotecas e atividades).
+"""
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import csv
+import io
+import json
+import logging
+
+from sqlmodel import Session, select
+from core.models import ActivityEvent, User, Rating, UserLibrary, UserMovieLibrary, Book as DBBook, Movie as DBMovie
+from core.database import engine, get_session
+from core.auth import get_current_active_user_sync, is_admin
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["users"])
+
+SECOES = ("ratings", "library", "activity")
+FORMATOS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+CAMPOS_CSV = [
+    "section", "media_type", "external_id", "title", "score", "comment",
+    "verb", "object_id", "payload", "created_at",
+]
+LINHAS_POR_LOTE = 1000
+TAMANHO_BLOCO = 64 * 1024
+
+
+@router.get("/users/{user_id}/export")
+def export_user_data(
+    user_id: int,
+    format: str = "ndjson",
+    sections: Optional[str] = None,
+    usuario_atual: User = Depends(get_current_active_user_sync),
+    session: Session = Depends(get_session)
+):
+    """
+    Exporta os dados do usuário em NDJSON (padrão) ou CSV, enviados aos poucos.
+    `sections` limita a exportação (separadas por vírgula): ratings, library, activity.
+    Disponível para o próprio usuário e para administradores.
+    """
+    if usuario_atual.id != user_id and not is_admin(usuario_atual):
+        raise HTTPException(status_code=403, detail="Você não tem permissão para exportar os dados deste usuário")
+    if format not in FORMATOS:
+        raise HTTPException(status_code=400, detail="Formato inválido. Use ndjson ou csv.")
+    secoes = [s.strip() for s in sections.split(",") if s.strip()] if sections else list(SECOES)
+    invalidas = [s for s in secoes if s not in SECOES]
+    if invalidas:
+        raise HTTPException(status_code=400, detail=f"Seções inválidas: {', '.join(invalidas)}")
+    if not session.get(User, user_id):
+        raise HTTPException(status_code=404, detail="Usuário não encontrado")
+
+    logger.info(f"Exportando dados do usuário {user_id} ({format}) para {usuario_atual.username}")
+    linhas = _linhas_exportacao(user_id, secoes)
+    blocos = _em_csv(linhas) if format == "csv" else _em_ndjson(linhas)
+    return StreamingResponse(
+        blocos,
+        media_type=FORMATOS[format],
+        headers={"Content-Disposition": f'attachment; filename="user-{user_id}-export.{format}"'},
+    )
+
+
+def _linhas_exportacao(user_id: int, secoes: List[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Percorre os dados do usuário com cursores lidos em lotes (yield_per), sem
+    consultar as APIs externas. Usa uma sessão própria, que fica aberta enquanto
+    a resposta é enviada.
+    """
+    with Session(engine) as session:
+        if "ratings" in secoes:
+            consulta = (
+                select(
+                    Rating.score,
+                    Rating.comment,
+                    Rating.created_at,
+                    Rating.book_id,
+                    DBBook.external_id.label("book_external_id"),
+                    DBBook.title.label("book_title"),
+                    DBMovie.external_id.label("movie_external_id"),
+                    DBMovie.title.label("movie_title"),
+                )
+                .outerjoin(DBBook, DBBook.id == Rating.book_id)
+                .outerjoin(DBMovie, DBMovie.id == Rating.movie_id)
+                .where(Rating.user_id == user_id)
+                .order_by(Rating.created_at, Rating.id)
+                .execution_options(yield_per=LINHAS_POR_LOTE)
+            )
+            for linha in session.execute(consulta):
+                livro = linha.book_id is not None
+                yield {
+                    "section": "ratings",
+                    "media_type": "book" if livro else "movie",
+                    "external_id": linha.book_external_id if livro else linha.movie_external_id,
+                    "title": linha.book_title if livro else linha.movie_title,
+                    "score": linha.score,
+                    "comment": linha.comment,
+                    "created_at": linha.created_at,
+                }
+
+        if "library" in secoes:
+            for tipo, modelo, coluna_id, item in (
+                ("book", UserLibrary, UserLibrary.book_external_id, DBBook),
+                ("movie", UserMovieLibrary, UserMovieLibrary.movie_external_id, DBMovie),
+            ):
+                consulta = (
+                    select(coluna_id, item.title, modelo.created_at)
+                    .outerjoin(item, item.external_id == coluna_id)
+                    .where(modelo.user_id == user_id)
+                    .order_by(modelo.created_at, modelo.id)
+                    .execution_options(yield_per=LINHAS_POR_LOTE)
+                )
+                for id_externo, titulo, criado_em in session.execute(consulta):
+                    yield {
+                        "section": "library",
+                        "media_type": tipo,
+                        "external_id": id_externo,
+                        "title": titulo,
+                        "created_at": criado_em,
+                    }
+
+        if "activity" in secoes:
+            consulta = (
+                select(
+                    ActivityEvent.verb,
+                    ActivityEvent.object_type,
+                    ActivityEvent.object_id,
+                    ActivityEvent.payload,
+                    ActivityEvent.created_at,
+                )
+                .where(ActivityEvent.actor_id == user_id)
+                .order_by(ActivityEvent.created_at, ActivityEvent.id)
+                .execution_options(yield_per=LINHAS_POR_LOTE)
+            )
+            for verbo, tipo_objeto, id_objeto, dados, criado_em in session.execute(consulta):
+                yield {
+                    "section": "activity",
+                    "verb": verbo,
+                    "media_type": tipo_objeto,
+                    "object_id": id_objeto,
+                    "payload": dados,
+                    "created_at": criado_em,
+                }
+
+
+def _em_ndjson(linhas: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    bloco = io.StringIO()
+    for linha in linhas:
+        bloco.write(json.dumps(linha, default=_serializar, ensure_ascii=False))
+        bloco.write("\n")
+        if bloco.tell() >= TAMANHO_BLOCO:
+            yield bloco.getvalue()
+            bloco = io.StringIO()
+    if bloco.tell():
+        yield bloco.getvalue()
+
+
+def _em_csv(linhas: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    bloco = io.StringIO()
+    escritor = csv.DictWriter(bloco, fieldnames=CAMPOS_CSV)
+    escritor.writeheader()
+    for linha in linhas:
+        if linha.get("payload") is not None:
+            linha["payload"] = json.dumps(linha["payload"], ensure_ascii=False)
+        if linha.get("created_at") is not None:
+            linha["created_at"] = _serializar(linha["created_at"])
+        escritor.writerow(linha)
+        if bloco.tell() >= TAMANHO_BLOCO:
+            yield bloco.getvalue()
+            bloco.seek(0)
+            bloco.truncate()
+    if bloco.tell():
+        yield bloco.getvalue()
+
+
+def _serializar(valor: Any) -> str:
+    return valor.isoformat() if hasattr(valor, "isoformat") else str(valor)
@@ -1,25 +1,32 @@
 """
 Rotas relacionadas ao sistema de follow/unfollow de usuários.
 """
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from typing import List, Optional
 import logging
 
 from sqlmodel import Session, select
 from core.models import User, Follow
-from core.schemas import UserRead
+from core.schemas import FollowStatus, FollowStatusRequest, UserPublic
 from core.database import get_session
-from core.auth import get_current_active_user
+from core.replicas import get_read_session
+from core.auth import get_current_active_user_sync
+from services import events, follow_cache, timeline_stream
+from ..utils import filtro_cursor, definir_proximo_cursor
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["users"])
 
+MAX_IDS_STATUS_FOLLOW = 500
+# Tamanho da página de seguidores/seguidos quando `cursor` é enviado sem `limit`
+LIMITE_PADRAO_FOLLOW = 100
+
 
 @router.post("/users/{user_id}/follow")
 def follow_user(
     user_id: int,
-    usuario_atual: User = Depends(get_current_active_user),
+    usuario_atual: User = Depends(get_current_active_user_sync),
     session: Session = Depends(get_session)
 ):
     """Seguir um usuário"""
@@ -46,8 +53,11 @@ def follow_user(
         following_id=user_id
     )
     session.add(seguimento)
+    events.ao_seguir(session, usuario_atual.id, user_id)
     session.commit()
     session.refresh(seguimento)
+    follow_cache.cache.definir(usuario_atual.id, user_id, True)
+    timeline_stream.broker.atualizar_seguidos(usuario_atual.id, user_id, True)
     
     return {"message": "Usuário seguido com sucesso", "following": True}
 
@@ -55,7 +65,7 @@ def follow_user(
 @router.delete("/users/{user_id}/follow")
 def unfollow_user(
     user_id: int,
-    usuario_atual: User = Depends(get_current_active_user),
+    usuario_atual: User = Depends(get_current_active_user_sync),
     session: Session = Depends(get_session)
 ):
     """Parar de seguir um usuário"""
@@ -71,7 +81,10 @@ def unfollow_user(
         raise HTTPException(status_code=404, detail="Você não está seguindo este usuário")
     
     session.delete(seguimento)
+    events.ao_deixar_de_seguir(session, usuario_atual.id, user_id)
     session.commit()
+    follow_cache.cache.definir(usuario_atual.id, user_id, False)
+    timeline_stream.broker.atualizar_seguidos(usuario_atual.id, user_id, False)
     
     return {"message": "Deixou de seguir o usuário", "following": False}
 
@@ -79,76 +92,122 @@ def unfollow_user(
 @router.get("/users/{user_id}/follow")
 def check_follow_status(
     user_id: int,
-    usuario_atual: User = Depends(get_current_active_user),
+    usuario_atual: User = Depends(get_current_active_user_sync),
     session: Session = Depends(get_session)
 ):
     """Verificar se o usuário atual está seguindo outro usuário"""
     if usuario_atual.id == user_id:
         return {"following": False, "can_follow": False}
     
-    seguimento = session.exec(
-        select(Follow)
-        .where(Follow.follower_id == usuario_atual.id)
-        .where(Follow.following_id == user_id)
-    ).first()
-    
-    return {"following": seguimento is not None, "can_follow": True}
+    estados = follow_cache.estados_follow(session, usuario_atual.id, [user_id])
+    return {"following": estados[user_id], "can_follow": True}
 
 
-@router.get("/users/{user_id}/followers", response_model=List[UserRead])
-def get_followers(
-    user_id: int,
+@router.post("/users/follow-status", response_model=List[FollowStatus])
+def check_follow_status_bulk(
+    pedido: FollowStatusRequest,
+    usuario_atual: User = Depends(get_current_active_user_sync),
     session: Session = Depends(get_session)
 ):
-    """Buscar seguidores de um usuário"""
-    logger.info(f"Obtendo seguidores para o usuário {user_id}")
-    
+    """Verificar, de uma só vez, se o usuário atual segue cada um dos usuários informados"""
+    ids = list(dict.fromkeys(pedido.user_ids))
+    if len(ids) > MAX_IDS_STATUS_FOLLOW:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Informe no máximo {MAX_IDS_STATUS_FOLLOW} usuários por consulta"
+        )
+    
+    estados = follow_cache.estados_follow(
+        session, usuario_atual.id, [i for i in ids if i != usuario_atual.id]
+    )
+    return [
+        FollowStatus(
+            user_id=i,
+            following=estados.get(i, False),
+            can_follow=i != usuario_atual.id,
+        )
+        for i in ids
+    ]
+
+
+def _listar_usuarios_do_follow(
+    session: Session,
+    response: Response,
+    coluna_filtro,
+    coluna_usuario,
+    user_id: int,
+    limit: Optional[int],
+    cursor: Optional[str],
+):
+    """
+    Usuários ligados a `user_id` por Follow, do follow mais recente para o mais antigo.
+    Sem `limit` nem `cursor`, retorna todos, como antes da paginação.
+    """
     target_user = session.get(User, user_id)
     if not target_user:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     
-    follows = session.exec(
-        select(Follow)
-        .where(Follow.following_id == user_id)
-    ).all()
-    
-    follower_ids = [f.follower_id for f in follows]
-    if not follower_ids:
-        return []
-    
-    followers = session.exec(
-        select(User)
-        .where(User.id.in_(follower_ids))
-    ).all()
-    
-    return followers
+    consulta = (
+        select(
+            User.id,
+            User.username,
+            User.role,
+            User.is_banned,
+            User.is_muted,
+            User.created_at,
+            Follow.id.label("follow_id"),
+            Follow.created_at.label("followed_at"),
+        )
+        .join(Follow, coluna_usuario == User.id)
+        .where(coluna_filtro == user_id)
+    )
+    if cursor:
+        consulta = consulta.where(filtro_cursor(Follow.created_at, Follow.id, cursor))
+    
+    consulta = consulta.order_by(Follow.created_at.desc(), Follow.id.desc())
+    if limit is None and cursor:
+        limit = LIMITE_PADRAO_FOLLOW
+    if limit is None:
+        linhas = session.exec(consulta).all()
+    else:
+        linhas = session.exec(consulta.limit(limit)).all()
+        definir_proximo_cursor(
+            response, linhas, limit, chave=lambda linha: (linha.followed_at, linha.follow_id)
+        )
+    return [UserPublic.model_validate(linha) for linha in linhas]
+
+
+@router.get("/users/{user_id}/followers", response_model=List[UserPublic])
+def get_followers(
+    user_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_read_session)
+):
+    """
+    Buscar seguidores de um usuário.
+    Com `limit`, pagina; para a próxima página, envie em `cursor` o valor do cabeçalho X-Next-Cursor.
+    """
+    logger.info(f"Obtendo seguidores para o usuário {user_id}")
+    return _listar_usuarios_do_follow(
+        session, response, Follow.following_id, Follow.follower_id, user_id, limit, cursor
+    )
 
 
-@router.get("/users/{user_id}/following", response_model=List[UserRead])
+@router.get("/users/{user_id}/following", response_model=List[UserPublic])
 def get_following(
     user_id: int,
-    session: Session = Depends(get_session)
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_read_session)
 ):
-    """Buscar usuários que um usuário está seguindo"""
+    """
+    Buscar usuários que um usuário está seguindo.
+    Com `limit`, pagina; para a próxima página, envie em `cursor` o valor do cabeçalho X-Next-Cursor.
+    """
     logger.info(f"Obtendo usuários seguidos pelo usuário {user_id}")
-    
-    target_user = session.get(User, user_id)
-    if not target_user:
-        raise HTTPException(status_code=404, detail="Usuário não encontrado")
-    
-    follows = session.exec(
-        select(Follow)
-        .where(Follow.follower_id == user_id)
-    ).all()
-    
-    following_ids = [f.following_id for f in follows]
-    if not following_ids:
-        return []
-    
-    following = session.exec(
-        select(User)
-        .where(User.id.in_(following_ids))
-    ).all()
-    
-    return following
-
+    return _listar_usuarios_do_follow(
+        session, response, Follow.follower_id, Follow.following_id, user_id, limit, cursor
+    )
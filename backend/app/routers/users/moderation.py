@@ -6,7 +6,7 @@ import logging
 from core.models import User, UserRole
 from core.schemas import UserRead
 from core.database import get_session
-from core.auth import get_current_admin
+from core.auth import get_current_admin_sync
 
 logger = logging.getLogger(__name__)
 
@@ -23,9 +23,9 @@ class DemoteUserRequest(BaseModel):
 
 
 @router.post("/users/{user_id}/promote", response_model=UserRead)
-async def promote_user_to_curator(
+def promote_user_to_curator(
     user_id: int,
-    current_admin: User = Depends(get_current_admin),
+    current_admin: User = Depends(get_current_admin_sync),
     session: Session = Depends(get_session)
 ):
     target_user = session.get(User, user_id)
@@ -60,9 +60,9 @@ async def promote_user_to_curator(
 
 
 @router.post("/users/{user_id}/demote", response_model=UserRead)
-async def demote_user_to_normal(
+def demote_user_to_normal(
     user_id: int,
-    current_admin: User = Depends(get_current_admin),
+    current_admin: User = Depends(get_current_admin_sync),
     session: Session = Depends(get_session)
 ):
     target_user = session.get(User, user_id)
@@ -97,8 +97,8 @@ async def demote_user_to_normal(
 
 
 @router.get("/users/curators", response_model=list[UserRead])
-async def list_curators(
-    current_admin: User = Depends(get_current_admin),
+def list_curators(
+    current_admin: User = Depends(get_current_admin_sync),
     session: Session = Depends(get_session)
 ):
     curators = session.exec(
@@ -9,8 +9,8 @@ from sqlmodel import Session, select
 from sqlalchemy import func
 from core.models import User
 from core.schemas import UserRead
-from core.database import get_session
-from core.auth import get_current_active_user
+from core.replicas import get_read_session
+from core.auth import get_current_reader
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +21,8 @@ router = APIRouter(tags=["users"])
 def search_users(
     consulta: str,
     limit: int = 10,
-    session: Session = Depends(get_session),
-    usuario_atual: User = Depends(get_current_active_user)
+    session: Session = Depends(get_read_session),
+    usuario_atual: User = Depends(get_current_reader)
 ):
     """Busca usuários por username (parcial match)"""
     logger.info(f"Buscando usuários com consulta: {consulta}")
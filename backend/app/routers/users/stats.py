@@ -0,0 +1,39 @@
+"""
+Rotas de contadores e estatísticas dos usuários.
+"""
+from fastapi import APIRouter, HTTPException, Depends
+import logging
+
+from sqlmodel import Session
+from core.models import User
+from core.schemas import UserCounts, UserStatsRead
+from core.replicas import get_read_session
+from services import counters
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["users"])
+
+
+@router.get("/users/{user_id}/counts", response_model=UserCounts)
+def get_user_counts(
+    user_id: int,
+    session: Session = Depends(get_read_session)
+):
+    """Buscar quantidade de seguidores, seguidos e avaliações de um usuário"""
+    if not session.get(User, user_id):
+        raise HTTPException(status_code=404, detail="Usuário não encontrado")
+    
+    return UserCounts(user_id=user_id, **counters.contagens_usuario(session, user_id))
+
+
+@router.get("/users/{user_id}/stats", response_model=UserStatsRead)
+def get_user_stats(
+    user_id: int,
+    session: Session = Depends(get_read_session)
+):
+    """Buscar estatísticas do usuário: contadores, média, distribuição de notas e gêneros mais avaliados"""
+    if not session.get(User, user_id):
+        raise HTTPException(status_code=404, detail="Usuário não encontrado")
+    
+    return UserStatsRead(**counters.estatisticas_usuario(session, user_id))
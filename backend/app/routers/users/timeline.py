@@ -1,14 +1,19 @@
 """
 Rotas relacionadas à timeline da comunidade.
 """
-from fastapi import APIRouter, Depends
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Dict, Any, Optional
 import logging
 
 from sqlmodel import Session, select
-from core.models import User, Rating, Book as DBBook, Movie as DBMovie, Follow, UserProfile as DBUserProfile
-from core.database import get_session
-from core.auth import get_current_active_user
+from sqlmodel.ext.asyncio.session import AsyncSession
+from core.models import User, Rating, Follow, TimelineInboxEntry
+from core.database import async_engine
+from core.replicas import get_read_session
+from core.auth import get_current_reader, get_current_user, oauth2_scheme
+from services import feed, timeline_stream
+from ..utils import filtro_cursor, definir_proximo_cursor
 
 logger = logging.getLogger(__name__)
 
@@ -17,73 +22,82 @@ router = APIRouter(tags=["timeline"])
 
 @router.get("/timeline", response_model=List[Dict[str, Any]])
 def get_community_timeline(
-    limit: int = 20,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
     only_following: bool = False,
-    current_user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session)
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_reader),
+    session: Session = Depends(get_read_session)
 ):
-    """Buscar timeline da comunidade (atividades de todos os usuários ou apenas dos seguidos)"""
+    """
+    Buscar timeline da comunidade (atividades de todos os usuários ou apenas dos seguidos).
+    Para a próxima página, envie em `cursor` o valor do cabeçalho X-Next-Cursor.
+    """
     logger.info(f"Obtendo timeline da comunidade para o usuário {current_user.id}, apenas_seguindo={only_following}")
     
+    consulta = feed.consulta_timeline()
     if only_following:
-        follows = session.exec(
-            select(Follow)
-            .where(Follow.follower_id == current_user.id)
-        ).all()
-        following_ids = [f.following_id for f in follows]
-        
-        if not following_ids:
-            return []
-        
-        ratings = session.exec(
-            select(Rating)
-            .where(Rating.user_id.in_(following_ids))
-            .order_by(Rating.created_at.desc())
+        caixa = consulta.join(TimelineInboxEntry, TimelineInboxEntry.rating_id == Rating.id)
+        if cursor:
+            caixa = caixa.where(filtro_cursor(TimelineInboxEntry.created_at, TimelineInboxEntry.rating_id, cursor))
+        linhas = session.exec(
+            caixa
+            .where(TimelineInboxEntry.owner_id == current_user.id)
+            .order_by(TimelineInboxEntry.created_at.desc(), TimelineInboxEntry.rating_id.desc())
             .limit(limit)
         ).all()
+        
+        # Autores com muitos seguidores não são distribuídos: buscar na leitura
+        sob_demanda = feed.seguidos_lidos_sob_demanda(session, current_user.id)
+        if sob_demanda:
+            consulta = consulta.where(Rating.user_id.in_(sob_demanda))
+            if cursor:
+                consulta = consulta.where(filtro_cursor(Rating.created_at, Rating.id, cursor))
+            extras = session.exec(
+                consulta
+                .order_by(Rating.created_at.desc(), Rating.id.desc())
+                .limit(limit)
+            ).all()
+            linhas = feed.mesclar(linhas, extras, limit)
     else:
-        ratings = session.exec(
-            select(Rating)
+        if cursor:
+            consulta = consulta.where(filtro_cursor(Rating.created_at, Rating.id, cursor))
+        linhas = session.exec(
+            consulta
             .where(Rating.user_id != current_user.id)
-            .order_by(Rating.created_at.desc())
+            .order_by(Rating.created_at.desc(), Rating.id.desc())
             .limit(limit)
         ).all()
     
-    timeline = []
-    for rating in ratings:
-        rating_user = session.get(User, rating.user_id)
-        if not rating_user:
-            continue
-        
-        user_profile = session.exec(
-            select(DBUserProfile)
-            .where(DBUserProfile.user_id == rating.user_id)
-        ).first()
-        
-        activity = {
-            "id": rating.id,
-            "user_id": rating.user_id,
-            "username": rating_user.username,
-            "avatar": user_profile.avatar_url if user_profile else None,
-            "type": "rating",
-            "action": "avaliou",
-            "rating": rating.score,
-            "comment": rating.comment,
-            "created_at": rating.created_at.isoformat() if rating.created_at else None,
-        }
-        
-        if rating.book_id:
-            book = session.get(DBBook, rating.book_id)
-            if book:
-                activity["highlight"] = book.title
-                activity["book_id"] = book.id
-        elif rating.movie_id:
-            movie = session.get(DBMovie, rating.movie_id)
-            if movie:
-                activity["highlight"] = movie.title
-                activity["movie_id"] = movie.id
-        
-        timeline.append(activity)
-    
-    return timeline
+    definir_proximo_cursor(response, linhas, limit)
+    return [feed.montar_atividade(linha) for linha in linhas]
+
 
+@router.get("/timeline/stream")
+async def stream_community_timeline(
+    request: Request,
+    only_following: bool = False,
+    token: str = Depends(oauth2_scheme),
+):
+    """
+    Timeline ao vivo via server-sent events: envia um evento "activity" a cada
+    nova avaliação (no mesmo formato de /timeline), comentários de heartbeat
+    periódicos e um evento "reset" quando o cliente fica para trás e deve
+    recarregar /timeline.
+    """
+    # Sessão própria, encerrada antes do streaming para não prender uma conexão por cliente
+    async with AsyncSession(async_engine) as session:
+        current_user = await get_current_user(token, session)
+        seguidos = []
+        if only_following:
+            seguidos = (await session.exec(
+                select(Follow.following_id).where(Follow.follower_id == current_user.id)
+            )).all()
+    
+    logger.info(f"Usuário {current_user.id} conectado à timeline ao vivo, apenas_seguindo={only_following}")
+    assinatura = timeline_stream.broker.assinar(current_user.id, only_following, seguidos)
+    return StreamingResponse(
+        timeline_stream.eventos_sse(assinatura, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
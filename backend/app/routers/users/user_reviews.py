@@ -2,11 +2,15 @@
 Rotas relacionadas a avaliações de usuários (UserReview).
 Diferente de ratings que são avaliações de livros/filmes.
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlmodel import Session, select
 from core.models import User, UserReview
+from core.schemas import UserReviewSummary
 from core.database import get_session
+from core.replicas import get_read_session
+from services import counters, events
 from typing import List, Optional
+from ..utils import filtro_cursor, definir_proximo_cursor
 
 router = APIRouter(prefix="/user-reviews", tags=["Avaliações de Usuários"])
 
@@ -37,19 +41,56 @@ def create_user_review(
         comment=comment
     )
     session.add(review)
+    events.ao_criar_review_usuario(session, review)
     session.commit()
     session.refresh(review)
     return review
 
 
-@router.get("/user/{user_id}", response_model=List[UserReview])
-def get_reviews_for_user(user_id: int, session: Session = Depends(get_session)):
-    reviews = session.exec(select(UserReview).where(UserReview.target_user_id == user_id)).all()
+def _listar_reviews(
+    session: Session,
+    response: Response,
+    coluna_usuario,
+    user_id: int,
+    limit: int,
+    cursor: Optional[str],
+) -> List[UserReview]:
+    consulta = select(UserReview).where(coluna_usuario == user_id)
+    if cursor:
+        consulta = consulta.where(filtro_cursor(UserReview.created_at, UserReview.id, cursor))
+    reviews = session.exec(
+        consulta
+        .order_by(UserReview.created_at.desc(), UserReview.id.desc())
+        .limit(limit)
+    ).all()
+    definir_proximo_cursor(response, reviews, limit)
     return reviews
 
 
-@router.get("/authored/{user_id}", response_model=List[UserReview])
-def get_reviews_by_user(user_id: int, session: Session = Depends(get_session)):
-    reviews = session.exec(select(UserReview).where(UserReview.author_user_id == user_id)).all()
-    return reviews
+@router.get("/user/{user_id}", response_model=List[UserReview])
+def get_reviews_for_user(
+    user_id: int,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_read_session)
+):
+    return _listar_reviews(session, response, UserReview.target_user_id, user_id, limit, cursor)
 
+
+@router.get("/user/{user_id}/summary", response_model=UserReviewSummary)
+def get_review_summary_for_user(user_id: int, session: Session = Depends(get_read_session)):
+    if not session.get(User, user_id):
+        raise HTTPException(status_code=404, detail="Usuário não encontrado")
+    return UserReviewSummary(**counters.reputacao_usuario(session, user_id))
+
+
+@router.get("/authored/{user_id}", response_model=List[UserReview])
+def get_reviews_by_user(
+    user_id: int,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    session: Session = Depends(get_read_session)
+):
+    return _listar_reviews(session, response, UserReview.author_user_id, user_id, limit, cursor)
@@ -1,8 +1,13 @@
 """
 Funções auxiliares compartilhadas entre os routers.
 """
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Sequence, Tuple
+from datetime import datetime
+import base64
+import binascii
 import re
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
 from core.schemas import Movie, BookRead
 from services.api_clients import buscar_poster_filme_tmdb
 
@@ -145,3 +150,50 @@ def google_book_to_bookread(livro: Dict[str, Any]) -> BookRead:
         published_date=data_publicacao if data_publicacao else None,
     )
 
+
+
+CABECALHO_PROXIMO_CURSOR = "X-Next-Cursor"
+
+
+def codificar_cursor(criado_em: datetime, id_registro: int) -> str:
+    """Gera um cursor opaco a partir da última linha de uma página (created_at, id)."""
+    bruto = f"{criado_em.isoformat()}|{id_registro}".encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Converte um cursor recebido de volta em (created_at, id)."""
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        criado_em, id_registro = bruto.rsplit("|", 1)
+        return datetime.fromisoformat(criado_em), int(id_registro)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def filtro_cursor(coluna_data, coluna_id, cursor: str, crescente: bool = False):
+    """
+    Condição das linhas posteriores ao cursor, na ordem (created_at DESC, id DESC)
+    ou, com crescente=True, (created_at ASC, id ASC).
+    """
+    criado_em, id_registro = decodificar_cursor(cursor)
+    if crescente:
+        return or_(
+            coluna_data > criado_em,
+            and_(coluna_data == criado_em, coluna_id > id_registro),
+        )
+    return or_(
+        coluna_data < criado_em,
+        and_(coluna_data == criado_em, coluna_id < id_registro),
+    )
+
+
+def definir_proximo_cursor(
+    response: Response,
+    linhas: Sequence,
+    limite: int,
+    chave: Callable[[Any], Tuple[datetime, int]] = lambda linha: (linha.created_at, linha.id),
+) -> None:
+    """Envia no cabeçalho X-Next-Cursor o cursor da próxima página, se houver."""
+    if linhas and len(linhas) >= limite:
+        response.headers[CABECALHO_PROXIMO_CURSOR] = codificar_cursor(*chave(linhas[-1]))
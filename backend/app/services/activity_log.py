@@ -0,0 +1,67 @@
+"""
+Log append-only de atividades (tabela ActivityEvent).
+Cada mutação relevante grava um evento compacto na mesma transação, para que
+timeline, atividades e análises leiam uma única tabela em ordem cronológica.
+"""
+from typing import Any, Dict, Optional, Union
+
+from sqlalchemy import delete
+from sqlmodel import Session
+
+from core.models import ActivityEvent, Rating, UserReview
+
+VERBOS = (
+    "rated",
+    "rating_updated",
+    "rating_deleted",
+    "followed",
+    "unfollowed",
+    "library_added",
+    "library_removed",
+    "reviewed_user",
+)
+
+
+def registrar(
+    session: Session,
+    actor_id: int,
+    verbo: str,
+    tipo_objeto: str,
+    id_objeto: Union[int, str],
+    payload: Optional[Dict[str, Any]] = None,
+) -> None:
+    session.add(ActivityEvent(
+        actor_id=actor_id,
+        verb=verbo,
+        object_type=tipo_objeto,
+        object_id=str(id_objeto),
+        payload=payload or None,
+    ))
+
+
+def registrar_avaliacao(session: Session, verbo: str, avaliacao: Rating) -> None:
+    if avaliacao.id is None:
+        session.flush()
+    payload: Dict[str, Any] = {"score": avaliacao.score}
+    if avaliacao.book_id:
+        payload["book_id"] = avaliacao.book_id
+    elif avaliacao.movie_id:
+        payload["movie_id"] = avaliacao.movie_id
+    registrar(session, avaliacao.user_id, verbo, "rating", avaliacao.id, payload)
+
+
+def registrar_review_usuario(session: Session, review: UserReview) -> None:
+    if review.id is None:
+        session.flush()
+    registrar(
+        session,
+        review.author_user_id,
+        "reviewed_user",
+        "user",
+        review.target_user_id,
+        {"review_id": review.id, "rating": review.rating},
+    )
+
+
+def remover_usuario(session: Session, user_id: int) -> None:
+    session.execute(delete(ActivityEvent).where(ActivityEvent.actor_id == user_id))
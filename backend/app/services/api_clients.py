@@ -64,10 +64,12 @@ def buscar_dados_livro(consulta: str) -> Dict[str, Any]:
         return {}
 
 
-def _request_omdb(params: Dict[str, Any] | None = None) -> Dict[str, Any]:
+def _request_omdb(params: Dict[str, Any] | None = None, levantar_falhas: bool = False) -> Dict[str, Any]:
     """
     Executa uma requisição GET na API do OMDb e trata relatórios básicos de erro.
     Requer variável de ambiente OMDB_API_KEY ou usa chave padrão.
+    Com `levantar_falhas`, a falha da última tentativa levanta a exceção em vez de
+    retornar vazio (que passa a significar apenas "não encontrado").
     """
     params = dict(params or {})
     params.setdefault("apikey", OMDB_API_KEY)
@@ -89,6 +91,8 @@ def _request_omdb(params: Dict[str, Any] | None = None) -> Dict[str, Any]:
                 exc,
             )
             if attempt == 2:
+                if levantar_falhas:
+                    raise
                 return {}
             continue
 
@@ -233,8 +237,8 @@ def buscar_poster_filme_tmdb(id_imdb: str) -> Optional[str]:
     return None
 
 
-def buscar_detalhes_filme(id_filme: str) -> Dict[str, Any]:
-    """Busca informações detalhadas de filme do OMDb por IMDb ID."""
+def buscar_detalhes_filme(id_filme: str, levantar_falhas: bool = False) -> Dict[str, Any]:
+    """Busca informações detalhadas de filme do OMDb por IMDb ID (vazio se não encontrado)."""
     logger.info("Buscando detalhes do título do OMDb para id: %s", id_filme)
     if not id_filme:
         return {}
@@ -242,7 +246,7 @@ def buscar_detalhes_filme(id_filme: str) -> Dict[str, Any]:
     # OMDb usa parâmetro 'i' para IMDb ID
     params = {"i": id_filme, "plot": "full"}  # Usar sinopse completa para detalhes
     
-    payload = _request_omdb(params=params)
+    payload = _request_omdb(params=params, levantar_falhas=levantar_falhas)
     if isinstance(payload, dict) and payload.get("Response") == "True":
         return payload
 
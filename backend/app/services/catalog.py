@@ -0,0 +1,242 @@
+"""
+Resolução de ids externos (Google Books / OMDb) para registros do catálogo local.
+Itens desconhecidos recebem um registro provisório (pendente), que é completado
+depois com os dados das APIs externas (enriquecer_itens), em geral pela fila de
+enriquecimento processada em segundo plano.
+"""
+import logging
+import threading
+from collections import deque
+from datetime import date, datetime
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlmodel import Session, select
+
+from core.database import engine, inserir_ignorando_duplicados
+from core.models import Book as DBBook, Movie as DBMovie
+from services import events
+from services.api_clients import buscar_detalhes_filme
+from services.google_books import obter_livro_por_id
+
+logger = logging.getLogger(__name__)
+
+TITULO_PROVISORIO = "Sem título"
+MODELOS = {"book": DBBook, "movie": DBMovie}
+
+
+def dados_livro(livro: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Campos do catálogo a partir de uma resposta do Google Books."""
+    if not livro:
+        return {}
+    info_volume = livro.get("volumeInfo", {}) or {}
+    autores = info_volume.get("authors", [])
+    if isinstance(autores, list):
+        autores = ", ".join(autores) if autores else None
+    image_links = info_volume.get("imageLinks", {})
+    categorias = info_volume.get("categories", [])
+    return {
+        "title": info_volume.get("title") or TITULO_PROVISORIO,
+        "author": autores or None,
+        "cover_url": image_links.get("thumbnail") if image_links else None,
+        "genres": categorias if isinstance(categorias, list) else [],
+    }
+
+
+def dados_filme(dados: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Campos do catálogo a partir de uma resposta do OMDb."""
+    from routers.utils import omdb_title_to_movie
+
+    objeto_filme = omdb_title_to_movie(dados) if dados else None
+    if not objeto_filme:
+        return {}
+    data_lancamento = None
+    if objeto_filme.release_date:
+        try:
+            if len(objeto_filme.release_date) == 4:
+                data_lancamento = date(int(objeto_filme.release_date), 1, 1)
+            elif '-' in objeto_filme.release_date:
+                data_lancamento = datetime.strptime(objeto_filme.release_date, '%Y-%m-%d').date()
+        except (ValueError, TypeError):
+            pass
+    return {
+        "title": objeto_filme.title,
+        "description": objeto_filme.overview,
+        "cover_url": objeto_filme.poster_path,
+        "release_date": data_lancamento,
+        "genres": getattr(objeto_filme, "genres", None),
+    }
+
+
+def resolver_ids_externos(
+    session: Session, tipo: str, ids_externos: Iterable[str]
+) -> Tuple[Dict[str, int], List[str]]:
+    """
+    Mapeia ids externos para ids do catálogo com uma única consulta IN.
+    Os ids desconhecidos ganham registros provisórios (sem commit) e são
+    retornados à parte para serem enriquecidos depois.
+    """
+    modelo = MODELOS[tipo]
+    ids_externos = list(dict.fromkeys(i for i in ids_externos if i))
+    if not ids_externos:
+        return {}, []
+    resolvidos: Dict[str, int] = {}
+    for id_externo, item_id in session.exec(
+        select(modelo.external_id, modelo.id).where(modelo.external_id.in_(ids_externos))
+    ):
+        resolvidos.setdefault(id_externo, item_id)
+
+    desconhecidos = [i for i in ids_externos if i not in resolvidos]
+    if desconhecidos:
+        # Requisições simultâneas podem criar o mesmo item: o índice único em
+        # external_id descarta a cópia e o id é lido a seguir
+        inserir_ignorando_duplicados(
+            session,
+            modelo,
+            [{"title": TITULO_PROVISORIO, "external_id": i, "pendente": True} for i in desconhecidos],
+            ["external_id"],
+        )
+        resolvidos.update(session.exec(
+            select(modelo.external_id, modelo.id).where(modelo.external_id.in_(desconhecidos))
+        ).all())
+    return resolvidos, desconhecidos
+
+
+def enriquecer_itens(tipo: str, ids_externos: Iterable[str]) -> int:
+    """
+    Completa registros provisórios com os dados das APIs externas (tarefa de fundo).
+    Os dados derivados que dependem dos gêneros e autores do item (contadores de
+    gêneros e perfil de gosto de quem já o avaliou) são ajustados na mesma transação.
+    Itens que a API não encontra deixam de ser pendentes como estão; falhas da
+    requisição os mantêm pendentes, para nova tentativa na próxima inicialização.
+    """
+    modelo = MODELOS[tipo]
+    buscar, converter = (
+        (obter_livro_por_id, dados_livro) if tipo == "book" else (buscar_detalhes_filme, dados_filme)
+    )
+    atualizados = 0
+    with Session(engine) as session:
+        for id_externo in dict.fromkeys(ids_externos):
+            try:
+                dados = converter(buscar(id_externo, levantar_falhas=True))
+            except Exception:
+                logger.exception("Falha ao buscar dados de %s %s", tipo, id_externo)
+                continue
+            if not dados:
+                logger.warning(f"{tipo} {id_externo} não encontrado nas APIs externas")
+                for item in session.exec(
+                    select(modelo).where(modelo.external_id == id_externo).where(modelo.pendente == True)  # noqa: E712
+                ):
+                    item.pendente = False
+                    session.add(item)
+                session.commit()
+                continue
+            for item in session.exec(select(modelo).where(modelo.external_id == id_externo)):
+                _aplicar_dados(session, tipo, item, dados)
+            session.commit()
+            atualizados += 1
+    logger.info(f"{atualizados} itens ({tipo}) enriquecidos com dados externos")
+    return atualizados
+
+
+def registrar_item(
+    session: Session, tipo: str, id_externo: str, resposta: Optional[Dict[str, Any]]
+) -> Optional[Any]:
+    """
+    Registro do catálogo de um item cuja resposta da API externa já foi obtida
+    (Google Books ou OMDb): cria o registro se ainda não existir e completa o
+    provisório pendente, sem nova consulta. Sem commit.
+    """
+    modelo = MODELOS[tipo]
+    dados = (dados_livro if tipo == "book" else dados_filme)(resposta)
+    if dados:
+        inserir_ignorando_duplicados(session, modelo, [{**dados, "external_id": id_externo}], ["external_id"])
+    item = session.exec(select(modelo).where(modelo.external_id == id_externo)).first()
+    if item is not None and item.pendente and dados:
+        _aplicar_dados(session, tipo, item, dados)
+    return item
+
+
+def _aplicar_dados(session: Session, tipo: str, item: Any, dados: Dict[str, Any]) -> None:
+    generos_anteriores = list(item.genres or [])
+    autor_anterior = getattr(item, "author", None)
+    for campo, valor in dados.items():
+        setattr(item, campo, valor)
+    item.pendente = False
+    session.add(item)
+    events.ao_enriquecer_item(session, tipo, item, generos_anteriores, autor_anterior)
+
+
+def ids_provisorios(session: Session, tipo: str) -> List[str]:
+    """Ids externos de registros que ainda não foram enriquecidos."""
+    modelo = MODELOS[tipo]
+    return list(session.exec(
+        select(modelo.external_id)
+        .where(modelo.pendente == True)  # noqa: E712
+        .where(modelo.external_id.is_not(None))
+        .distinct()
+    ).all())
+
+
+class FilaEnriquecimento:
+    """
+    Fila de itens provisórios a enriquecer, consumida por uma thread de fundo
+    iniciada no primeiro pedido. Pedidos para um item que já está na fila ou
+    em processamento são agrupados, então cada item é buscado uma única vez.
+    """
+
+    def __init__(self):
+        self._condicao = threading.Condition()
+        self._fila: Deque[Tuple[str, str]] = deque()
+        self._agendados: Set[Tuple[str, str]] = set()
+        self._thread: Optional[threading.Thread] = None
+
+    def agendar(self, tipo: str, ids_externos: Iterable[str]) -> int:
+        """Enfileira os itens ainda não agendados e retorna quantos foram enfileirados."""
+        novos = 0
+        with self._condicao:
+            for id_externo in ids_externos:
+                chave = (tipo, id_externo)
+                if not id_externo or chave in self._agendados:
+                    continue
+                self._agendados.add(chave)
+                self._fila.append(chave)
+                novos += 1
+            if novos:
+                self._iniciar()
+                self._condicao.notify()
+        return novos
+
+    def pendentes(self) -> int:
+        with self._condicao:
+            return len(self._agendados)
+
+    def _iniciar(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._executar, name="enriquecimento-catalogo", daemon=True)
+            self._thread.start()
+
+    def _executar(self) -> None:
+        while True:
+            with self._condicao:
+                while not self._fila:
+                    self._condicao.wait()
+                tipo, id_externo = self._fila.popleft()
+            try:
+                enriquecer_itens(tipo, [id_externo])
+            except Exception:
+                logger.exception("Falha ao enriquecer %s %s", tipo, id_externo)
+            finally:
+                with self._condicao:
+                    self._agendados.discard((tipo, id_externo))
+
+
+fila = FilaEnriquecimento()
+
+
+def agendar_provisorios() -> int:
+    """Reenfileira os registros provisórios pendentes (usado na inicialização da aplicação)."""
+    with Session(engine) as session:
+        total = sum(fila.agendar(tipo, ids_provisorios(session, tipo)) for tipo in MODELOS)
+    if total:
+        logger.info(f"{total} itens provisórios reenfileirados para enriquecimento")
+    return total
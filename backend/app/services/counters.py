@@ -0,0 +1,367 @@
+"""
+Contadores desnormalizados de usuários (seguidores, seguindo, avaliações,
+distribuição de notas, gêneros, biblioteca) e de itens do catálogo (quantidade,
+soma e distribuição das notas). Os contadores numéricos são atualizados com UPDATE atômico
+e as distribuições (JSON) com a linha bloqueada, sempre na mesma transação da
+mutação; core/reconcile_counters.py corrige desvios.
+"""
+import logging
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, update
+from sqlmodel import Session, select
+
+from core.database import inserir_ignorando_duplicados
+from core.models import Book as DBBook, Movie as DBMovie, Follow, Rating, UserReview, UserStats
+from services import leaderboards
+
+logger = logging.getLogger(__name__)
+
+FAIXAS_NOTA = 10
+TOP_GENEROS = 5
+
+
+def faixa_nota(nota: float) -> int:
+    """Índice da faixa de meia estrela da nota (0 -> 0.5, ..., 9 -> 5.0)."""
+    return min(max(int(round(float(nota) * 2)) - 1, 0), FAIXAS_NOTA - 1)
+
+
+def rotulo_faixa(indice: int) -> str:
+    return f"{(indice + 1) / 2:.1f}"
+
+
+def ajustar_usuario(session: Session, user_id: int, **deltas: float) -> None:
+    """
+    Soma os deltas informados às colunas de UserStats, criando a linha se necessário.
+    A linha é criada com ON CONFLICT DO NOTHING antes do UPDATE atômico, então
+    as primeiras alterações simultâneas de um usuário não disputam a inserção.
+    """
+    deltas = {campo: delta for campo, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    inserir_ignorando_duplicados(session, UserStats, [{"user_id": user_id}], ["user_id"])
+    session.execute(
+        update(UserStats)
+        .where(UserStats.user_id == user_id)
+        .values({campo: getattr(UserStats, campo) + delta for campo, delta in deltas.items()})
+        .execution_options(synchronize_session=False)
+    )
+
+
+def ajustar_item(
+    session: Session, avaliacao: Rating, quantidade: int, soma: float, faixas: Dict[int, int]
+) -> None:
+    if avaliacao.book_id:
+        ajustar_item_por_id(session, DBBook, avaliacao.book_id, quantidade, soma, faixas)
+    elif avaliacao.movie_id:
+        ajustar_item_por_id(session, DBMovie, avaliacao.movie_id, quantidade, soma, faixas)
+
+
+def ajustar_item_por_id(
+    session: Session, modelo: Any, item_id: int, quantidade: int, soma: float, faixas: Dict[int, int]
+) -> None:
+    """Soma deltas à quantidade, à soma e ao histograma de notas de um livro ou filme."""
+    leaderboards.marcar_alterado(session, "book" if modelo is DBBook else "movie", item_id)
+    if quantidade or soma:
+        session.execute(
+            update(modelo)
+            .where(modelo.id == item_id)
+            .values(
+                rating_count=modelo.rating_count + quantidade,
+                rating_sum=modelo.rating_sum + soma,
+            )
+            .execution_options(synchronize_session=False)
+        )
+    faixas = {indice: delta for indice, delta in faixas.items() if delta}
+    if not faixas:
+        return
+    item = session.exec(
+        select(modelo)
+        .where(modelo.id == item_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    ).first()
+    if item is not None:
+        item.score_histogram = _somar_faixas(item.score_histogram, faixas)
+        session.add(item)
+
+
+def _estatisticas_bloqueadas(session: Session, user_id: int) -> UserStats:
+    # Mesma criação sem disputa de ajustar_usuario antes de bloquear a linha
+    inserir_ignorando_duplicados(session, UserStats, [{"user_id": user_id}], ["user_id"])
+    return session.exec(
+        select(UserStats)
+        .where(UserStats.user_id == user_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    ).one()
+
+
+def _somar_faixas(histograma: Optional[List[int]], faixas: Dict[int, int]) -> List[int]:
+    resultado = list(histograma or [0] * FAIXAS_NOTA)
+    for indice, delta in faixas.items():
+        resultado[indice] = max(resultado[indice] + delta, 0)
+    return resultado
+
+
+def ajustar_distribuicoes(
+    session: Session,
+    user_id: int,
+    faixas: Dict[int, int],
+    generos: Optional[Dict[str, int]] = None,
+) -> None:
+    """Soma deltas ao histograma de notas e à contagem de gêneros do usuário."""
+    faixas = {indice: delta for indice, delta in faixas.items() if delta}
+    generos = {genero: delta for genero, delta in (generos or {}).items() if genero and delta}
+    if not faixas and not generos:
+        return
+    estatisticas = _estatisticas_bloqueadas(session, user_id)
+    estatisticas.score_histogram = _somar_faixas(estatisticas.score_histogram, faixas)
+
+    if generos:
+        contagens = dict(estatisticas.genre_counts or {})
+        for genero, delta in generos.items():
+            valor = contagens.get(genero, 0) + delta
+            if valor > 0:
+                contagens[genero] = valor
+            else:
+                contagens.pop(genero, None)
+        estatisticas.genre_counts = contagens
+    session.add(estatisticas)
+
+
+def _generos_do_item(session: Session, avaliacao: Rating) -> List[str]:
+    if avaliacao.book_id:
+        item = session.get(DBBook, avaliacao.book_id)
+    elif avaliacao.movie_id:
+        item = session.get(DBMovie, avaliacao.movie_id)
+    else:
+        item = None
+    return list(set(item.genres or [])) if item else []
+
+
+def avaliacao_criada(session: Session, avaliacao: Rating) -> None:
+    ajustar_usuario(session, avaliacao.user_id, rating_count=1, rating_sum=avaliacao.score)
+    ajustar_distribuicoes(
+        session,
+        avaliacao.user_id,
+        {faixa_nota(avaliacao.score): 1},
+        {genero: 1 for genero in _generos_do_item(session, avaliacao)},
+    )
+    ajustar_item(session, avaliacao, 1, avaliacao.score, {faixa_nota(avaliacao.score): 1})
+
+
+def avaliacao_atualizada(session: Session, avaliacao: Rating, nota_anterior: float) -> None:
+    delta = avaliacao.score - nota_anterior
+    ajustar_usuario(session, avaliacao.user_id, rating_sum=delta)
+    faixa_anterior, faixa_atual = faixa_nota(nota_anterior), faixa_nota(avaliacao.score)
+    faixas = {faixa_anterior: -1, faixa_atual: 1} if faixa_anterior != faixa_atual else {}
+    if faixas:
+        ajustar_distribuicoes(session, avaliacao.user_id, faixas)
+    ajustar_item(session, avaliacao, 0, delta, faixas)
+
+
+def avaliacao_removida(session: Session, avaliacao: Rating) -> None:
+    ajustar_usuario(session, avaliacao.user_id, rating_count=-1, rating_sum=-avaliacao.score)
+    ajustar_distribuicoes(
+        session,
+        avaliacao.user_id,
+        {faixa_nota(avaliacao.score): -1},
+        {genero: -1 for genero in _generos_do_item(session, avaliacao)},
+    )
+    ajustar_item(session, avaliacao, -1, -avaliacao.score, {faixa_nota(avaliacao.score): -1})
+
+
+def avaliacoes_importadas(session: Session, user_id: int, avaliacoes: List[Rating]) -> None:
+    """Aplica de uma só vez os contadores de um lote de avaliações do mesmo usuário."""
+    if not avaliacoes:
+        return
+    ajustar_usuario(
+        session,
+        user_id,
+        rating_count=len(avaliacoes),
+        rating_sum=sum(avaliacao.score for avaliacao in avaliacoes),
+    )
+
+    faixas: Counter = Counter(faixa_nota(avaliacao.score) for avaliacao in avaliacoes)
+    generos: Counter = Counter()
+    por_item: Dict[Tuple[Any, int], List[float]] = defaultdict(list)
+    for avaliacao in avaliacoes:
+        if avaliacao.book_id:
+            por_item[(DBBook, avaliacao.book_id)].append(avaliacao.score)
+        elif avaliacao.movie_id:
+            por_item[(DBMovie, avaliacao.movie_id)].append(avaliacao.score)
+    for modelo in (DBBook, DBMovie):
+        ids = [item_id for (m, item_id) in por_item if m is modelo]
+        if not ids:
+            continue
+        for item_id, generos_item in session.exec(
+            select(modelo.id, modelo.genres).where(modelo.id.in_(ids))
+        ):
+            for genero in set(generos_item or []):
+                generos[genero] += len(por_item[(modelo, item_id)])
+    ajustar_distribuicoes(session, user_id, dict(faixas), dict(generos))
+
+    for (modelo, item_id), notas in por_item.items():
+        ajustar_item_por_id(
+            session, modelo, item_id, len(notas), sum(notas), Counter(faixa_nota(nota) for nota in notas)
+        )
+
+
+def generos_item_alterados(
+    session: Session, modelo: Any, item_id: int, anteriores: List[str], atuais: List[str]
+) -> None:
+    """Ajusta a contagem de gêneros de quem avaliou um item cujos gêneros mudaram."""
+    adicionados, removidos = set(atuais) - set(anteriores), set(anteriores) - set(atuais)
+    if not adicionados and not removidos:
+        return
+    coluna = Rating.book_id if modelo is DBBook else Rating.movie_id
+    for user_id, total in session.exec(
+        select(Rating.user_id, func.count()).where(coluna == item_id).group_by(Rating.user_id)
+    ):
+        generos = {genero: total for genero in adicionados}
+        generos.update({genero: -total for genero in removidos})
+        ajustar_distribuicoes(session, user_id, {}, generos)
+
+
+def review_recebida(session: Session, review: UserReview) -> None:
+    ajustar_usuario(session, review.target_user_id, review_count=1, review_sum=review.rating)
+    estatisticas = _estatisticas_bloqueadas(session, review.target_user_id)
+    estatisticas.review_histogram = _somar_faixas(
+        estatisticas.review_histogram, {faixa_nota(review.rating): 1}
+    )
+    session.add(estatisticas)
+
+
+def biblioteca_alterada(session: Session, user_id: int, tipo: str, delta: int) -> None:
+    campo = "book_library_count" if tipo == "book" else "movie_library_count"
+    ajustar_usuario(session, user_id, **{campo: delta})
+
+
+def follow_criado(session: Session, seguidor_id: int, seguido_id: int) -> None:
+    ajustar_usuario(session, seguidor_id, following_count=1)
+    ajustar_usuario(session, seguido_id, follower_count=1)
+
+
+def follow_removido(session: Session, seguidor_id: int, seguido_id: int) -> None:
+    ajustar_usuario(session, seguidor_id, following_count=-1)
+    ajustar_usuario(session, seguido_id, follower_count=-1)
+
+
+def remover_usuario(session: Session, user_id: int) -> None:
+    """
+    Desconta dos itens as avaliações de um usuário que está sendo excluído e, dos
+    demais usuários, os seus follows e as reviews que ele escreveu.
+    """
+    for coluna, modelo in ((Rating.book_id, DBBook), (Rating.movie_id, DBMovie)):
+        notas_por_item: Dict[int, List[float]] = defaultdict(list)
+        for item_id, nota in session.exec(
+            select(coluna, Rating.score).where(Rating.user_id == user_id).where(coluna.is_not(None))
+        ):
+            notas_por_item[item_id].append(nota)
+        for item_id, notas in notas_por_item.items():
+            ajustar_item_por_id(
+                session, modelo, item_id, -len(notas), -sum(notas),
+                {faixa: -total for faixa, total in Counter(faixa_nota(nota) for nota in notas).items()},
+            )
+    for seguido_id in session.exec(
+        select(Follow.following_id).where(Follow.follower_id == user_id).where(Follow.following_id != user_id)
+    ):
+        ajustar_usuario(session, seguido_id, follower_count=-1)
+    for seguidor_id in session.exec(
+        select(Follow.follower_id).where(Follow.following_id == user_id).where(Follow.follower_id != user_id)
+    ):
+        ajustar_usuario(session, seguidor_id, following_count=-1)
+
+    notas_por_alvo: Dict[int, List[float]] = defaultdict(list)
+    for alvo_id, nota in session.exec(
+        select(UserReview.target_user_id, UserReview.rating)
+        .where(UserReview.author_user_id == user_id)
+        .where(UserReview.target_user_id != user_id)
+    ):
+        notas_por_alvo[alvo_id].append(nota)
+    for alvo_id, notas in notas_por_alvo.items():
+        ajustar_usuario(session, alvo_id, review_count=-len(notas), review_sum=-sum(notas))
+        estatisticas = _estatisticas_bloqueadas(session, alvo_id)
+        estatisticas.review_histogram = _somar_faixas(
+            estatisticas.review_histogram,
+            {faixa: -total for faixa, total in Counter(faixa_nota(nota) for nota in notas).items()},
+        )
+        session.add(estatisticas)
+
+    estatisticas = session.get(UserStats, user_id)
+    if estatisticas:
+        session.delete(estatisticas)
+
+
+def contagens_usuario(session: Session, user_id: int) -> Dict[str, Optional[float]]:
+    estatisticas = session.get(UserStats, user_id)
+    if estatisticas is None:
+        return {"followers": 0, "following": 0, "ratings": 0, "average_rating": None}
+    return {
+        "followers": estatisticas.follower_count,
+        "following": estatisticas.following_count,
+        "ratings": estatisticas.rating_count,
+        "average_rating": media(estatisticas.rating_count, estatisticas.rating_sum),
+    }
+
+
+def estatisticas_usuario(session: Session, user_id: int) -> Dict[str, Any]:
+    """Estatísticas completas do usuário a partir da linha de UserStats."""
+    estatisticas = session.get(UserStats, user_id) or UserStats(user_id=user_id)
+    histograma = estatisticas.score_histogram or [0] * FAIXAS_NOTA
+    generos = sorted((estatisticas.genre_counts or {}).items(), key=lambda item: (-item[1], item[0]))
+    return {
+        "user_id": user_id,
+        "followers": estatisticas.follower_count,
+        "following": estatisticas.following_count,
+        "ratings": estatisticas.rating_count,
+        "rating_sum": estatisticas.rating_sum,
+        "average_rating": media(estatisticas.rating_count, estatisticas.rating_sum),
+        "score_histogram": {rotulo_faixa(i): quantidade for i, quantidade in enumerate(histograma)},
+        "top_genres": [{"genre": genero, "count": quantidade} for genero, quantidade in generos[:TOP_GENEROS]],
+        "books_in_library": estatisticas.book_library_count,
+        "movies_in_library": estatisticas.movie_library_count,
+    }
+
+
+def resumo_item(item: Any) -> Dict[str, Any]:
+    """Nota da comunidade de um livro ou filme a partir dos contadores do item."""
+    histograma = item.score_histogram or [0] * FAIXAS_NOTA
+    return {
+        "count": item.rating_count,
+        "average": media(item.rating_count, item.rating_sum),
+        "histogram": {rotulo_faixa(i): quantidade for i, quantidade in enumerate(histograma)},
+    }
+
+
+def resumos_por_id_externo(session: Session, modelo: Any, ids_externos: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Notas da comunidade dos itens do catálogo com os ids externos informados (uma consulta)."""
+    ids_externos = [id_externo for id_externo in set(ids_externos) if id_externo]
+    if not ids_externos:
+        return {}
+    return {
+        item.external_id: resumo_item(item)
+        for item in session.exec(
+            select(modelo.external_id, modelo.rating_count, modelo.rating_sum, modelo.score_histogram)
+            .where(modelo.external_id.in_(ids_externos))
+            .where(modelo.rating_count > 0)
+        )
+    }
+
+
+def reputacao_usuario(session: Session, user_id: int) -> Dict[str, Any]:
+    """Resumo das avaliações recebidas pelo usuário (UserReview)."""
+    estatisticas = session.get(UserStats, user_id) or UserStats(user_id=user_id)
+    histograma = estatisticas.review_histogram or [0] * FAIXAS_NOTA
+    return {
+        "user_id": user_id,
+        "count": estatisticas.review_count,
+        "average": media(estatisticas.review_count, estatisticas.review_sum),
+        "histogram": {rotulo_faixa(i): quantidade for i, quantidade in enumerate(histograma)},
+    }
+
+
+def media(quantidade: int, soma: float) -> Optional[float]:
+    return round(soma / quantidade, 2) if quantidade else None
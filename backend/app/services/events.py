@@ -0,0 +1,191 @@
+"""
+Efeitos colaterais das mutações de avaliações, bibliotecas, seguidores e reviews.
+As rotas chamam estes ganchos antes do commit, para que os dados derivados
+(perfil de gosto, contadores etc.) sejam gravados na mesma transação.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from sqlmodel import Session, select
+
+from core.models import Book as DBBook, Movie as DBMovie, Rating, UserReview
+from services import activity_log, catalog, counters, feed, leaderboards, taste_profile, trending
+
+logger = logging.getLogger(__name__)
+
+
+def ao_criar_avaliacao(session: Session, avaliacao: Rating) -> None:
+    counters.avaliacao_criada(session, avaliacao)
+    activity_log.registrar_avaliacao(session, "rated", avaliacao)
+    _ajustar_perfil_por_avaliacao(session, avaliacao, taste_profile.peso_avaliacao(avaliacao.score))
+    tipo, item = _item_da_avaliacao(session, avaliacao)
+    if item:
+        trending.registrar_apos_commit(session, tipo, item.external_id, "rating")
+
+
+def ao_atualizar_avaliacao(session: Session, avaliacao: Rating, nota_anterior: float) -> None:
+    counters.avaliacao_atualizada(session, avaliacao, nota_anterior)
+    activity_log.registrar_avaliacao(session, "rating_updated", avaliacao)
+    delta = taste_profile.peso_avaliacao(avaliacao.score) - taste_profile.peso_avaliacao(nota_anterior)
+    _ajustar_perfil_por_avaliacao(session, avaliacao, delta)
+
+
+def ao_remover_avaliacao(session: Session, avaliacao: Rating) -> None:
+    counters.avaliacao_removida(session, avaliacao)
+    activity_log.registrar_avaliacao(session, "rating_deleted", avaliacao)
+    _ajustar_perfil_por_avaliacao(session, avaliacao, -taste_profile.peso_avaliacao(avaliacao.score))
+    feed.remover_avaliacao(session, avaliacao.id)
+
+
+def ao_importar_avaliacoes(session: Session, user_id: int, avaliacoes: List[Rating]) -> None:
+    """
+    Lote de avaliações importadas: contadores agregados, perfil reconstruído depois
+    e distribuição às caixas de entrada dos seguidores na mesma transação.
+    """
+    counters.avaliacoes_importadas(session, user_id, avaliacoes)
+    for avaliacao in avaliacoes:
+        activity_log.registrar_avaliacao(session, "rated", avaliacao)
+    taste_profile.invalidar_perfil(session, user_id)
+    feed.distribuir_avaliacoes(session, user_id, [avaliacao.id for avaliacao in avaliacoes])
+
+
+def ao_enriquecer_item(
+    session: Session,
+    tipo: str,
+    item: Union[DBBook, DBMovie],
+    generos_anteriores: List[str],
+    autor_anterior: Optional[str],
+) -> None:
+    """Item provisório completado com dados externos: aplica os novos gêneros/autores a quem já o avaliou."""
+    autor_atual = getattr(item, "author", None)
+    if set(generos_anteriores) == set(item.genres or []) and autor_anterior == autor_atual:
+        return
+    leaderboards.marcar_alterado(session, tipo, item.id)
+    modelo = DBBook if tipo == "book" else DBMovie
+    counters.generos_item_alterados(session, modelo, item.id, generos_anteriores, item.genres or [])
+    coluna = Rating.book_id if tipo == "book" else Rating.movie_id
+    for user_id, nota in session.exec(select(Rating.user_id, Rating.score).where(coluna == item.id)):
+        peso = taste_profile.peso_avaliacao(nota)
+        if tipo == "book":
+            taste_profile.ajustar_perfil(
+                session, user_id, -peso,
+                generos_livro=generos_anteriores, autores=taste_profile.dividir_autores(autor_anterior),
+            )
+            taste_profile.ajustar_perfil(
+                session, user_id, peso,
+                generos_livro=item.genres or [], autores=taste_profile.dividir_autores(autor_atual),
+            )
+        else:
+            taste_profile.ajustar_perfil(session, user_id, -peso, generos_filme=generos_anteriores)
+            taste_profile.ajustar_perfil(session, user_id, peso, generos_filme=item.genres or [])
+
+
+def _generos_e_autores(item: Optional[Union[DBBook, DBMovie]]) -> Tuple[List[str], List[str]]:
+    """
+    Gêneros e autores do registro do catálogo que pesam no perfil de gosto.
+    Inclusão e remoção da biblioteca usam esta mesma fonte, então os pesos se anulam.
+    """
+    if item is None:
+        return [], []
+    return list(item.genres or []), taste_profile.dividir_autores(getattr(item, "author", None))
+
+
+def ao_adicionar_livro_biblioteca(
+    session: Session, user_id: int, id_externo: str, livro: Optional[Dict[str, Any]]
+) -> None:
+    generos, autores = _generos_e_autores(catalog.registrar_item(session, "book", id_externo, livro))
+    taste_profile.ajustar_perfil(
+        session, user_id, taste_profile.PESO_BIBLIOTECA, generos_livro=generos, autores=autores
+    )
+    counters.biblioteca_alterada(session, user_id, "book", 1)
+    trending.registrar_apos_commit(session, "book", id_externo, "library")
+    titulo = ((livro or {}).get("volumeInfo") or {}).get("title")
+    activity_log.registrar(
+        session, user_id, "library_added", "book", id_externo, {"title": titulo} if titulo else None
+    )
+
+
+def ao_remover_livro_biblioteca(session: Session, user_id: int, id_externo: str) -> None:
+    counters.biblioteca_alterada(session, user_id, "book", -1)
+    activity_log.registrar(session, user_id, "library_removed", "book", id_externo)
+    if not taste_profile.tem_perfil(session, user_id):
+        return
+    generos, autores = _generos_e_autores(
+        session.exec(select(DBBook).where(DBBook.external_id == id_externo)).first()
+    )
+    taste_profile.ajustar_perfil(
+        session, user_id, -taste_profile.PESO_BIBLIOTECA, generos_livro=generos, autores=autores
+    )
+
+
+def ao_adicionar_filme_biblioteca(
+    session: Session, user_id: int, id_externo: str, filme: Optional[Dict[str, Any]]
+) -> None:
+    generos, _ = _generos_e_autores(catalog.registrar_item(session, "movie", id_externo, filme))
+    taste_profile.ajustar_perfil(
+        session, user_id, taste_profile.PESO_BIBLIOTECA, generos_filme=generos
+    )
+    counters.biblioteca_alterada(session, user_id, "movie", 1)
+    trending.registrar_apos_commit(session, "movie", id_externo, "library")
+    titulo = (filme or {}).get("Title")
+    activity_log.registrar(
+        session, user_id, "library_added", "movie", id_externo, {"title": titulo} if titulo else None
+    )
+
+
+def ao_remover_filme_biblioteca(session: Session, user_id: int, id_externo: str) -> None:
+    counters.biblioteca_alterada(session, user_id, "movie", -1)
+    activity_log.registrar(session, user_id, "library_removed", "movie", id_externo)
+    if not taste_profile.tem_perfil(session, user_id):
+        return
+    generos, _ = _generos_e_autores(
+        session.exec(select(DBMovie).where(DBMovie.external_id == id_externo)).first()
+    )
+    taste_profile.ajustar_perfil(
+        session, user_id, -taste_profile.PESO_BIBLIOTECA, generos_filme=generos
+    )
+
+
+def ao_seguir(session: Session, seguidor_id: int, seguido_id: int) -> None:
+    counters.follow_criado(session, seguidor_id, seguido_id)
+    activity_log.registrar(session, seguidor_id, "followed", "user", seguido_id)
+    feed.preencher_ao_seguir(session, seguidor_id, seguido_id)
+
+
+def ao_deixar_de_seguir(session: Session, seguidor_id: int, seguido_id: int) -> None:
+    counters.follow_removido(session, seguidor_id, seguido_id)
+    activity_log.registrar(session, seguidor_id, "unfollowed", "user", seguido_id)
+    feed.remover_ao_deixar_de_seguir(session, seguidor_id, seguido_id)
+
+
+def ao_criar_review_usuario(session: Session, review: UserReview) -> None:
+    counters.review_recebida(session, review)
+    activity_log.registrar_review_usuario(session, review)
+
+
+def _item_da_avaliacao(
+    session: Session, avaliacao: Rating
+) -> Tuple[str, Optional[Union[DBBook, DBMovie]]]:
+    if avaliacao.book_id:
+        return "book", session.get(DBBook, avaliacao.book_id)
+    if avaliacao.movie_id:
+        return "movie", session.get(DBMovie, avaliacao.movie_id)
+    return "", None
+
+
+def _ajustar_perfil_por_avaliacao(session: Session, avaliacao: Rating, peso: float) -> None:
+    tipo, item = _item_da_avaliacao(session, avaliacao)
+    if item is None:
+        return
+    if tipo == "book":
+        taste_profile.ajustar_perfil(
+            session,
+            avaliacao.user_id,
+            peso,
+            generos_livro=item.genres or [],
+            autores=taste_profile.dividir_autores(item.author),
+        )
+    else:
+        taste_profile.ajustar_perfil(
+            session, avaliacao.user_id, peso, generos_filme=item.genres or []
+        )
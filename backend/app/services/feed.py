@@ -0,0 +1,247 @@
+"""
+Caixa de entrada da timeline "apenas seguindo" (fan-out na escrita).
+Cada nova avaliação é copiada, em segundo plano, para a caixa de entrada dos
+seguidores do autor, e a leitura da timeline vira uma varredura pelo índice
+(owner_id, created_at). Autores com muitos seguidores não são distribuídos:
+suas avaliações são buscadas no momento da leitura (modelo híbrido).
+Avaliações importadas em lote são distribuídas na transação do lote e não
+são publicadas em /timeline/stream.
+"""
+import logging
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import delete, exists, insert, literal
+from sqlmodel import Session, select
+
+from core.database import engine
+from core.models import (
+    Book as DBBook,
+    Follow,
+    Movie as DBMovie,
+    Rating,
+    TimelineInboxEntry,
+    User,
+    UserProfile as DBUserProfile,
+    UserStats,
+)
+from services import timeline_stream
+
+logger = logging.getLogger(__name__)
+
+LIMITE_SEGUIDORES_FAN_OUT = int(os.getenv("FEED_FANOUT_MAX_FOLLOWERS", "5000"))
+AVALIACOES_AO_SEGUIR = int(os.getenv("FEED_BACKFILL_SIZE", "50"))
+AVALIACOES_POR_CAIXA = int(os.getenv("FEED_REBUILD_SIZE", "500"))
+
+
+def total_seguidores(session: Session, user_id: int) -> int:
+    estatisticas = session.get(UserStats, user_id)
+    return estatisticas.follower_count if estatisticas else 0
+
+
+def distribui_na_escrita(session: Session, autor_id: int) -> bool:
+    """Autores acima do limite de seguidores são lidos sob demanda em vez de distribuídos."""
+    return total_seguidores(session, autor_id) <= LIMITE_SEGUIDORES_FAN_OUT
+
+
+def _ja_na_caixa(owner_id, rating_id):
+    return exists().where(
+        (TimelineInboxEntry.owner_id == owner_id) & (TimelineInboxEntry.rating_id == rating_id)
+    )
+
+
+def distribuir_avaliacao(rating_id: int) -> None:
+    """Copia a avaliação para a caixa de entrada de cada seguidor do autor (tarefa de fundo)."""
+    with Session(engine) as session:
+        avaliacao = session.get(Rating, rating_id)
+        if avaliacao is None:
+            # Removida antes da distribuição
+            return
+        if not distribui_na_escrita(session, avaliacao.user_id):
+            logger.info(f"Autor {avaliacao.user_id} acima do limite de fan-out; avaliação {rating_id} não distribuída")
+            return
+
+        seguidores = (
+            select(
+                Follow.follower_id,
+                literal(avaliacao.id),
+                literal(avaliacao.user_id),
+                literal(avaliacao.created_at),
+            )
+            .where(Follow.following_id == avaliacao.user_id)
+            .where(~_ja_na_caixa(Follow.follower_id, avaliacao.id))
+        )
+        resultado = session.execute(
+            insert(TimelineInboxEntry).from_select(
+                ["owner_id", "rating_id", "author_id", "created_at"], seguidores
+            )
+        )
+        session.commit()
+        logger.info(f"Avaliação {rating_id} distribuída para {resultado.rowcount} seguidores")
+
+
+def distribuir_avaliacoes(session: Session, autor_id: int, rating_ids: Sequence[int]) -> int:
+    """
+    Copia avaliações do autor para a caixa de entrada dos seguidores em uma única
+    instrução, na transação da sessão (sem commit). Usado na importação em lote.
+    """
+    if not rating_ids or not distribui_na_escrita(session, autor_id):
+        return 0
+    seguidores = (
+        select(Follow.follower_id, Rating.id, Rating.user_id, Rating.created_at)
+        .join(Rating, Rating.user_id == Follow.following_id)
+        .where(Follow.following_id == autor_id)
+        .where(Rating.id.in_(list(rating_ids)))
+        .where(~_ja_na_caixa(Follow.follower_id, Rating.id))
+    )
+    return session.execute(
+        insert(TimelineInboxEntry).from_select(
+            ["owner_id", "rating_id", "author_id", "created_at"], seguidores
+        )
+    ).rowcount
+
+
+def preencher_ao_seguir(session: Session, seguidor_id: int, seguido_id: int) -> None:
+    """Traz as avaliações recentes do usuário seguido para a caixa de entrada do seguidor."""
+    if not distribui_na_escrita(session, seguido_id):
+        return
+    recentes = (
+        select(literal(seguidor_id), Rating.id, Rating.user_id, Rating.created_at)
+        .where(Rating.user_id == seguido_id)
+        .where(~_ja_na_caixa(seguidor_id, Rating.id))
+        .order_by(Rating.created_at.desc())
+        .limit(AVALIACOES_AO_SEGUIR)
+    )
+    session.execute(
+        insert(TimelineInboxEntry).from_select(
+            ["owner_id", "rating_id", "author_id", "created_at"], recentes
+        )
+    )
+
+
+def remover_ao_deixar_de_seguir(session: Session, seguidor_id: int, seguido_id: int) -> None:
+    session.execute(
+        delete(TimelineInboxEntry)
+        .where(TimelineInboxEntry.owner_id == seguidor_id)
+        .where(TimelineInboxEntry.author_id == seguido_id)
+    )
+
+
+def remover_avaliacao(session: Session, rating_id: int) -> None:
+    """Chamado antes de apagar a avaliação: bancos anteriores ao ON DELETE CASCADE não removem as entradas sozinhos."""
+    session.execute(delete(TimelineInboxEntry).where(TimelineInboxEntry.rating_id == rating_id))
+
+
+def remover_usuario(session: Session, user_id: int) -> None:
+    session.execute(
+        delete(TimelineInboxEntry).where(
+            (TimelineInboxEntry.owner_id == user_id) | (TimelineInboxEntry.author_id == user_id)
+        )
+    )
+
+
+def seguidos_lidos_sob_demanda(session: Session, user_id: int) -> List[int]:
+    """Usuários seguidos cujas avaliações não são distribuídas (muitos seguidores)."""
+    return list(session.exec(
+        select(Follow.following_id)
+        .join(UserStats, UserStats.user_id == Follow.following_id)
+        .where(Follow.follower_id == user_id)
+        .where(UserStats.follower_count > LIMITE_SEGUIDORES_FAN_OUT)
+    ).all())
+
+
+def mesclar(linhas: Sequence, extras: Sequence, limite: int) -> list:
+    """Combina a caixa de entrada com as avaliações lidas sob demanda, mais recentes primeiro."""
+    vistas = set()
+    resultado = []
+    for linha in sorted([*linhas, *extras], key=lambda l: (l.created_at, l.id), reverse=True):
+        if linha.id in vistas:
+            continue
+        vistas.add(linha.id)
+        resultado.append(linha)
+        if len(resultado) >= limite:
+            break
+    return resultado
+
+
+def consulta_timeline():
+    """
+    Consulta única da timeline: avaliação + autor + avatar + título do item,
+    projetando apenas as colunas usadas na resposta.
+    """
+    return (
+        select(
+            Rating.id,
+            Rating.user_id,
+            Rating.score,
+            Rating.comment,
+            Rating.created_at,
+            Rating.book_id,
+            Rating.movie_id,
+            User.username,
+            DBUserProfile.avatar_url,
+            DBBook.title.label("book_title"),
+            DBMovie.title.label("movie_title"),
+        )
+        .join(User, User.id == Rating.user_id)
+        .outerjoin(DBUserProfile, DBUserProfile.user_id == Rating.user_id)
+        .outerjoin(DBBook, DBBook.id == Rating.book_id)
+        .outerjoin(DBMovie, DBMovie.id == Rating.movie_id)
+    )
+
+
+def montar_atividade(linha) -> Dict[str, Any]:
+    """Atividade da timeline a partir de uma linha de consulta_timeline."""
+    activity = {
+        "id": linha.id,
+        "user_id": linha.user_id,
+        "username": linha.username,
+        "avatar": linha.avatar_url,
+        "type": "rating",
+        "action": "avaliou",
+        "rating": linha.score,
+        "comment": linha.comment,
+        "created_at": linha.created_at.isoformat() if linha.created_at else None,
+    }
+    
+    if linha.book_id:
+        if linha.book_title is not None:
+            activity["highlight"] = linha.book_title
+            activity["book_id"] = linha.book_id
+    elif linha.movie_id:
+        if linha.movie_title is not None:
+            activity["highlight"] = linha.movie_title
+            activity["movie_id"] = linha.movie_id
+    
+    return activity
+
+
+def publicar_avaliacao(session: Session, rating_id: int) -> None:
+    """Envia uma avaliação recém-criada aos clientes conectados em /timeline/stream."""
+    if not timeline_stream.broker.tem_assinantes():
+        return
+    linha = session.exec(consulta_timeline().where(Rating.id == rating_id)).first()
+    if linha:
+        timeline_stream.broker.publicar(linha.user_id, montar_atividade(linha))
+
+
+def reconstruir_caixa(session: Session, user_id: int, limite: Optional[int] = None) -> int:
+    """Recria a caixa de entrada do usuário a partir de quem ele segue (sem commit)."""
+    limite = limite or AVALIACOES_POR_CAIXA
+    session.execute(delete(TimelineInboxEntry).where(TimelineInboxEntry.owner_id == user_id))
+
+    sob_demanda = seguidos_lidos_sob_demanda(session, user_id)
+    avaliacoes = (
+        select(literal(user_id), Rating.id, Rating.user_id, Rating.created_at)
+        .join(Follow, (Follow.following_id == Rating.user_id) & (Follow.follower_id == user_id))
+        .order_by(Rating.created_at.desc())
+        .limit(limite)
+    )
+    if sob_demanda:
+        avaliacoes = avaliacoes.where(Rating.user_id.not_in(sob_demanda))
+    resultado = session.execute(
+        insert(TimelineInboxEntry).from_select(
+            ["owner_id", "rating_id", "author_id", "created_at"], avaliacoes
+        )
+    )
+    return resultado.rowcount
@@ -0,0 +1,82 @@
+"""
+Cache em memória do estado de follow (quem o usuário segue), por usuário.
+Guarda apenas os pares já consultados; follow/unfollow atualizam o cache
+diretamente, e cada entrada expira após FOLLOW_STATUS_CACHE_TTL segundos
+(para refletir alterações feitas por outros processos).
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Tuple
+
+from sqlmodel import Session, select
+
+from core.models import Follow
+
+TTL_SEGUNDOS = int(os.getenv("FOLLOW_STATUS_CACHE_TTL", "30"))
+MAX_USUARIOS = int(os.getenv("FOLLOW_STATUS_CACHE_USERS", "10000"))
+MAX_PARES_POR_USUARIO = 5000
+
+
+class CacheStatusFollow:
+    def __init__(self, ttl: int = TTL_SEGUNDOS, max_usuarios: int = MAX_USUARIOS):
+        self.ttl = ttl
+        self.max_usuarios = max_usuarios
+        self._lock = threading.Lock()
+        self._entradas: "OrderedDict[int, Tuple[float, Dict[int, bool]]]" = OrderedDict()
+
+    def obter(self, user_id: int, ids: Iterable[int]) -> Tuple[Dict[int, bool], List[int]]:
+        """Separa os ids em conhecidos (com o estado em cache) e faltantes."""
+        ids = list(ids)
+        if self.ttl <= 0:
+            return {}, ids
+        with self._lock:
+            entrada = self._entradas.get(user_id)
+            if entrada is None or entrada[0] + self.ttl < time.monotonic():
+                self._entradas.pop(user_id, None)
+                return {}, ids
+            self._entradas.move_to_end(user_id)
+            estados = entrada[1]
+        conhecidos = {i: estados[i] for i in ids if i in estados}
+        return conhecidos, [i for i in ids if i not in conhecidos]
+
+    def guardar(self, user_id: int, estados: Dict[int, bool]) -> None:
+        if self.ttl <= 0 or not estados:
+            return
+        with self._lock:
+            entrada = self._entradas.get(user_id)
+            if entrada is None:
+                entrada = (time.monotonic(), {})
+                self._entradas[user_id] = entrada
+            else:
+                self._entradas.move_to_end(user_id)
+            if len(entrada[1]) + len(estados) <= MAX_PARES_POR_USUARIO:
+                entrada[1].update(estados)
+            while len(self._entradas) > self.max_usuarios:
+                self._entradas.popitem(last=False)
+
+    def definir(self, user_id: int, alvo_id: int, seguindo: bool) -> None:
+        """Atualiza o par após follow/unfollow (se o usuário estiver em cache)."""
+        with self._lock:
+            entrada = self._entradas.get(user_id)
+            if entrada is not None:
+                entrada[1][alvo_id] = seguindo
+
+
+cache = CacheStatusFollow()
+
+
+def estados_follow(session: Session, user_id: int, ids: Iterable[int]) -> Dict[int, bool]:
+    """Se `user_id` segue cada um dos ids, com uma única consulta IN para os não cacheados."""
+    conhecidos, faltantes = cache.obter(user_id, ids)
+    if faltantes:
+        seguidos = set(session.exec(
+            select(Follow.following_id)
+            .where(Follow.follower_id == user_id)
+            .where(Follow.following_id.in_(faltantes))
+        ).all())
+        novos = {alvo_id: alvo_id in seguidos for alvo_id in faltantes}
+        cache.guardar(user_id, novos)
+        conhecidos.update(novos)
+    return conhecidos
@@ -27,12 +27,14 @@ def buscar_livros(consulta, tipo_busca="q"):
         return []
 
 
-def obter_livro_por_id(id_livro):
+def obter_livro_por_id(id_livro, levantar_falhas=False):
     """
     Obtém um livro da API do Google Books pelo seu ID.
 
     Args:
         id_livro (str): O ID do livro.
+        levantar_falhas (bool): Se True, falhas da requisição que não sejam
+            "não encontrado" (rede, limite de uso, 5xx) levantam a exceção.
 
     Returns:
         dict: Um dicionário contendo as informações do livro, ou None se não encontrado.
@@ -44,5 +46,8 @@ def obter_livro_por_id(id_livro):
         return resposta.json()
     except requests.exceptions.RequestException as erro:
         print(f"Erro durante requisição à API do Google Books: {erro}")
+        nao_encontrado = erro.response is not None and erro.response.status_code in (400, 404)
+        if levantar_falhas and not nao_encontrado:
+            raise
         return None
 
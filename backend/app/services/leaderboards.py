@@ -0,0 +1,295 @@
+"""
+Rankings dos livros e filmes mais bem avaliados, geral e por gênero.
+A pontuação é a média bayesiana (C * m + soma) / (C + quantidade), que aproxima
+da média `m` os itens com poucas avaliações. Os rankings são calculados a partir
+dos contadores materializados de Book/Movie (rating_count/rating_sum), mantidos
+em memória e servidos por posição; os itens alterados são reposicionados
+periodicamente e os rankings inteiros são recalculados com menos frequência.
+"""
+import asyncio
+import bisect
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session as SessaoORM
+from sqlmodel import Session, select
+
+from core.database import engine
+from core.models import Book as DBBook, Movie as DBMovie
+
+logger = logging.getLogger(__name__)
+
+MODELOS = {"book": DBBook, "movie": DBMovie}
+GERAL = ""
+
+PESO_PRIORI = float(os.getenv("LEADERBOARD_PRIOR_WEIGHT", "10"))
+# Sem valor definido, a média a priori é a média global do tipo de mídia
+MEDIA_PRIORI: Optional[float] = (
+    float(os.environ["LEADERBOARD_PRIOR_MEAN"]) if os.getenv("LEADERBOARD_PRIOR_MEAN") else None
+)
+MINIMO_AVALIACOES = int(os.getenv("LEADERBOARD_MIN_RATINGS", "1"))
+TAMANHO_RANKING = int(os.getenv("LEADERBOARD_SIZE", "500"))
+INTERVALO_ATUALIZACAO = int(os.getenv("LEADERBOARD_REFRESH_INTERVAL", "30"))
+INTERVALO_RECALCULO = int(os.getenv("LEADERBOARD_REBUILD_INTERVAL", "3600"))
+LINHAS_POR_LOTE = 1000
+CHAVE_ALTERADOS = "leaderboards_alterados"
+
+
+class Posicao(NamedTuple):
+    pontuacao: float
+    item_id: int
+    external_id: Optional[str]
+    title: str
+    creator: Optional[str]
+    cover_url: Optional[str]
+    rating_count: int
+    average: float
+
+
+def media_bayesiana(quantidade: int, soma: float, media_priori: float) -> float:
+    return (PESO_PRIORI * media_priori + soma) / (PESO_PRIORI + quantidade)
+
+
+class Rankings:
+    """Rankings por tipo de mídia e gênero, seguros para uso entre threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rankings: Dict[str, Dict[str, List[Posicao]]] = {tipo: {} for tipo in MODELOS}
+        self._generos_por_item: Dict[str, Dict[int, List[str]]] = {tipo: {} for tipo in MODELOS}
+        self._medias: Dict[str, float] = {}
+        self._alterados: Dict[str, Set[int]] = {tipo: set() for tipo in MODELOS}
+        self.calculado_em: Optional[float] = None
+
+    def marcar_alterado(self, tipo: str, item_id: int) -> None:
+        with self._lock:
+            self._alterados[tipo].add(item_id)
+
+    def pagina(self, tipo: str, genero: Optional[str], limite: int, deslocamento: int) -> List[Posicao]:
+        with self._lock:
+            ranking = self._rankings[tipo].get(_chave_genero(genero), [])
+            return ranking[deslocamento:deslocamento + limite]
+
+    def generos(self, tipo: str) -> List[Tuple[str, int]]:
+        with self._lock:
+            return sorted(
+                ((genero, len(ranking)) for genero, ranking in self._rankings[tipo].items() if genero),
+                key=lambda item: (-item[1], item[0]),
+            )
+
+    def recalcular(self) -> None:
+        """Recalcula todos os rankings percorrendo os itens avaliados do catálogo."""
+        novos: Dict[str, Dict[str, List[Posicao]]] = {}
+        generos_por_item: Dict[str, Dict[int, List[str]]] = {}
+        medias: Dict[str, float] = {}
+        with Session(engine) as session:
+            for tipo, modelo in MODELOS.items():
+                medias[tipo] = MEDIA_PRIORI if MEDIA_PRIORI is not None else _media_global(session, modelo)
+                ordenados: Dict[str, List[Posicao]] = defaultdict(list)
+                generos_tipo: Dict[int, List[str]] = {}
+                for item in session.execute(
+                    _consulta_itens(modelo).execution_options(yield_per=LINHAS_POR_LOTE)
+                ):
+                    posicao = _posicao(item, medias[tipo])
+                    generos = _generos(item.genres)
+                    for chave in [GERAL] + generos:
+                        ranking = ordenados[chave]
+                        if _cabe(ranking, posicao):
+                            _inserir(ranking, posicao)
+                    generos_tipo[item.id] = generos
+                novos[tipo] = dict(ordenados)
+                # Apenas os itens presentes em algum ranking precisam ser lembrados
+                presentes = {posicao.item_id for ranking in novos[tipo].values() for posicao in ranking}
+                generos_por_item[tipo] = {i: g for i, g in generos_tipo.items() if i in presentes}
+        with self._lock:
+            self._rankings = novos
+            self._generos_por_item = generos_por_item
+            self._medias = medias
+            self.calculado_em = time.time()
+        logger.info(
+            "Rankings recalculados: %s",
+            ", ".join(f"{tipo}={len(novos[tipo].get(GERAL, []))}" for tipo in MODELOS),
+        )
+
+    def aplicar_alteracoes(self) -> int:
+        """
+        Reposiciona os itens cujas avaliações mudaram desde a última atualização.
+        Se um ranking completo perder itens (ex.: banidos ou sem avaliações), os
+        rankings são recalculados logo em seguida: os itens que entrariam no lugar
+        não estão em memória.
+        """
+        with self._lock:
+            alterados = {tipo: ids for tipo, ids in self._alterados.items() if ids}
+            self._alterados = {tipo: set() for tipo in MODELOS}
+            medias = dict(self._medias)
+        if not alterados or not medias:
+            return 0
+        total = 0
+        incompleto = False
+        with Session(engine) as session:
+            for tipo, ids in alterados.items():
+                modelo = MODELOS[tipo]
+                itens = {
+                    item.id: item
+                    for item in session.execute(
+                        _consulta_itens(modelo, apenas_avaliados=False).where(modelo.id.in_(list(ids)))
+                    )
+                }
+                with self._lock:
+                    for item_id in ids:
+                        if self._reposicionar(tipo, item_id, itens.get(item_id), medias[tipo]):
+                            incompleto = True
+                total += len(ids)
+        if incompleto:
+            logger.info("Ranking completo perdeu itens: recalculando os rankings")
+            self.recalcular()
+        return total
+
+    def _reposicionar(self, tipo: str, item_id: int, item, media_priori: float) -> bool:
+        """Reposiciona o item; retorna True se algum ranking completo ficou abaixo do tamanho máximo."""
+        rankings = self._rankings[tipo]
+        completos = []
+        generos_anteriores = self._generos_por_item[tipo].pop(item_id, None)
+        if generos_anteriores is not None:
+            for chave in [GERAL] + generos_anteriores:
+                ranking = rankings.get(chave, [])
+                for indice, posicao in enumerate(ranking):
+                    if posicao.item_id == item_id:
+                        if len(ranking) >= TAMANHO_RANKING:
+                            completos.append(ranking)
+                        del ranking[indice]
+                        break
+        if item is None or item.is_banned or item.rating_count < MINIMO_AVALIACOES:
+            return bool(completos)
+        posicao = _posicao(item, media_priori)
+        generos = _generos(item.genres)
+        presente = False
+        for chave in [GERAL] + generos:
+            ranking = rankings.setdefault(chave, [])
+            if _cabe(ranking, posicao):
+                _inserir(ranking, posicao)
+                presente = True
+        if presente:
+            self._generos_por_item[tipo][item_id] = generos
+        return any(len(ranking) < TAMANHO_RANKING for ranking in completos)
+
+
+def _consulta_itens(modelo, apenas_avaliados: bool = True):
+    criador = modelo.author if modelo is DBBook else modelo.director
+    consulta = select(
+        modelo.id,
+        modelo.external_id,
+        modelo.title,
+        criador.label("creator"),
+        modelo.cover_url,
+        modelo.genres,
+        modelo.rating_count,
+        modelo.rating_sum,
+        modelo.is_banned,
+    )
+    if apenas_avaliados:
+        consulta = consulta.where(modelo.rating_count >= MINIMO_AVALIACOES).where(modelo.is_banned == False)  # noqa: E712
+    return consulta
+
+
+def _media_global(session: Session, modelo) -> float:
+    quantidade, soma = session.exec(
+        select(func.sum(modelo.rating_count), func.sum(modelo.rating_sum))
+    ).one()
+    return (soma / quantidade) if quantidade else 3.0
+
+
+def _posicao(item, media_priori: float) -> Posicao:
+    return Posicao(
+        pontuacao=round(media_bayesiana(item.rating_count, item.rating_sum, media_priori), 4),
+        item_id=item.id,
+        external_id=item.external_id,
+        title=item.title,
+        creator=item.creator,
+        cover_url=item.cover_url,
+        rating_count=item.rating_count,
+        average=round(item.rating_sum / item.rating_count, 2),
+    )
+
+
+def _inserir(ranking: List[Posicao], posicao: Posicao) -> None:
+    """Insere mantendo a ordem (pontuação desc, quantidade desc, id asc) e o tamanho máximo."""
+    chaves = [_ordem(p) for p in ranking]
+    ranking.insert(bisect.bisect_left(chaves, _ordem(posicao)), posicao)
+    if len(ranking) > TAMANHO_RANKING:
+        ranking.pop()
+
+
+def _cabe(ranking: List[Posicao], posicao: Posicao) -> bool:
+    return len(ranking) < TAMANHO_RANKING or _ordem(posicao) < _ordem(ranking[-1])
+
+
+def _ordem(posicao: Posicao) -> Tuple[float, int, int]:
+    return (-posicao.pontuacao, -posicao.rating_count, posicao.item_id)
+
+
+def _generos(generos: Optional[List[str]]) -> List[str]:
+    return sorted({_chave_genero(g) for g in (generos or []) if g and g.strip()})
+
+
+def _chave_genero(genero: Optional[str]) -> str:
+    return genero.strip().lower() if genero else GERAL
+
+
+rankings = Rankings()
+
+
+def marcar_alterado(session: Session, tipo: str, item_id: int) -> None:
+    """
+    Marca o item para reposicionamento quando a transação da sessão for confirmada;
+    antes disso a atualização periódica ainda leria os contadores antigos.
+    """
+    session.info.setdefault(CHAVE_ALTERADOS, set()).add((tipo, item_id))
+
+
+@event.listens_for(SessaoORM, "after_commit")
+def _aplicar_marcas(session: SessaoORM) -> None:
+    for tipo, item_id in session.info.pop(CHAVE_ALTERADOS, ()):
+        rankings.marcar_alterado(tipo, item_id)
+
+
+@event.listens_for(SessaoORM, "after_rollback")
+def _descartar_marcas(session: SessaoORM) -> None:
+    session.info.pop(CHAVE_ALTERADOS, None)
+
+
+def pagina(tipo: str, genero: Optional[str] = None, limite: int = 20, deslocamento: int = 0) -> List[Posicao]:
+    _garantir_calculado()
+    return rankings.pagina(tipo, genero, limite, deslocamento)
+
+
+def generos(tipo: str) -> List[Tuple[str, int]]:
+    _garantir_calculado()
+    return rankings.generos(tipo)
+
+
+def _garantir_calculado() -> None:
+    # Processos sem a tarefa periódica (ex.: scripts) calculam na primeira leitura
+    if rankings.calculado_em is None:
+        rankings.recalcular()
+
+
+async def atualizar_periodicamente() -> None:
+    """
+    Tarefa de fundo: calcula os rankings, reposiciona os itens alterados a cada
+    INTERVALO_ATUALIZACAO segundos e recalcula tudo a cada INTERVALO_RECALCULO.
+    """
+    while True:
+        try:
+            if rankings.calculado_em is None or time.time() - rankings.calculado_em >= INTERVALO_RECALCULO:
+                await asyncio.to_thread(rankings.recalcular)
+            else:
+                await asyncio.to_thread(rankings.aplicar_alteracoes)
+        except Exception:
+            logger.exception("Falha ao atualizar os rankings")
+        await asyncio.sleep(INTERVALO_ATUALIZACAO)
@@ -0,0 +1,188 @@
+"""
+Importação em lote de avaliações a partir de arquivos CSV ou NDJSON.
+O arquivo é lido linha a linha; cada lote resolve os ids externos com uma
+consulta por tipo, grava as avaliações em uma transação e atualiza o ImportJob.
+Itens desconhecidos recebem registros provisórios, enriquecidos ao final.
+"""
+import csv
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlmodel import Session, select
+
+from core.database import engine, inserir_ignorando_duplicados
+from core.models import ImportJob, ImportJobStatus, Rating
+from services import catalog, events
+
+logger = logging.getLogger(__name__)
+
+FORMATOS = ("csv", "ndjson")
+TAMANHO_LOTE = int(os.getenv("RATING_IMPORT_BATCH_SIZE", "500"))
+MAX_ERROS_REGISTRADOS = 50
+NOTA_MINIMA, NOTA_MAXIMA = 0.5, 5.0
+
+LinhaValida = Tuple[int, str, str, float, Optional[str], Optional[datetime]]
+
+
+def detectar_formato(nome_arquivo: Optional[str], formato: Optional[str]) -> Optional[str]:
+    if formato:
+        return formato.lower() if formato.lower() in FORMATOS else None
+    nome = (nome_arquivo or "").lower()
+    if nome.endswith(".csv"):
+        return "csv"
+    if nome.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return None
+
+
+def ler_linhas(caminho: str, formato: str) -> Iterator[Tuple[int, Any]]:
+    """Gera (número da linha, conteúdo) sem carregar o arquivo inteiro em memória."""
+    with open(caminho, newline="", encoding="utf-8-sig") as arquivo:
+        if formato == "csv":
+            for numero, linha in enumerate(csv.DictReader(arquivo), start=2):
+                yield numero, linha
+            return
+        for numero, texto in enumerate(arquivo, start=1):
+            if not texto.strip():
+                continue
+            try:
+                yield numero, json.loads(texto)
+            except json.JSONDecodeError:
+                yield numero, None
+
+
+def normalizar_linha(numero: int, linha: Any) -> LinhaValida:
+    """Valida uma linha e retorna (número, tipo, id externo, nota, comentário, data)."""
+    if not isinstance(linha, dict):
+        raise ValueError("Linha inválida")
+    linha = {str(chave).strip().lower(): valor for chave, valor in linha.items() if chave}
+
+    if linha.get("book_external_id"):
+        tipo, id_externo = "book", linha["book_external_id"]
+    elif linha.get("movie_external_id"):
+        tipo, id_externo = "movie", linha["movie_external_id"]
+    elif linha.get("type") in ("book", "movie") and linha.get("external_id"):
+        tipo, id_externo = linha["type"], linha["external_id"]
+    else:
+        raise ValueError("Informe book_external_id ou movie_external_id")
+
+    try:
+        nota = float(linha.get("score", linha.get("rating")))
+    except (TypeError, ValueError):
+        raise ValueError("Nota inválida")
+    if not NOTA_MINIMA <= nota <= NOTA_MAXIMA:
+        raise ValueError(f"Nota deve estar entre {NOTA_MINIMA} e {NOTA_MAXIMA}")
+
+    criado_em = None
+    if linha.get("created_at"):
+        try:
+            criado_em = datetime.fromisoformat(str(linha["created_at"]))
+        except ValueError:
+            raise ValueError("Data inválida em created_at")
+
+    comentario = linha.get("comment") or None
+    return numero, tipo, str(id_externo).strip(), nota, comentario, criado_em
+
+
+def processar_importacao(job_id: int, caminho: str) -> None:
+    """Processa o arquivo de um ImportJob (tarefa de fundo) e remove o arquivo ao final."""
+    pendentes: Dict[str, Set[str]] = {"book": set(), "movie": set()}
+    try:
+        with Session(engine) as session:
+            job = session.get(ImportJob, job_id)
+            job.status = ImportJobStatus.RUNNING.value
+            session.add(job)
+            session.commit()
+
+            lote: List[Tuple[int, Any]] = []
+            try:
+                for numero, linha in ler_linhas(caminho, job.format):
+                    lote.append((numero, linha))
+                    if len(lote) >= TAMANHO_LOTE:
+                        _importar_lote(session, job, lote, pendentes)
+                        lote = []
+                if lote:
+                    _importar_lote(session, job, lote, pendentes)
+                job.status = ImportJobStatus.COMPLETED.value
+            except Exception as e:
+                logger.exception(f"Falha na importação {job_id}")
+                session.rollback()
+                job.status = ImportJobStatus.FAILED.value
+                _registrar_erro(job, None, f"Falha inesperada: {e}")
+            job.pending_items = sum(len(ids) for ids in pendentes.values())
+            job.finished_at = datetime.utcnow()
+            session.add(job)
+            session.commit()
+    finally:
+        try:
+            os.remove(caminho)
+        except OSError:
+            pass
+
+    for tipo, ids in pendentes.items():
+        if ids:
+            catalog.enriquecer_itens(tipo, ids)
+    if any(pendentes.values()):
+        with Session(engine) as session:
+            job = session.get(ImportJob, job_id)
+            job.pending_items = 0
+            session.add(job)
+            session.commit()
+
+
+def _importar_lote(
+    session: Session,
+    job: ImportJob,
+    lote: List[Tuple[int, Any]],
+    pendentes: Dict[str, Set[str]],
+) -> None:
+    validas: List[LinhaValida] = []
+    for numero, linha in lote:
+        try:
+            validas.append(normalizar_linha(numero, linha))
+        except ValueError as e:
+            job.failed += 1
+            _registrar_erro(job, numero, str(e))
+    job.total_rows += len(lote)
+
+    # INSERT ... ON CONFLICT DO NOTHING: avaliações já existentes (inclusive as
+    # gravadas em paralelo pelo usuário) e repetidas no arquivo são ignoradas
+    inseridas: List[int] = []
+    for tipo, coluna in (("book", "book_id"), ("movie", "movie_id")):
+        linhas_tipo = [linha for linha in validas if linha[1] == tipo]
+        if not linhas_tipo:
+            continue
+        ids_catalogo, desconhecidos = catalog.resolver_ids_externos(
+            session, tipo, [linha[2] for linha in linhas_tipo]
+        )
+        pendentes[tipo].update(desconhecidos)
+        novas = [
+            {
+                "user_id": job.user_id,
+                "book_id": ids_catalogo[id_externo] if tipo == "book" else None,
+                "movie_id": ids_catalogo[id_externo] if tipo == "movie" else None,
+                "score": nota,
+                "comment": comentario,
+                "created_at": criado_em or datetime.utcnow(),
+            }
+            for _, _, id_externo, nota, comentario, criado_em in linhas_tipo
+        ]
+        inseridas += inserir_ignorando_duplicados(session, Rating, novas, ["user_id", coluna])
+    job.skipped += len(validas) - len(inseridas)
+
+    avaliacoes = session.exec(select(Rating).where(Rating.id.in_(inseridas))).all() if inseridas else []
+    events.ao_importar_avaliacoes(session, job.user_id, avaliacoes)
+    job.imported += len(avaliacoes)
+    session.add(job)
+    session.commit()
+    logger.info(f"Importação {job.id}: {job.total_rows} linhas processadas")
+
+
+def _registrar_erro(job: ImportJob, numero: Optional[int], mensagem: str) -> None:
+    erros = list(job.errors or [])
+    if len(erros) < MAX_ERROS_REGISTRADOS:
+        erros.append({"row": numero, "error": mensagem})
+        job.errors = erros
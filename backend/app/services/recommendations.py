@@ -0,0 +1,196 @@
+"""
+Cálculo de recomendações de livros e filmes.
+Compartilhado pelas rotas de recomendação e pelo job em lote (core/recommend_batch.py).
+As rotas servem as recomendações gravadas pelo job e só calculam na hora
+(consultando as APIs externas) quando o usuário ainda não tem recomendações
+gravadas ou alterou avaliações/biblioteca depois do último cálculo.
+"""
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+from urllib.parse import quote_plus
+
+from sqlalchemy import func
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.models import ActivityEvent, Recommendation
+from core.schemas import BookRead, Movie
+from services.api_clients import buscar_dados_filme, buscar_detalhes_filme
+from services.google_books import buscar_livros as google_buscar_livros, obter_livro_por_id
+
+logger = logging.getLogger(__name__)
+
+LIMITE_RECOMENDACOES = 30
+MINIMO_ANTES_DO_FALLBACK = 20
+TERMOS_POPULARES = ["action", "drama", "comedy", "thriller"]
+# Ações do log de atividades que mudam a entrada do cálculo (avaliações e bibliotecas)
+VERBOS_QUE_ALTERAM = ("rated", "rating_updated", "rating_deleted", "library_added", "library_removed")
+
+
+async def recomendacoes_gravadas(
+    session: AsyncSession, user_id: int, coluna
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Recomendações mais recentes gravadas pelo job em lote na `coluna`
+    (Recommendation.recommended_books ou recommended_movies). Retorna None se não
+    houver ou se estiverem desatualizadas: listas vazias (o usuário pode ter
+    montado a biblioteca depois do cálculo), linhas antigas, que guardavam apenas
+    os ids, e cálculos anteriores à última alteração de avaliações ou biblioteca
+    são refeitos na hora.
+    """
+    gravada = (await session.exec(
+        select(coluna, Recommendation.created_at)
+        .where(Recommendation.user_id == user_id)
+        .order_by(Recommendation.created_at.desc(), Recommendation.id.desc())
+        .limit(1)
+    )).first()
+    if not gravada:
+        return None
+    itens, calculada_em = gravada
+    if not itens or not all(isinstance(item, dict) for item in itens):
+        return None
+    alterado_em = (await session.exec(
+        select(func.max(ActivityEvent.created_at))
+        .where(ActivityEvent.actor_id == user_id)
+        .where(ActivityEvent.verb.in_(VERBOS_QUE_ALTERAM))
+    )).one()
+    if alterado_em is not None and alterado_em > calculada_em:
+        return None
+    return itens
+
+
+def recomendar_livros(
+    generos: Iterable[str],
+    autores: Iterable[str],
+    ids_excluidos: Iterable[str],
+    buscar: Callable[[str], List[Dict[str, Any]]] = google_buscar_livros,
+    populares: Sequence[str] = (),
+    obter_livro: Callable[[str], Optional[Dict[str, Any]]] = obter_livro_por_id,
+) -> List[BookRead]:
+    """
+    Busca livros dos gêneros e autores informados, ignorando os ids excluídos.
+    Se houver poucos resultados, completa com os livros em alta (`populares`).
+    """
+    from routers.utils import google_book_to_bookread
+
+    recomendados: List[BookRead] = []
+    ids_vistos = set(ids_excluidos)
+
+    for genero in list(generos)[:3]:
+        try:
+            livros = buscar(f"subject:{quote_plus(genero)}")
+            for livro in livros[:10]:
+                id_livro = livro.get("id")
+                if id_livro and id_livro not in ids_vistos:
+                    ids_vistos.add(id_livro)
+                    recomendados.append(google_book_to_bookread(livro))
+        except Exception as e:
+            logger.exception(f"Erro ao buscar livros por gênero {genero}: {e}")
+
+    if len(recomendados) < MINIMO_ANTES_DO_FALLBACK:
+        for autor in list(autores)[:2]:
+            try:
+                livros = buscar(f"inauthor:{quote_plus(autor)}")
+                for livro in livros[:10]:
+                    id_livro = livro.get("id")
+                    if id_livro and id_livro not in ids_vistos:
+                        ids_vistos.add(id_livro)
+                        recomendados.append(google_book_to_bookread(livro))
+                        if len(recomendados) >= LIMITE_RECOMENDACOES:
+                            break
+            except Exception as e:
+                logger.exception(f"Erro ao buscar livros por autor {autor}: {e}")
+
+            if len(recomendados) >= LIMITE_RECOMENDACOES:
+                break
+
+    if len(recomendados) < MINIMO_ANTES_DO_FALLBACK:
+        for id_livro in populares:
+            if id_livro in ids_vistos:
+                continue
+            ids_vistos.add(id_livro)
+            try:
+                livro = obter_livro(id_livro)
+                if livro:
+                    recomendados.append(google_book_to_bookread(livro))
+            except Exception as e:
+                logger.exception(f"Erro ao buscar livro em alta {id_livro}: {e}")
+            if len(recomendados) >= LIMITE_RECOMENDACOES:
+                break
+
+    return recomendados[:LIMITE_RECOMENDACOES]
+
+
+def recomendar_filmes(
+    generos: Iterable[str],
+    ids_excluidos: Iterable[str],
+    buscar: Callable[..., Dict[str, Any]] = buscar_dados_filme,
+    populares: Sequence[str] = (),
+    obter_filme: Callable[[str], Dict[str, Any]] = buscar_detalhes_filme,
+) -> List[Movie]:
+    """
+    Busca filmes dos gêneros informados. Se houver poucos resultados, completa
+    com os filmes em alta (`populares`) e, sem dados de popularidade, com
+    buscas por termos genéricos.
+    """
+    from routers.utils import omdb_title_to_movie
+
+    recomendados: List[Movie] = []
+    ids_vistos = set(ids_excluidos)
+
+    for genero in list(generos)[:3]:
+        try:
+            resultados_busca = buscar(genero, limite=20)
+            if resultados_busca and "results" in resultados_busca:
+                for item in resultados_busca["results"][:15]:
+                    id_filme = item.get("imdbID")
+                    if id_filme and id_filme not in ids_vistos:
+                        string_generos = item.get("Genre", "")
+                        if string_generos and genero.lower() in string_generos.lower():
+                            ids_vistos.add(id_filme)
+                            filme = omdb_title_to_movie(item)
+                            if filme:
+                                recomendados.append(filme)
+                            if len(recomendados) >= LIMITE_RECOMENDACOES:
+                                break
+        except Exception as e:
+            logger.exception(f"Erro ao buscar filmes por gênero {genero}: {e}")
+
+        if len(recomendados) >= LIMITE_RECOMENDACOES:
+            break
+
+    if len(recomendados) < MINIMO_ANTES_DO_FALLBACK:
+        for id_filme in populares:
+            if id_filme in ids_vistos:
+                continue
+            ids_vistos.add(id_filme)
+            try:
+                dados_filme = obter_filme(id_filme)
+                filme = omdb_title_to_movie(dados_filme) if dados_filme else None
+                if filme:
+                    recomendados.append(filme)
+            except Exception as e:
+                logger.exception(f"Erro ao buscar filme em alta {id_filme}: {e}")
+            if len(recomendados) >= LIMITE_RECOMENDACOES:
+                break
+
+    if len(recomendados) < MINIMO_ANTES_DO_FALLBACK and not populares:
+        try:
+            for termo in TERMOS_POPULARES[:2]:
+                resultados_busca = buscar(termo, limite=15)
+                if resultados_busca and "results" in resultados_busca:
+                    for item in resultados_busca["results"]:
+                        id_filme = item.get("imdbID")
+                        if id_filme and id_filme not in ids_vistos:
+                            ids_vistos.add(id_filme)
+                            filme = omdb_title_to_movie(item)
+                            if filme:
+                                recomendados.append(filme)
+                            if len(recomendados) >= LIMITE_RECOMENDACOES:
+                                break
+                if len(recomendados) >= LIMITE_RECOMENDACOES:
+                    break
+        except Exception as e:
+            logger.exception(f"Erro ao buscar filmes populares: {e}")
+
+    return recomendados[:LIMITE_RECOMENDACOES]
@@ -0,0 +1,225 @@
+"""
+Perfil de gosto dos usuários (afinidade por gêneros e autores).
+O perfil é atualizado incrementalmente a cada avaliação e alteração de biblioteca,
+para que as recomendações não precisem consultar as APIs externas item a item.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.database import engine, inserir_ignorando_duplicados
+from core.models import (
+    Book as DBBook,
+    Movie as DBMovie,
+    Rating,
+    UserLibrary,
+    UserMovieLibrary,
+    UserTasteProfile,
+)
+from services.api_clients import buscar_detalhes_filme
+from services.google_books import obter_livro_por_id
+
+logger = logging.getLogger(__name__)
+
+PESO_BIBLIOTECA = 1.0
+MAX_ENTRADAS_POR_DIMENSAO = 100
+
+
+def peso_avaliacao(nota: float) -> float:
+    """Converte uma nota de 1 a 5 em afinidade entre -1 e 1 (nota 3 é neutra)."""
+    return (float(nota) - 3.0) / 2.0
+
+
+def dados_livro_google(livro: Optional[Dict[str, Any]]) -> Tuple[List[str], List[str]]:
+    """Extrai gêneros e autores de uma resposta do Google Books."""
+    if not livro:
+        return [], []
+    info_volume = livro.get("volumeInfo", {}) or {}
+    categorias = info_volume.get("categories") or []
+    autores = info_volume.get("authors") or []
+    if isinstance(autores, str):
+        autores = [autores]
+    return (categorias if isinstance(categorias, list) else []), autores
+
+
+def generos_filme_omdb(filme: Optional[Dict[str, Any]]) -> List[str]:
+    """Extrai os gêneros de uma resposta do OMDb."""
+    if not filme:
+        return []
+    string_generos = filme.get("Genre") or filme.get("genre") or ""
+    if not string_generos or string_generos == "N/A":
+        return []
+    return [g.strip() for g in string_generos.split(",") if g.strip()]
+
+
+def dividir_autores(autor: Optional[str]) -> List[str]:
+    """Autores de um livro do catálogo local (armazenados separados por vírgula)."""
+    if not autor:
+        return []
+    return [a.strip() for a in autor.split(",") if a.strip()]
+
+
+def ajustar_perfil(
+    session: Session,
+    user_id: int,
+    peso: float,
+    *,
+    generos_livro: Iterable[str] = (),
+    autores: Iterable[str] = (),
+    generos_filme: Iterable[str] = (),
+) -> None:
+    """
+    Soma `peso` às dimensões informadas do perfil do usuário, na transação da sessão.
+    Usuários sem perfil são ignorados: o perfil completo é reconstruído na primeira leitura.
+    """
+    if not peso:
+        return
+    perfil = session.get(UserTasteProfile, user_id)
+    if perfil is None:
+        return
+    perfil.book_genres = _somar_pesos(perfil.book_genres, generos_livro, peso)
+    perfil.book_authors = _somar_pesos(perfil.book_authors, autores, peso)
+    perfil.movie_genres = _somar_pesos(perfil.movie_genres, generos_filme, peso)
+    perfil.updated_at = datetime.utcnow()
+    session.add(perfil)
+
+
+def invalidar_perfil(session: Session, user_id: int) -> None:
+    """Descarta o perfil para que seja reconstruído na próxima leitura (após alterações em lote)."""
+    perfil = session.get(UserTasteProfile, user_id)
+    if perfil is not None:
+        session.delete(perfil)
+
+
+def tem_perfil(session: Session, user_id: int) -> bool:
+    return session.get(UserTasteProfile, user_id) is not None
+
+
+def obter_perfil(session: Session, user_id: int) -> UserTasteProfile:
+    """Retorna o perfil de gosto do usuário, reconstruindo-o se ainda não existir."""
+    perfil = session.get(UserTasteProfile, user_id)
+    if perfil is not None:
+        return perfil
+    return reconstruir_perfil(session, user_id)
+
+
+async def obter_perfil_assincrono(session: AsyncSession, user_id: int) -> UserTasteProfile:
+    """
+    Versão de obter_perfil para sessões assíncronas. A reconstrução consulta as
+    APIs externas e roda em uma thread, com uma sessão própria.
+    """
+    perfil = await session.get(UserTasteProfile, user_id)
+    if perfil is not None:
+        return perfil
+    return await asyncio.to_thread(_reconstruir_em_sessao_propria, user_id)
+
+
+def _reconstruir_em_sessao_propria(user_id: int) -> UserTasteProfile:
+    with Session(engine) as session:
+        perfil = reconstruir_perfil(session, user_id)
+        session.commit()
+        session.refresh(perfil)
+        return perfil
+
+
+def reconstruir_perfil(
+    session: Session,
+    user_id: int,
+    obter_livro: Callable[[str], Optional[Dict[str, Any]]] = obter_livro_por_id,
+    obter_filme: Callable[[str], Dict[str, Any]] = buscar_detalhes_filme,
+) -> UserTasteProfile:
+    """
+    Recalcula o perfil a partir da biblioteca e das avaliações do usuário e o
+    grava na transação da sessão, sem commit: o commit fica com quem chama.
+    """
+    logger.info(f"Reconstruindo perfil de gosto do usuário {user_id}")
+    generos_livro: Dict[str, float] = {}
+    autores: Dict[str, float] = {}
+    generos_filme: Dict[str, float] = {}
+
+    ids_livros = session.exec(
+        select(UserLibrary.book_external_id).where(UserLibrary.user_id == user_id)
+    ).all()
+    for id_externo in ids_livros:
+        try:
+            generos, autores_item = dados_livro_google(obter_livro(id_externo))
+        except Exception:
+            logger.exception("Falha ao buscar livro %s para o perfil de gosto", id_externo)
+            continue
+        generos_livro = _somar_pesos(generos_livro, generos, PESO_BIBLIOTECA)
+        autores = _somar_pesos(autores, autores_item, PESO_BIBLIOTECA)
+
+    ids_filmes = session.exec(
+        select(UserMovieLibrary.movie_external_id).where(UserMovieLibrary.user_id == user_id)
+    ).all()
+    for id_externo in ids_filmes:
+        try:
+            generos = generos_filme_omdb(obter_filme(id_externo))
+        except Exception:
+            logger.exception("Falha ao buscar filme %s para o perfil de gosto", id_externo)
+            continue
+        generos_filme = _somar_pesos(generos_filme, generos, PESO_BIBLIOTECA)
+
+    avaliacoes_livros = session.exec(
+        select(Rating.score, DBBook.genres, DBBook.author)
+        .join(DBBook, DBBook.id == Rating.book_id)
+        .where(Rating.user_id == user_id)
+    ).all()
+    for nota, generos, autor in avaliacoes_livros:
+        peso = peso_avaliacao(nota)
+        generos_livro = _somar_pesos(generos_livro, generos or [], peso)
+        autores = _somar_pesos(autores, dividir_autores(autor), peso)
+
+    avaliacoes_filmes = session.exec(
+        select(Rating.score, DBMovie.genres)
+        .join(DBMovie, DBMovie.id == Rating.movie_id)
+        .where(Rating.user_id == user_id)
+    ).all()
+    for nota, generos in avaliacoes_filmes:
+        generos_filme = _somar_pesos(generos_filme, generos or [], peso_avaliacao(nota))
+
+    # Outra requisição pode ter reconstruído o perfil ao mesmo tempo: prevalece o já gravado
+    inserir_ignorando_duplicados(
+        session,
+        UserTasteProfile,
+        [{
+            "user_id": user_id,
+            "book_genres": generos_livro,
+            "book_authors": autores,
+            "movie_genres": generos_filme,
+            "updated_at": datetime.utcnow(),
+        }],
+        ["user_id"],
+    )
+    return session.get(UserTasteProfile, user_id, populate_existing=True)
+
+
+def principais(pesos: Optional[Dict[str, float]], quantidade: int) -> List[str]:
+    """Chaves com afinidade positiva, da maior para a menor."""
+    if not pesos:
+        return []
+    positivos = [(chave, valor) for chave, valor in pesos.items() if valor > 0]
+    positivos.sort(key=lambda item: item[1], reverse=True)
+    return [chave for chave, _ in positivos[:quantidade]]
+
+
+def _somar_pesos(
+    pesos: Optional[Dict[str, float]], chaves: Iterable[str], peso: float
+) -> Dict[str, float]:
+    resultado = dict(pesos or {})
+    for chave in set(chaves):
+        if not chave:
+            continue
+        valor = round(resultado.get(chave, 0.0) + peso, 4)
+        if valor == 0:
+            resultado.pop(chave, None)
+        else:
+            resultado[chave] = valor
+    if len(resultado) > MAX_ENTRADAS_POR_DIMENSAO:
+        mais_relevantes = sorted(resultado.items(), key=lambda item: abs(item[1]), reverse=True)
+        resultado = dict(mais_relevantes[:MAX_ENTRADAS_POR_DIMENSAO])
+    return resultado
@@ -0,0 +1,136 @@
+"""
+Broker em memória para a timeline ao vivo (/timeline/stream, server-sent events).
+Cada cliente conectado tem uma fila limitada; as avaliações novas são entregues
+apenas aos assinantes interessados, e um cliente lento demais tem a fila
+descartada e recebe um evento "reset" para recarregar a timeline.
+"""
+import asyncio
+import json
+import logging
+import os
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+TAMANHO_FILA = int(os.getenv("TIMELINE_STREAM_QUEUE_SIZE", "100"))
+INTERVALO_HEARTBEAT = int(os.getenv("TIMELINE_STREAM_HEARTBEAT", "15"))
+
+
+class Assinatura:
+    __slots__ = ("user_id", "apenas_seguindo", "seguidos", "fila")
+
+    def __init__(self, user_id: int, apenas_seguindo: bool, seguidos: Iterable[int]):
+        self.user_id = user_id
+        self.apenas_seguindo = apenas_seguindo
+        self.seguidos: Set[int] = set(seguidos)
+        self.fila: "asyncio.Queue[Tuple[str, Dict[str, Any]]]" = asyncio.Queue(maxsize=TAMANHO_FILA)
+
+    def entregar(self, tipo: str, dados: Dict[str, Any]) -> None:
+        try:
+            self.fila.put_nowait((tipo, dados))
+        except asyncio.QueueFull:
+            # Cliente não acompanha o ritmo: descarta o atraso e pede que recarregue
+            while not self.fila.empty():
+                self.fila.get_nowait()
+            self.fila.put_nowait(("reset", {}))
+            logger.info(f"Fila da timeline ao vivo do usuário {self.user_id} cheia; enviando reset")
+
+
+class BrokerTimeline:
+    """
+    Assinaturas "apenas seguindo" ficam indexadas pelo autor seguido, então
+    publicar uma avaliação custa proporcionalmente aos assinantes interessados.
+    Todos os métodos rodam no loop de eventos; `publicar` e `atualizar_seguidos`
+    podem ser chamados de outras threads.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._todos: Set[Assinatura] = set()
+        self._por_autor: Dict[int, Set[Assinatura]] = defaultdict(set)
+        self._por_usuario: Dict[int, Set[Assinatura]] = defaultdict(set)
+
+    def tem_assinantes(self) -> bool:
+        return bool(self._por_usuario)
+
+    def assinar(self, user_id: int, apenas_seguindo: bool, seguidos: Iterable[int]) -> Assinatura:
+        self._loop = asyncio.get_running_loop()
+        assinatura = Assinatura(user_id, apenas_seguindo, seguidos)
+        self._por_usuario[user_id].add(assinatura)
+        if apenas_seguindo:
+            for autor_id in assinatura.seguidos:
+                self._por_autor[autor_id].add(assinatura)
+        else:
+            self._todos.add(assinatura)
+        return assinatura
+
+    def cancelar(self, assinatura: Assinatura) -> None:
+        self._descartar(self._por_usuario, assinatura.user_id, assinatura)
+        if assinatura.apenas_seguindo:
+            for autor_id in assinatura.seguidos:
+                self._descartar(self._por_autor, autor_id, assinatura)
+        else:
+            self._todos.discard(assinatura)
+
+    def publicar(self, autor_id: int, atividade: Dict[str, Any]) -> None:
+        self._no_loop(self._distribuir, autor_id, atividade)
+
+    def atualizar_seguidos(self, seguidor_id: int, seguido_id: int, seguindo: bool) -> None:
+        self._no_loop(self._atualizar_seguidos, seguidor_id, seguido_id, seguindo)
+
+    def _distribuir(self, autor_id: int, atividade: Dict[str, Any]) -> None:
+        for assinatura in self._todos | self._por_autor.get(autor_id, set()):
+            if assinatura.user_id != autor_id:
+                assinatura.entregar("activity", atividade)
+
+    def _atualizar_seguidos(self, seguidor_id: int, seguido_id: int, seguindo: bool) -> None:
+        for assinatura in self._por_usuario.get(seguidor_id, ()):
+            if not assinatura.apenas_seguindo:
+                continue
+            if seguindo:
+                assinatura.seguidos.add(seguido_id)
+                self._por_autor[seguido_id].add(assinatura)
+            else:
+                assinatura.seguidos.discard(seguido_id)
+                self._descartar(self._por_autor, seguido_id, assinatura)
+
+    def _no_loop(self, funcao, *args) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            atual = asyncio.get_running_loop()
+        except RuntimeError:
+            atual = None
+        if atual is loop:
+            funcao(*args)
+        else:
+            loop.call_soon_threadsafe(funcao, *args)
+
+    @staticmethod
+    def _descartar(indice: Dict[int, Set[Assinatura]], chave: int, assinatura: Assinatura) -> None:
+        conjunto = indice.get(chave)
+        if conjunto is None:
+            return
+        conjunto.discard(assinatura)
+        if not conjunto:
+            del indice[chave]
+
+
+broker = BrokerTimeline()
+
+
+async def eventos_sse(assinatura: Assinatura, desconectado) -> AsyncIterator[str]:
+    """Serializa os eventos da assinatura no formato SSE, com heartbeats periódicos."""
+    try:
+        yield f"retry: {INTERVALO_HEARTBEAT * 1000}\n\n"
+        while not await desconectado():
+            try:
+                tipo, dados = await asyncio.wait_for(assinatura.fila.get(), timeout=INTERVALO_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+            yield f"event: {tipo}\ndata: {json.dumps(dados)}\n\n"
+    finally:
+        broker.cancelar(assinatura)
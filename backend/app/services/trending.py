@@ -0,0 +1,246 @@
+"""
+Contadores de popularidade (trending) de livros e filmes em janelas deslizantes.
+Os eventos (visualizações, adições à biblioteca e avaliações) são contabilizados
+em memória com custo O(1). Periodicamente, os acréscimos de cada bucket desde a
+última gravação são somados à tabela TrendingBucket, de modo que vários processos
+acumulam na mesma linha; na inicialização os buckets ainda válidos são restaurados
+nas suas posições originais e expiram no tempo certo.
+"""
+import asyncio
+import heapq
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, event, func
+from sqlalchemy.orm import Session as SessaoORM
+from sqlmodel import Session, select
+
+from core.database import engine, inserir_ou_somar
+from core.models import TrendingBucket
+
+logger = logging.getLogger(__name__)
+
+TIPOS_MIDIA = ("book", "movie")
+
+# nome da janela -> (duração, tamanho do bucket), em segundos
+JANELAS: Dict[str, Tuple[int, int]] = {
+    "1h": (3600, 60),
+    "24h": (24 * 3600, 3600),
+    "7d": (7 * 24 * 3600, 6 * 3600),
+}
+
+PESOS_EVENTO = {
+    "view": 1,
+    "library": 3,
+    "rating": 5,
+}
+
+INTERVALO_GRAVACAO = int(os.getenv("TRENDING_FLUSH_INTERVAL", "60"))
+LINHAS_POR_INSERCAO = 500
+CHAVE_EVENTOS = "trending_eventos"
+
+# (tipo de mídia, janela, início do bucket, id externo)
+ChaveBucket = Tuple[str, str, float, str]
+
+
+class JanelaDeslizante:
+    """
+    Soma de eventos por item nos últimos `duracao` segundos, agrupados em buckets.
+    Cada evento incrementa o bucket atual e o total; buckets expirados são
+    subtraídos do total uma única vez, então o custo amortizado é O(1) por evento.
+    """
+
+    def __init__(self, duracao: int, tamanho_bucket: int):
+        self.duracao = duracao
+        self.tamanho_bucket = tamanho_bucket
+        self.buckets: Deque[Tuple[float, Counter]] = deque()
+        self.totais: Counter = Counter()
+
+    def registrar(self, chave: str, peso: int, agora: float) -> float:
+        """Soma o evento ao bucket atual e retorna o início desse bucket."""
+        self._expirar(agora)
+        inicio = agora - (agora % self.tamanho_bucket)
+        if not self.buckets or self.buckets[-1][0] != inicio:
+            self.buckets.append((inicio, Counter()))
+        self.buckets[-1][1][chave] += peso
+        self.totais[chave] += peso
+        return inicio
+
+    def restaurar(self, chave: str, valor: int, inicio: float) -> None:
+        """Recoloca uma contagem gravada no bucket que começa em `inicio`, mantendo a ordem dos buckets."""
+        posicao = len(self.buckets)
+        while posicao and self.buckets[posicao - 1][0] > inicio:
+            posicao -= 1
+        if not posicao or self.buckets[posicao - 1][0] != inicio:
+            self.buckets.insert(posicao, (inicio, Counter()))
+            posicao += 1
+        self.buckets[posicao - 1][1][chave] += valor
+        self.totais[chave] += valor
+
+    def mais_populares(self, limite: int, agora: float) -> List[Tuple[str, int]]:
+        self._expirar(agora)
+        return heapq.nlargest(limite, self.totais.items(), key=lambda item: item[1])
+
+    def _expirar(self, agora: float) -> None:
+        limite = agora - self.duracao
+        while self.buckets and self.buckets[0][0] + self.tamanho_bucket <= limite:
+            _, contagens = self.buckets.popleft()
+            for chave, valor in contagens.items():
+                restante = self.totais[chave] - valor
+                if restante > 0:
+                    self.totais[chave] = restante
+                else:
+                    del self.totais[chave]
+
+
+class ContadoresPopularidade:
+    """Janelas deslizantes por tipo de mídia, seguras para uso entre threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._janelas: Dict[str, Dict[str, JanelaDeslizante]] = {
+            tipo: {nome: JanelaDeslizante(*config) for nome, config in JANELAS.items()}
+            for tipo in TIPOS_MIDIA
+        }
+        # Acréscimos de cada bucket ainda não somados à tabela
+        self._pendentes: Counter = Counter()
+
+    def registrar(self, tipo: str, id_externo: Optional[str], evento: str) -> None:
+        if not id_externo or tipo not in self._janelas:
+            return
+        peso = PESOS_EVENTO[evento]
+        agora = time.time()
+        with self._lock:
+            for nome, janela in self._janelas[tipo].items():
+                inicio = janela.registrar(id_externo, peso, agora)
+                self._pendentes[(tipo, nome, inicio, id_externo)] += peso
+
+    def mais_populares(self, tipo: str, janela: str, limite: int = 20) -> List[Tuple[str, int]]:
+        agora = time.time()
+        with self._lock:
+            return self._janelas[tipo][janela].mais_populares(limite, agora)
+
+    def gravar(self) -> None:
+        """
+        Soma à tabela TrendingBucket os acréscimos desde a última gravação (sem
+        sobrescrever os de outros processos) e remove os buckets já expirados.
+        """
+        with self._lock:
+            pendentes, self._pendentes = self._pendentes, Counter()
+        linhas = [
+            {
+                "media_type": tipo,
+                "period": nome,
+                "bucket_start": datetime.utcfromtimestamp(inicio),
+                "item_id": id_externo,
+                "count": valor,
+            }
+            for (tipo, nome, inicio, id_externo), valor in pendentes.items()
+        ]
+        try:
+            with Session(engine) as session:
+                for inicio in range(0, len(linhas), LINHAS_POR_INSERCAO):
+                    inserir_ou_somar(
+                        session,
+                        TrendingBucket,
+                        linhas[inicio:inicio + LINHAS_POR_INSERCAO],
+                        ["media_type", "period", "bucket_start", "item_id"],
+                        "count",
+                    )
+                for nome in JANELAS:
+                    session.execute(
+                        delete(TrendingBucket)
+                        .where(TrendingBucket.period == nome)
+                        .where(TrendingBucket.bucket_start < _inicio_validos(nome))
+                    )
+                session.commit()
+        except Exception:
+            # Devolve os acréscimos para a próxima gravação
+            with self._lock:
+                self._pendentes.update(pendentes)
+            raise
+        logger.info("Contadores de popularidade gravados (%s buckets).", len(linhas))
+
+    def carregar(self) -> None:
+        """Restaura os buckets ainda válidos nas suas posições (usado na inicialização da aplicação)."""
+        with Session(engine) as session:
+            linhas = [
+                linha
+                for nome in JANELAS
+                for linha in session.exec(
+                    select(TrendingBucket)
+                    .where(TrendingBucket.period == nome)
+                    .where(TrendingBucket.bucket_start >= _inicio_validos(nome))
+                    .order_by(TrendingBucket.bucket_start)
+                )
+            ]
+        with self._lock:
+            for linha in linhas:
+                janela = self._janelas.get(linha.media_type, {}).get(linha.period)
+                if janela is not None:
+                    inicio = linha.bucket_start.replace(tzinfo=timezone.utc).timestamp()
+                    janela.restaurar(linha.item_id, linha.count, inicio)
+        logger.info("Contadores de popularidade restaurados (%s buckets).", len(linhas))
+
+
+def _inicio_validos(janela: str) -> datetime:
+    """Início do bucket mais antigo que ainda conta para a janela."""
+    duracao, tamanho_bucket = JANELAS[janela]
+    return datetime.utcfromtimestamp(time.time() - duracao - tamanho_bucket)
+
+
+contadores = ContadoresPopularidade()
+
+
+def registrar_evento(tipo: str, id_externo: Optional[str], evento: str) -> None:
+    """Conta o evento imediatamente (visualizações, que não dependem de uma transação)."""
+    contadores.registrar(tipo, id_externo, evento)
+
+
+def registrar_apos_commit(session: Session, tipo: str, id_externo: Optional[str], evento: str) -> None:
+    """Conta o evento quando a transação da sessão for confirmada; descartado no rollback."""
+    session.info.setdefault(CHAVE_EVENTOS, []).append((tipo, id_externo, evento))
+
+
+@event.listens_for(SessaoORM, "after_commit")
+def _aplicar_eventos(session: SessaoORM) -> None:
+    for tipo, id_externo, evento in session.info.pop(CHAVE_EVENTOS, ()):
+        contadores.registrar(tipo, id_externo, evento)
+
+
+@event.listens_for(SessaoORM, "after_rollback")
+def _descartar_eventos(session: SessaoORM) -> None:
+    session.info.pop(CHAVE_EVENTOS, None)
+
+
+def mais_populares(tipo: str, janela: str = "24h", limite: int = 20) -> List[Tuple[str, int]]:
+    return contadores.mais_populares(tipo, janela, limite)
+
+
+def ids_populares_gravados(session: Session, tipo: str, janela: str = "7d", limite: int = 20) -> List[str]:
+    """Itens mais populares segundo os buckets gravados (para processos sem contadores em memória)."""
+    total = func.sum(TrendingBucket.count)
+    return list(session.exec(
+        select(TrendingBucket.item_id)
+        .where(TrendingBucket.media_type == tipo)
+        .where(TrendingBucket.period == janela)
+        .where(TrendingBucket.bucket_start >= _inicio_validos(janela))
+        .group_by(TrendingBucket.item_id)
+        .order_by(total.desc())
+        .limit(limite)
+    ).all())
+
+
+async def gravar_periodicamente() -> None:
+    """Tarefa de fundo que grava os contadores a cada INTERVALO_GRAVACAO segundos."""
+    while True:
+        await asyncio.sleep(INTERVALO_GRAVACAO)
+        try:
+            await asyncio.to_thread(contadores.gravar)
+        except Exception:
+            logger.exception("Falha ao gravar contadores de popularidade")
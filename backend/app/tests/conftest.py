@@ -0,0 +1,79 @@
+"""
+Configuração dos testes: banco SQLite temporário, detector de N+1 no modo
+raise e cabeçalhos de depuração SQL. As variáveis de ambiente são definidas
+antes de importar a aplicação, que lê a configuração na importação.
+Executar a partir de backend/app: python -m pytest -q
+"""
+import itertools
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+DIRETORIO_TESTES = tempfile.mkdtemp(prefix="testes_app_")
+os.environ["DATABASE_URL"] = f"sqlite:///{DIRETORIO_TESTES}/teste.db"
+os.environ["SQL_N_PLUS_ONE_MODE"] = "raise"
+os.environ["SQL_DEBUG_HEADERS"] = "true"
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlmodel import Session  # noqa: E402
+
+from core.database import create_db_and_tables, engine  # noqa: E402
+from core.models import Book, Rating  # noqa: E402
+
+_sequencia = itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def client() -> TestClient:
+    # Sem o bloco `with`, o lifespan (tarefas periódicas, seed) não é executado
+    create_db_and_tables()
+    import main
+    return TestClient(main.app)
+
+
+@pytest.fixture(scope="session")
+def criar_usuario(client):
+    """Cria um usuário pela API e retorna (id, cabeçalhos de autenticação)."""
+    def criar() -> Tuple[int, Dict[str, str]]:
+        nome = f"usuario{next(_sequencia)}"
+        resposta = client.post(
+            "/users/", json={"username": nome, "email": f"{nome}@teste.com", "password": "123456"}
+        )
+        assert resposta.status_code == 201, resposta.text
+        token = client.post("/login", json={"username": nome, "password": "123456"}).json()["access_token"]
+        return resposta.json()["id"], {"Authorization": f"Bearer {token}"}
+    return criar
+
+
+@pytest.fixture(scope="session")
+def criar_avaliacoes():
+    """Grava avaliações de livros diretamente no banco, sem consultar as APIs externas."""
+    def criar(user_id: int, quantidade: int) -> List[int]:
+        agora = datetime.utcnow()
+        with Session(engine) as session:
+            avaliacoes = []
+            for i in range(quantidade):
+                livro = Book(title=f"Livro {next(_sequencia)}", external_id=f"teste-{next(_sequencia)}")
+                session.add(livro)
+                session.flush()
+                avaliacao = Rating(
+                    user_id=user_id,
+                    book_id=livro.id,
+                    score=1 + i % 5,
+                    created_at=agora - timedelta(minutes=i),
+                )
+                session.add(avaliacao)
+                avaliacoes.append(avaliacao)
+            session.commit()
+            return [avaliacao.id for avaliacao in avaliacoes]
+    return criar
+
+
+def consultas(resposta) -> int:
+    """Quantidade de consultas SQL da requisição (cabeçalho X-DB-Queries)."""
+    return int(resposta.headers["X-DB-Queries"])
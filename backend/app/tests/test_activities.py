@@ -0,0 +1,75 @@
+"""
+/users/{id}/activities lido do log de atividades (ActivityEvent), sem as
+ações já desfeitas e com a nota e o comentário atuais das avaliações.
+"""
+from sqlmodel import Session
+
+from core.database import engine
+from core.models import Book, Rating
+from services import activity_log
+
+
+def _avaliar(user_id: int, titulo: str, nota: float, comentario: str) -> int:
+    """Avaliação gravada direto no banco, com o evento "rated" dos ganchos."""
+    with Session(engine) as session:
+        livro = Book(title=titulo, external_id=f"atividades-{user_id}-{titulo}")
+        session.add(livro)
+        session.flush()
+        avaliacao = Rating(user_id=user_id, book_id=livro.id, score=nota, comment=comentario)
+        session.add(avaliacao)
+        activity_log.registrar_avaliacao(session, "rated", avaliacao)
+        session.commit()
+        return avaliacao.id
+
+
+def test_atividades_do_log(client, criar_usuario):
+    autor_id, cabecalhos = criar_usuario()
+    seguido_id, _ = criar_usuario()
+    outro_id, _ = criar_usuario()
+    assert client.post(f"/users/{seguido_id}/follow", headers=cabecalhos).status_code == 200
+    assert client.post(f"/users/{outro_id}/follow", headers=cabecalhos).status_code == 200
+    mantida = _avaliar(autor_id, "Duna", 4, "Ótimo")
+
+    resposta = client.get(f"/users/{autor_id}/activities")
+    assert resposta.status_code == 200, resposta.text
+    avaliou, seguiu_outro, seguiu = resposta.json()
+    assert avaliou["action"] == "avaliou"
+    assert avaliou["highlight"] == "Duna"
+    assert (avaliou["rating"], avaliou["comment"]) == (4, "Ótimo")
+    assert seguiu_outro["verb"] == seguiu["verb"] == "followed"
+    assert seguiu["target_user_id"] == seguido_id
+    assert seguiu["highlight"].startswith("usuario")
+
+    resposta = client.put(f"/ratings/{mantida}", json={"score": 2, "comment": "Revisto"}, headers=cabecalhos)
+    assert resposta.status_code == 200, resposta.text
+    assert client.delete(f"/ratings/{_avaliar(autor_id, 'Removido', 5, '')}", headers=cabecalhos).status_code == 204
+    assert client.delete(f"/users/{outro_id}/follow", headers=cabecalhos).status_code == 200
+
+    atividades = client.get(f"/users/{autor_id}/activities").json()
+    assert [a["verb"] for a in atividades] == ["rated", "followed"]
+    assert (atividades[0]["highlight"], atividades[1]["target_user_id"]) == ("Duna", seguido_id)
+    assert (atividades[0]["rating"], atividades[0]["comment"]) == (2, "Revisto")
+
+
+def test_seguir_de_novo_aparece_uma_vez(client, criar_usuario):
+    autor_id, cabecalhos = criar_usuario()
+    seguido_id, _ = criar_usuario()
+    for metodo in ("post", "delete", "post"):
+        assert getattr(client, metodo)(f"/users/{seguido_id}/follow", headers=cabecalhos).status_code == 200
+
+    atividades = client.get(f"/users/{autor_id}/activities").json()
+    assert [(a["verb"], a["target_user_id"]) for a in atividades] == [("followed", seguido_id)]
+
+
+def test_atualizacao_sem_mudanca_nao_gera_evento(client, criar_usuario):
+    autor_id, cabecalhos = criar_usuario()
+    avaliacao_id = _avaliar(autor_id, "Sem mudança", 3, "Igual")
+    for corpo in ({"score": 3, "comment": "Igual"}, {"score": 3}, {}):
+        resposta = client.put(f"/ratings/{avaliacao_id}", json=corpo, headers=cabecalhos)
+        assert resposta.status_code == 200, resposta.text
+    resposta = client.get(f"/users/{autor_id}/events", params={"verb": "rating_updated"})
+    assert resposta.json() == []
+
+    client.put(f"/ratings/{avaliacao_id}", json={"comment": "Outro"}, headers=cabecalhos)
+    resposta = client.get(f"/users/{autor_id}/events", params={"verb": "rating_updated"})
+    assert len(resposta.json()) == 1
@@ -0,0 +1,42 @@
+"""
+Autenticação das rotas síncronas: o usuário é carregado na sessão da própria
+rota, sem abrir uma sessão assíncrona à parte.
+"""
+import pytest
+
+from core.database import get_async_session
+
+
+@pytest.fixture
+def sem_sessao_assincrona(client):
+    import main
+
+    def falhar():
+        pytest.fail("Rota síncrona abriu uma sessão assíncrona")
+
+    main.app.dependency_overrides[get_async_session] = falhar
+    yield
+    main.app.dependency_overrides.pop(get_async_session)
+
+
+@pytest.mark.parametrize("metodo, rota", [
+    ("post", "/users/{outro}/follow"),
+    ("get", "/users/{outro}/follow"),
+    ("get", "/users/search?consulta=usuario"),
+    ("get", "/timeline"),
+])
+def test_rotas_sincronas_sem_sessao_assincrona(client, criar_usuario, sem_sessao_assincrona, metodo, rota):
+    _, cabecalhos = criar_usuario()
+    outro_id, _ = criar_usuario()
+    resposta = getattr(client, metodo)(rota.format(outro=outro_id), headers=cabecalhos)
+    assert resposta.status_code == 200, resposta.text
+
+
+def test_rota_sincrona_de_admin_recusa_usuario_comum(client, criar_usuario, sem_sessao_assincrona):
+    _, cabecalhos = criar_usuario()
+    assert client.get("/users/curators", headers=cabecalhos).status_code == 403
+
+
+def test_token_invalido(client, sem_sessao_assincrona):
+    resposta = client.get("/timeline", headers={"Authorization": "Bearer invalido"})
+    assert resposta.status_code == 401
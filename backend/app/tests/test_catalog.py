@@ -0,0 +1,39 @@
+"""
+Registros provisórios do catálogo: marcados como pendentes até o enriquecimento
+ou até a API externa responder que o item não existe.
+"""
+import requests
+from sqlmodel import Session, select
+
+from core.database import engine
+from core.models import Book
+from services import catalog
+
+
+def _pendentes(ids):
+    with Session(engine) as session:
+        return set(catalog.ids_provisorios(session, "book")) & set(ids)
+
+
+def test_pendentes_ate_enriquecer_ou_nao_encontrar(monkeypatch):
+    ids = ["catalogo-ok", "catalogo-inexistente", "catalogo-falha"]
+    with Session(engine) as session:
+        catalog.resolver_ids_externos(session, "book", ids)
+        # Livro real sem título não é confundido com provisório
+        session.add(Book(title=catalog.TITULO_PROVISORIO, external_id="catalogo-sem-titulo"))
+        session.commit()
+    assert _pendentes(ids + ["catalogo-sem-titulo"]) == set(ids)
+
+    def buscar(id_externo, levantar_falhas=False):
+        if id_externo == "catalogo-falha":
+            raise requests.exceptions.ConnectionError("sem rede")
+        if id_externo == "catalogo-inexistente":
+            return None
+        return {"volumeInfo": {"title": "Enriquecido", "categories": ["Fiction"]}}
+
+    monkeypatch.setattr(catalog, "obter_livro_por_id", buscar)
+    assert catalog.enriquecer_itens("book", ids) == 1
+    assert _pendentes(ids) == {"catalogo-falha"}
+    with Session(engine) as session:
+        livro = session.exec(select(Book).where(Book.external_id == "catalogo-ok")).one()
+        assert (livro.title, livro.pendente) == ("Enriquecido", False)
@@ -0,0 +1,25 @@
+"""
+Criação da linha de UserStats na primeira alteração do usuário, sem depender
+de um SELECT anterior (INSERT ... ON CONFLICT DO NOTHING + UPDATE atômico).
+"""
+from sqlmodel import Session
+
+from core.database import engine
+from core.models import UserStats
+from services import counters
+
+
+def test_primeiras_alteracoes_criam_e_somam(criar_usuario):
+    user_id, _ = criar_usuario()
+    for _ in range(2):
+        with Session(engine) as session:
+            counters.ajustar_usuario(session, user_id, rating_count=1, rating_sum=4)
+            counters.ajustar_distribuicoes(session, user_id, {counters.faixa_nota(4): 1}, {"Drama": 1})
+            session.commit()
+
+    with Session(engine) as session:
+        estatisticas = session.get(UserStats, user_id)
+        assert (estatisticas.rating_count, estatisticas.rating_sum) == (2, 8)
+        assert (estatisticas.follower_count, estatisticas.book_library_count) == (0, 0)
+        assert estatisticas.score_histogram[counters.faixa_nota(4)] == 2
+        assert estatisticas.genre_counts == {"Drama": 2}
@@ -0,0 +1,31 @@
+"""
+Avaliações importadas em lote chegam à timeline "apenas seguindo" dos seguidores.
+"""
+from sqlmodel import Session
+
+from core.database import engine
+from core.models import ImportJob
+from services import catalog, rating_import
+
+
+def test_importacao_distribui_para_seguidores(client, criar_usuario, tmp_path, monkeypatch):
+    autor_id, cabecalhos_autor = criar_usuario()
+    seguidor_id, cabecalhos_seguidor = criar_usuario()
+    assert client.post(f"/users/{autor_id}/follow", headers=cabecalhos_seguidor).status_code == 200
+    # Itens provisórios ficam como estão: sem consulta às APIs externas
+    monkeypatch.setattr(catalog, "enriquecer_itens", lambda tipo, ids: 0)
+
+    arquivo = tmp_path / "avaliacoes.csv"
+    arquivo.write_text("book_external_id,score\nfeed-importado-1,4\nfeed-importado-2,5\n", encoding="utf-8")
+    with Session(engine) as session:
+        job = ImportJob(user_id=autor_id, format="csv")
+        session.add(job)
+        session.commit()
+        job_id = job.id
+    rating_import.processar_importacao(job_id, str(arquivo))
+
+    resposta = client.get("/timeline", params={"only_following": True}, headers=cabecalhos_seguidor)
+    assert resposta.status_code == 200, resposta.text
+    atividades = resposta.json()
+    assert len(atividades) == 2
+    assert {atividade["user_id"] for atividade in atividades} == {autor_id}
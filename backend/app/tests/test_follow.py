@@ -0,0 +1,39 @@
+"""
+Listagens de seguidores e seguidos: dados públicos dos usuários, sem email.
+"""
+import pytest
+
+
+@pytest.mark.parametrize("rota", ["/users/{seguido}/followers", "/users/{seguidor}/following"])
+def test_listagens_de_follow_sem_email(client, criar_usuario, rota):
+    seguidor_id, cabecalhos = criar_usuario()
+    seguido_id, _ = criar_usuario()
+    assert client.post(f"/users/{seguido_id}/follow", headers=cabecalhos).status_code == 200
+
+    resposta = client.get(rota.format(seguidor=seguidor_id, seguido=seguido_id))
+    assert resposta.status_code == 200, resposta.text
+    usuarios = resposta.json()
+    assert [usuario["id"] for usuario in usuarios] == [
+        seguidor_id if "followers" in rota else seguido_id
+    ]
+    assert "email" not in usuarios[0]
+    assert usuarios[0]["username"]
+
+
+def test_sem_limit_retorna_todos_e_com_limit_pagina(client, criar_usuario):
+    seguido_id, _ = criar_usuario()
+    seguidores = []
+    for _ in range(3):
+        seguidor_id, cabecalhos = criar_usuario()
+        assert client.post(f"/users/{seguido_id}/follow", headers=cabecalhos).status_code == 200
+        seguidores.append(seguidor_id)
+    rota = f"/users/{seguido_id}/followers"
+
+    resposta = client.get(rota)
+    assert [usuario["id"] for usuario in resposta.json()] == seguidores[::-1]
+    assert "X-Next-Cursor" not in resposta.headers
+
+    resposta = client.get(rota, params={"limit": 2})
+    assert [usuario["id"] for usuario in resposta.json()] == seguidores[:0:-1]
+    resposta = client.get(rota, params={"cursor": resposta.headers["X-Next-Cursor"]})
+    assert [usuario["id"] for usuario in resposta.json()] == seguidores[:1]
@@ -0,0 +1,57 @@
+"""
+Marcação de itens alterados dos rankings (services/leaderboards.py): só vale
+depois que a transação que alterou os contadores é confirmada.
+"""
+from sqlalchemy import text
+from sqlmodel import Session
+
+from core.database import engine
+from services import leaderboards
+
+
+def _marcados(tipo: str):
+    return leaderboards.rankings._alterados[tipo]
+
+
+def test_marcacao_aplicada_apos_commit(client):
+    with Session(engine) as session:
+        session.execute(text("SELECT 1"))
+        leaderboards.marcar_alterado(session, "book", -1)
+        assert -1 not in _marcados("book")
+        session.commit()
+    assert -1 in _marcados("book")
+    _marcados("book").discard(-1)
+
+
+def test_marcacao_descartada_no_rollback(client):
+    with Session(engine) as session:
+        session.execute(text("SELECT 1"))
+        leaderboards.marcar_alterado(session, "movie", -2)
+        session.rollback()
+        session.execute(text("SELECT 1"))
+        session.commit()
+    assert -2 not in _marcados("movie")
+
+
+def _posicao(item_id: int, pontuacao: float) -> leaderboards.Posicao:
+    return leaderboards.Posicao(pontuacao, item_id, None, f"Item {item_id}", None, None, 5, pontuacao)
+
+
+def test_ranking_completo_que_perde_item_e_recalculado(client, monkeypatch):
+    monkeypatch.setattr(leaderboards, "TAMANHO_RANKING", 2)
+    rankings = leaderboards.Rankings()
+    recalculos = []
+    monkeypatch.setattr(rankings, "recalcular", lambda: recalculos.append(True))
+    # Itens inexistentes no banco: saem do ranking ao serem reposicionados
+    rankings._rankings["book"] = {leaderboards.GERAL: [_posicao(-10, 4.5), _posicao(-11, 4.0)]}
+    rankings._generos_por_item["book"] = {-10: [], -11: []}
+    rankings._medias = {"book": 3.0, "movie": 3.0}
+
+    rankings.marcar_alterado("book", -12)
+    rankings.aplicar_alteracoes()
+    assert recalculos == []
+
+    rankings.marcar_alterado("book", -10)
+    rankings.aplicar_alteracoes()
+    assert recalculos == [True]
+    assert [p.item_id for p in rankings.pagina("book", None, 10, 0)] == [-11]
@@ -0,0 +1,97 @@
+"""
+Detector de N+1 (core/query_monitor.py) no modo raise: as rotas mais usadas
+passam com mais linhas que o limite, e uma consulta por linha é detectada.
+"""
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlmodel import Session, select
+
+from core import config, query_monitor
+from core.database import engine, get_session
+from core.models import User
+from conftest import consultas
+
+# Mais linhas que o limite do detector em cada listagem
+QUANTIDADE = config.SQL_N_PLUS_ONE_THRESHOLD + 5
+
+
+@pytest.fixture(scope="module")
+def alvo(client, criar_usuario, criar_avaliacoes):
+    """Usuário com avaliações, seguidores e seguidos acima do limite do detector."""
+    alvo_id, cabecalhos = criar_usuario()
+    criar_avaliacoes(alvo_id, QUANTIDADE)
+    for _ in range(QUANTIDADE):
+        outro_id, outros_cabecalhos = criar_usuario()
+        criar_avaliacoes(outro_id, 1)
+        assert client.post(f"/users/{alvo_id}/follow", headers=outros_cabecalhos).status_code == 200
+        assert client.post(f"/users/{outro_id}/follow", headers=cabecalhos).status_code == 200
+    return alvo_id, cabecalhos
+
+
+@pytest.mark.parametrize("rota", [
+    "/timeline?limit=50",
+    "/timeline?limit=50&only_following=true",
+    "/users/{id}/activities?limit=50",
+    "/users/{id}/ratings",
+    "/users/{id}/followers",
+    "/users/{id}/following",
+])
+def test_rotas_sem_consultas_repetidas(client, alvo, rota):
+    alvo_id, cabecalhos = alvo
+    resposta = client.get(rota.format(id=alvo_id), headers=cabecalhos)
+    assert resposta.status_code == 200, resposta.text
+    assert len(resposta.json()) >= QUANTIDADE
+    assert consultas(resposta) <= config.SQL_N_PLUS_ONE_THRESHOLD
+
+
+@pytest.fixture
+def app_com_n_mais_1():
+    """Aplicação mínima com o middleware de main.py e uma rota que consulta cada usuário separadamente."""
+    import main
+
+    app = FastAPI()
+    app.middleware("http")(main.monitorar_consultas)
+
+    @app.get("/usuarios")
+    def listar_usuarios(session: Session = Depends(get_session)):
+        ids = session.exec(select(User.id)).all()
+        return [session.get(User, user_id).username for user_id in ids]
+
+    return TestClient(app)
+
+
+def test_consulta_por_linha_falha(criar_usuario, app_com_n_mais_1):
+    for _ in range(QUANTIDADE):
+        criar_usuario()
+    with pytest.raises(query_monitor.ConsultasRepetidas) as erro:
+        app_com_n_mais_1.get("/usuarios")
+    (consulta, vezes), = erro.value.repetidas
+    assert "FROM user" in consulta and "user.id = ?" in consulta
+    assert vezes > config.SQL_N_PLUS_ONE_THRESHOLD
+
+
+def test_listas_de_in_agrupadas():
+    assert query_monitor.forma("SELECT * FROM rating WHERE id IN (?, ?, ?)") == \
+        query_monitor.forma("SELECT *\n FROM rating WHERE id IN (?)")
+    assert query_monitor.forma("SELECT * FROM t WHERE a = %(a_1)s") == "SELECT * FROM t WHERE a = ?"
+
+
+def test_monitorar_conta_consultas_em_threads():
+    por_thread, threads = 50, 8
+
+    def executar():
+        with engine.connect() as conexao:
+            for _ in range(por_thread):
+                conexao.execute(text("SELECT 1"))
+
+    with query_monitor.monitorar() as monitoramento:
+        with ThreadPoolExecutor(threads) as executor:
+            for futuro in [executor.submit(contextvars.copy_context().run, executar) for _ in range(threads)]:
+                futuro.result()
+    assert monitoramento.consultas == por_thread * threads
+    assert monitoramento.repetidas(config.SQL_N_PLUS_ONE_THRESHOLD) == [("SELECT 1", por_thread * threads)]
@@ -0,0 +1,57 @@
+"""
+Recomendações gravadas pelo job em lote: servidas enquanto o usuário não altera
+avaliações ou biblioteca; depois disso são calculadas na hora e o usuário volta
+a ser alvo do job incremental.
+"""
+from datetime import datetime, timedelta
+
+from sqlmodel import Session
+
+from core.database import engine
+from core.models import ActivityEvent, Recommendation
+from core.recommend_batch import _usuarios_alvo
+
+LIVRO = {"id": "gravado-1", "title": "Gravado", "author": "Autor"}
+
+
+def _gravar(user_id: int, calculada_em: datetime) -> None:
+    with Session(engine) as session:
+        session.add(Recommendation(user_id=user_id, recommended_books=[LIVRO], created_at=calculada_em))
+        session.commit()
+
+
+def _registrar(user_id: int, verbo: str, em: datetime) -> None:
+    with Session(engine) as session:
+        session.add(ActivityEvent(
+            actor_id=user_id, verb=verbo, object_type="book", object_id="gravado-1", created_at=em
+        ))
+        session.commit()
+
+
+def test_gravadas_ate_a_proxima_alteracao(client, criar_usuario):
+    user_id, _ = criar_usuario()
+    calculada_em = datetime.utcnow()
+    _registrar(user_id, "library_added", calculada_em - timedelta(minutes=5))
+    _gravar(user_id, calculada_em)
+
+    resposta = client.get(f"/users/{user_id}/recommendations/books")
+    assert resposta.status_code == 200, resposta.text
+    assert [livro["id"] for livro in resposta.json()] == ["gravado-1"]
+
+    # Biblioteca esvaziada depois do cálculo: sem livros, o cálculo na hora retorna vazio
+    _registrar(user_id, "library_removed", calculada_em + timedelta(minutes=5))
+    assert client.get(f"/users/{user_id}/recommendations/books").json() == []
+
+
+def test_usuarios_alvo_inclui_edicoes_e_remocoes(criar_usuario):
+    editou_id, _ = criar_usuario()
+    removeu_id, _ = criar_usuario()
+    parado_id, _ = criar_usuario()
+    desde = datetime.utcnow()
+    _registrar(editou_id, "rating_updated", desde + timedelta(seconds=1))
+    _registrar(removeu_id, "library_removed", desde + timedelta(seconds=1))
+    _registrar(parado_id, "library_removed", desde - timedelta(days=1))
+
+    alvos = _usuarios_alvo(desde)
+    assert {editou_id, removeu_id} <= set(alvos)
+    assert parado_id not in alvos
@@ -0,0 +1,50 @@
+"""
+Perfil de gosto: inclusão e remoção da biblioteca pesam os mesmos gêneros e
+autores (os do catálogo local), e a reconstrução não faz commit na sessão de quem chama.
+"""
+from sqlmodel import Session, select
+
+from core.database import engine
+from core.models import Book, UserLibrary, UserTasteProfile
+from routers.library import books as rotas_biblioteca
+from services import taste_profile
+
+LIVRO = {"volumeInfo": {"title": "Perfil", "categories": ["Fantasy"], "authors": ["Autora Um", "Autor Dois"]}}
+
+
+def _perfil(user_id: int) -> UserTasteProfile:
+    with Session(engine) as session:
+        return session.get(UserTasteProfile, user_id)
+
+
+def test_biblioteca_adiciona_e_remove_os_mesmos_pesos(client, criar_usuario, monkeypatch):
+    user_id, cabecalhos = criar_usuario()
+    with Session(engine) as session:
+        session.add(UserTasteProfile(user_id=user_id, book_genres={"Drama": 2.0}, book_authors={}, movie_genres={}))
+        session.commit()
+    monkeypatch.setattr(rotas_biblioteca, "obter_livro_por_id", lambda id_livro: LIVRO)
+
+    resposta = client.post("/library/add", json={"book_id": "perfil-1"}, headers=cabecalhos)
+    assert resposta.status_code == 200, resposta.text
+    perfil = _perfil(user_id)
+    assert perfil.book_genres == {"Drama": 2.0, "Fantasy": 1.0}
+    assert perfil.book_authors == {"Autora Um": 1.0, "Autor Dois": 1.0}
+    with Session(engine) as session:
+        livro = session.exec(select(Book).where(Book.external_id == "perfil-1")).one()
+        assert (livro.genres, livro.pendente) == (["Fantasy"], False)
+
+    resposta = client.delete("/library/remove", params={"book_id": "perfil-1"}, headers=cabecalhos)
+    assert resposta.status_code == 200, resposta.text
+    perfil = _perfil(user_id)
+    assert (perfil.book_genres, perfil.book_authors) == ({"Drama": 2.0}, {})
+
+
+def test_reconstrucao_sem_commit(criar_usuario):
+    user_id, _ = criar_usuario()
+    with Session(engine) as session:
+        session.add(UserLibrary(user_id=user_id, book_external_id="perfil-2"))
+        session.commit()
+        perfil = taste_profile.reconstruir_perfil(session, user_id, obter_livro=lambda id_livro: LIVRO)
+        assert perfil.book_genres == {"Fantasy": 1.0}
+        session.rollback()
+    assert _perfil(user_id) is None
@@ -0,0 +1,46 @@
+"""
+A timeline executa uma quantidade fixa de consultas por página,
+independentemente de `limit` (sem N+1 por atividade).
+"""
+import pytest
+
+from conftest import consultas
+
+LIMITES = (5, 20, 50)
+
+
+@pytest.fixture(scope="module")
+def leitor(client, criar_usuario, criar_avaliacoes):
+    """Usuário que segue três autores com 25 avaliações cada (75 na caixa de entrada)."""
+    leitor_id, cabecalhos = criar_usuario()
+    for _ in range(3):
+        autor_id, _ = criar_usuario()
+        criar_avaliacoes(autor_id, 25)
+        assert client.post(f"/users/{autor_id}/follow", headers=cabecalhos).status_code == 200
+    return cabecalhos
+
+
+@pytest.mark.parametrize("apenas_seguindo", [False, True])
+def test_consultas_constantes_por_pagina(client, leitor, apenas_seguindo):
+    quantidades = []
+    for limite in LIMITES:
+        resposta = client.get(
+            "/timeline", params={"limit": limite, "only_following": apenas_seguindo}, headers=leitor
+        )
+        assert resposta.status_code == 200, resposta.text
+        assert len(resposta.json()) == limite
+        quantidades.append(consultas(resposta))
+    assert len(set(quantidades)) == 1, dict(zip(LIMITES, quantidades))
+
+
+@pytest.mark.parametrize("apenas_seguindo", [False, True])
+def test_proxima_pagina_com_mesmas_consultas(client, leitor, apenas_seguindo):
+    parametros = {"limit": 20, "only_following": apenas_seguindo}
+    primeira = client.get("/timeline", params=parametros, headers=leitor)
+    segunda = client.get(
+        "/timeline", params={**parametros, "cursor": primeira.headers["X-Next-Cursor"]}, headers=leitor
+    )
+    assert segunda.status_code == 200, segunda.text
+    assert len(segunda.json()) == 20
+    assert {a["id"] for a in primeira.json()}.isdisjoint(a["id"] for a in segunda.json())
+    assert consultas(segunda) == consultas(primeira)
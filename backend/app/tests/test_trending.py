@@ -0,0 +1,74 @@
+"""
+Contadores de popularidade (services/trending.py): buckets gravados e
+restaurados nas posições originais, somados entre processos e contados só
+após o commit das mutações.
+"""
+import time
+
+import pytest
+from sqlalchemy import delete, text
+from sqlmodel import Session
+
+from core.database import engine
+from core.models import TrendingBucket
+from services import trending
+
+
+@pytest.fixture
+def tabela_vazia(client):
+    with Session(engine) as session:
+        session.execute(delete(TrendingBucket))
+        session.commit()
+
+
+def test_buckets_restaurados_na_posicao_original(tabela_vazia, monkeypatch):
+    agora = time.time()
+    processo = trending.ContadoresPopularidade()
+    monkeypatch.setattr(trending.time, "time", lambda: agora - 2 * 3600)
+    processo.registrar("book", "antigo", "rating")
+    monkeypatch.setattr(trending.time, "time", lambda: agora)
+    processo.registrar("book", "recente", "view")
+    processo.gravar()
+
+    reiniciado = trending.ContadoresPopularidade()
+    reiniciado.carregar()
+    assert reiniciado.mais_populares("book", "1h") == [("recente", 1)]
+    assert reiniciado.mais_populares("book", "24h") == [("antigo", 5), ("recente", 1)]
+
+    # O bucket de duas horas atrás expira da janela de 24h no tempo certo, sem levar o recente junto
+    monkeypatch.setattr(trending.time, "time", lambda: agora + 23 * 3600 + 1)
+    assert reiniciado.mais_populares("book", "24h") == [("recente", 1)]
+
+
+def test_gravacoes_de_processos_diferentes_se_somam(tabela_vazia):
+    primeiro, segundo = trending.ContadoresPopularidade(), trending.ContadoresPopularidade()
+    primeiro.registrar("movie", "tt1", "library")
+    segundo.registrar("movie", "tt1", "rating")
+    primeiro.gravar()
+    segundo.gravar()
+    primeiro.gravar()  # sem acréscimos novos: nada muda
+
+    reiniciado = trending.ContadoresPopularidade()
+    reiniciado.carregar()
+    assert reiniciado.mais_populares("movie", "7d") == [("tt1", 8)]
+    with Session(engine) as session:
+        assert trending.ids_populares_gravados(session, "movie") == ["tt1"]
+
+
+def test_eventos_de_mutacao_contados_apos_commit(client):
+    with Session(engine) as session:
+        session.execute(text("SELECT 1"))
+        trending.registrar_apos_commit(session, "book", "desfeito", "rating")
+        session.rollback()
+        session.execute(text("SELECT 1"))
+        trending.registrar_apos_commit(session, "book", "confirmado", "rating")
+        assert "confirmado" not in dict(trending.mais_populares("book", "1h", 100))
+        session.commit()
+    populares = dict(trending.mais_populares("book", "1h", 100))
+    assert "confirmado" in populares and "desfeito" not in populares
+
+
+def test_limite_das_rotas(client):
+    for rota in ("/trending/books", "/trending/movies"):
+        assert client.get(rota, params={"limit": 101}).status_code == 422
+        assert client.get(rota, params={"limit": 100}).status_code == 200
@@ -1604,7 +1604,6 @@ const Taskbar = ({ user: usuario, metrics: metricas, timeline: linhaDoTempo, fol
                       </div>
                       <div className="taskbar-search__result-info">
                         <strong>{seguidor.username}</strong>
-                        <span>{seguidor.email}</span>
                       </div>
                     </li>
                   ))}
@@ -1649,7 +1648,6 @@ const Taskbar = ({ user: usuario, metrics: metricas, timeline: linhaDoTempo, fol
                       </div>
                       <div className="taskbar-search__result-info">
                         <strong>{seguido.username}</strong>
-                        <span>{seguido.email}</span>
                       </div>
                     </li>
                   ))}